@@ -20,14 +20,21 @@
         "security/ir.model.access.csv",
         "security/res_groups.xml",
         "data/l10n_latam.document.type.csv",
+        "data/ir_cron.xml",
         "wizard/account_move_reversal_views.xml",
         "wizard/account_move_cancel_views.xml",
         "wizard/account_debit_note_views.xml",
+        "wizard/l10n_do_vendor_bill_import_views.xml",
+        "wizard/l10n_do_rnc_registry_load_views.xml",
         "views/res_config_settings_view.xml",
         "views/account_move_views.xml",
         "views/res_partner_views.xml",
         "views/res_company_views.xml",
+        "views/account_tax_group_views.xml",
         "views/account_dgii_menuitem.xml",
+        "views/account_ecf_log_views.xml",
+        "views/l10n_do_rnc_registry_views.xml",
+        "views/l10n_do_ncf_range_views.xml",
         "views/account_journal_views.xml",
         "views/l10n_latam_document_type_views.xml",
         "views/report_templates.xml",
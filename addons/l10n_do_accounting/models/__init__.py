@@ -2,8 +2,13 @@ from . import res_partner
 from . import res_company
 from . import l10n_latam_document_type
 from . import account_journal
+from . import account_tax_group
+from . import account_tax
 from . import account_move
 from . import monkey_patch
 from . import account_move_line
+from . import account_ecf_log
+from . import l10n_do_rnc_registry
+from . import l10n_do_ncf_range
 from . import l10n_do_ecf_edi_file
 from . import invoice_service_type_detail
\ No newline at end of file
@@ -3,8 +3,10 @@ from odoo import models, fields, api
 class AccountEcfLog(models.Model):
     _name = 'account.ecf.log'
     _description = 'Log de e-CF enviado a la DGII'
+    _order = 'date_sent desc, id desc'
 
-    move_id = fields.Many2one('account.move', string="Factura", required=True)
+    move_id = fields.Many2one('account.move', string="Factura", required=True, index=True, ondelete='cascade')
+    company_id = fields.Many2one(related='move_id.company_id', store=True)
     state = fields.Selection([
         ('sent', 'Enviado'),
         ('accepted', 'Aceptado'),
@@ -13,3 +15,18 @@ class AccountEcfLog(models.Model):
     uuid = fields.Char("UUID", readonly=True)
     response_message = fields.Text("Mensaje DGII")
     date_sent = fields.Datetime("Fecha Envío", default=fields.Datetime.now)
+    batch_ref = fields.Char("Lote", index=True, readonly=True)
+    attempt = fields.Integer("Intento", readonly=True)
+    latency = fields.Float("Latencia (ms)", readonly=True, aggregator="avg")
+
+    @api.model
+    def _get_batch_stats(self, batch_ref):
+        """Retorna cantidad enviada, aceptada y latencia promedio de un lote."""
+        logs = self.search([("batch_ref", "=", batch_ref)])
+        accepted = logs.filtered(lambda l: l.state == "accepted")
+        return {
+            "sent": len(logs),
+            "accepted": len(accepted),
+            "acceptance_rate": len(accepted) / len(logs) if logs else 0.0,
+            "latency": sum(logs.mapped("latency")) / len(logs) if logs else 0.0,
+        }
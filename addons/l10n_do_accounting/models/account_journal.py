@@ -1,4 +1,4 @@
-from odoo import fields, models, api, _
+from odoo import fields, models, api, tools, _
 from odoo.exceptions import RedirectWarning, ValidationError
 
 
@@ -33,12 +33,19 @@ class AccountJournal(models.Model):
         """
         Devuelve lista de tipos NCF incluyendo ECF si la compañía es emisora.
         """
+        return self._l10n_do_get_all_ncf_types(
+            types_list,
+            invoice.move_type if invoice else False,
+            bool(self.env.context.get("use_documents", False)),
+        )
+
+    def _l10n_do_get_all_ncf_types(self, types_list, move_type=False, use_documents=False):
         ecf_types = ["e-%s" % d for d in types_list if d not in ("unique", "import")]
 
-        if self.env.context.get("use_documents", False) or not invoice:
+        if use_documents or not move_type:
             return types_list + ecf_types
 
-        if invoice.is_purchase_document() and any(
+        if move_type in ("in_invoice", "in_refund") and any(
             t in types_list for t in ("minor", "informal", "exterior")
         ):
             return ecf_types if self.company_id.l10n_do_ecf_issuer else types_list
@@ -73,8 +80,18 @@ class AccountJournal(models.Model):
         el socio y si la compañía es emisora de ECF.
         """
         self.ensure_one()
-        ncf_data = self._get_l10n_do_ncf_types_data()
-
+        self._l10n_do_check_ncf_requirements(counterpart_partner)
+        return self._l10n_do_get_ncf_types(
+            payer_type=counterpart_partner.l10n_do_dgii_tax_payer_type if counterpart_partner else False,
+            is_company_partner=bool(counterpart_partner) and counterpart_partner == self.company_id.partner_id,
+            move_type=invoice.move_type if invoice else False,
+            is_debit=bool(invoice and invoice.debit_origin_id)
+            or self.env.context.get("internal_type") == "debit_note",
+            use_documents=bool(self.env.context.get("use_documents", False)),
+        )
+
+    def _l10n_do_check_ncf_requirements(self, counterpart_partner=False):
+        """Valida que la compañía tenga RNC y el socio su tipo de contribuyente."""
         if not self.company_id.vat:
             try:
                 action = self.env.ref("base.action_res_company_form")
@@ -85,6 +102,18 @@ class AccountJournal(models.Model):
                 action.id if action else False,
                 _("Ir a Compañías"),
             )
+        if counterpart_partner and not counterpart_partner.l10n_do_dgii_tax_payer_type:
+            raise ValidationError(
+                _("El socio (%s) debe tener definido su tipo de contribuyente para emitir comprobantes fiscales.")
+                % counterpart_partner.name
+            )
+
+    def _l10n_do_get_ncf_types(
+        self, payer_type=False, is_company_partner=False, move_type=False, is_debit=False, use_documents=False
+    ):
+        """Tipos NCF permitidos a partir de valores simples (sin registros), de
+        modo que el resultado se pueda memorizar."""
+        ncf_data = self._get_l10n_do_ncf_types_data()
 
         tipo_emision = "issued" if self.type == "sale" else "received"
         tipos_ncf = list(set(
@@ -92,7 +121,7 @@ class AccountJournal(models.Model):
             for tipo in contribuyente
         ))
 
-        if not counterpart_partner:
+        if not payer_type:
             notas = ["debit_note", "credit_note"]
             externos = ["fiscal", "special", "governmental"]
 
@@ -101,29 +130,56 @@ class AccountJournal(models.Model):
                 if self.type == "sale"
                 else [t for t in tipos_ncf if t not in externos]
             )
-            return self._get_all_ncf_types(resultado)
+            return self._l10n_do_get_all_ncf_types(resultado, use_documents=use_documents)
 
         # Validación con partner
-        if counterpart_partner.l10n_do_dgii_tax_payer_type:
-            if counterpart_partner == self.company_id.partner_id:
-                tipos_ncf = ["minor"]
-            else:
-                permitidos = ncf_data[tipo_emision][counterpart_partner.l10n_do_dgii_tax_payer_type]
-                tipos_ncf = list(set(tipos_ncf) & set(permitidos))
+        if is_company_partner:
+            tipos_ncf = ["minor"]
         else:
-            raise ValidationError(
-                _("El socio (%s) debe tener definido su tipo de contribuyente para emitir comprobantes fiscales.")
-                % counterpart_partner.name
-            )
+            permitidos = ncf_data[tipo_emision][payer_type]
+            tipos_ncf = list(set(tipos_ncf) & set(permitidos))
 
         # Validación para notas de crédito o débito
-        if invoice and invoice.move_type in ["out_refund", "in_refund"]:
+        if move_type in ["out_refund", "in_refund"]:
             tipos_ncf = ["credit_note"]
 
-        if invoice and invoice.debit_origin_id or self.env.context.get("internal_type") == "debit_note":
+        if is_debit:
             return ["debit_note", "e-debit_note"]
 
-        return self._get_all_ncf_types(tipos_ncf, invoice)
+        return self._l10n_do_get_all_ncf_types(tipos_ncf, move_type, use_documents)
+
+    @tools.ormcache(
+        "self.id", "payer_type", "is_company_partner", "move_type", "is_debit", "ecf_issuer", "use_documents"
+    )
+    def _l10n_do_get_document_type_ids(
+        self, payer_type, is_company_partner, move_type, is_debit, ecf_issuer, use_documents=False
+    ):
+        """Ids de tipos de documento permitidos para una factura de este diario.
+
+        ``ecf_issuer`` forma parte de la clave aunque se lea de la compañía; la
+        caché se limpia al modificar diarios, tipos de documento o la compañía.
+        """
+        self.ensure_one()
+        internal_types = ["debit_note"]
+        if move_type in ["out_refund", "in_refund"]:
+            internal_types.append("credit_note")
+        else:
+            internal_types.append("invoice")
+
+        ncf_types = self._l10n_do_get_ncf_types(
+            payer_type, is_company_partner, move_type, is_debit, use_documents
+        )
+        domain = [
+            ("internal_type", "in", internal_types),
+            ("country_id", "=", self.company_id.country_id.id),
+            "|",
+            ("l10n_do_ncf_type", "=", False),
+            ("l10n_do_ncf_type", "in", ncf_types),
+        ]
+        codes = self._get_journal_codes()
+        if codes:
+            domain.append(("code", "in", codes))
+        return tuple(self.env["l10n_latam.document.type"].search(domain).ids)
 
     def _get_journal_codes(self):
         """Devuelve el prefijo de código de comprobante fiscal (B/E)."""
@@ -134,48 +190,106 @@ class AccountJournal(models.Model):
             return ["E"]
         return ["B"]
 
+    def _l10n_do_get_expiration_dates(self):
+        """Fechas de vencimiento de NCF de los diarios con una sola lectura.
+
+        :return: dict {(id de diario, id de tipo de documento): fecha}
+        """
+        if not self:
+            return {}
+        result = {}
+        for row in self.env["l10n_do.account.journal.document_type"].sudo().search_read(
+            [("journal_id", "in", self.ids)],
+            ["journal_id", "l10n_latam_document_type_id", "l10n_do_ncf_expiration_date"],
+            order="id",
+        ):
+            if row["l10n_latam_document_type_id"]:
+                result.setdefault(
+                    (row["journal_id"][0], row["l10n_latam_document_type_id"][0]),
+                    row["l10n_do_ncf_expiration_date"],
+                )
+        return result
+
     def _l10n_do_create_document_types(self):
-        """Crea los tipos de documentos fiscales en el diario según la configuración."""
-        self.ensure_one()
-        if not self.l10n_latam_use_documents or self.company_id.country_id.code != "DO":
-            return
+        """Crea los tipos de documentos fiscales de los diarios según la configuración.
 
-        tipos_ncf = self._get_journal_ncf_types()
+        Trabaja sobre todo el conjunto de diarios: los tipos NCF se calculan una
+        vez por combinación (tipo de diario, emisor e-CF), los existentes se leen
+        con una sola consulta y los faltantes se crean con un solo ``create``.
+        """
+        journals = self.filtered(
+            lambda j: j.l10n_latam_use_documents and j.company_id.country_id.code == "DO"
+        )
+        if not journals:
+            return
 
-        if self.type == "purchase":
-            tipos_ncf = [
-                tipo for tipo in tipos_ncf if tipo not in ("fiscal", "credit_note")
-            ]
+        use_documents = bool(self.env.context.get("use_documents", False))
+        tipos_por_clave = {}
+        tipos_por_diario = {}
+        for journal in journals:
+            journal._l10n_do_check_ncf_requirements()
+            clave = (journal.type, journal.company_id.l10n_do_ecf_issuer)
+            if clave not in tipos_por_clave:
+                tipos_ncf = journal._l10n_do_get_ncf_types(use_documents=use_documents)
+                if journal.type == "purchase":
+                    tipos_ncf = [
+                        tipo for tipo in tipos_ncf if tipo not in ("fiscal", "credit_note")
+                    ]
+                tipos_por_clave[clave] = set(tipos_ncf)
+            tipos_por_diario[journal] = tipos_por_clave[clave]
 
         documentos = self.env["l10n_latam.document.type"].search([
             ("country_id.code", "=", "DO"),
-            ("l10n_do_ncf_type", "in", tipos_ncf),
+            ("l10n_do_ncf_type", "in", list(set().union(*tipos_por_diario.values()))),
         ])
 
-        ya_existentes = self.l10n_do_document_type_ids.mapped("l10n_latam_document_type_id.l10n_do_ncf_type")
-        nuevos = documentos.filtered(lambda d: d.l10n_do_ncf_type not in ya_existentes)
-
-        for doc in nuevos:
-            self.env["l10n_do.account.journal.document_type"].sudo().create({
-                "journal_id": self.id,
+        JournalDocumentType = self.env["l10n_do.account.journal.document_type"]
+        JournalDocumentType.flush_model()
+        self.env.cr.execute(
+            """
+            SELECT jd.journal_id, dt.l10n_do_ncf_type
+              FROM l10n_do_account_journal_document_type jd
+              JOIN l10n_latam_document_type dt ON dt.id = jd.l10n_latam_document_type_id
+             WHERE jd.journal_id IN %s
+            """,
+            [tuple(journals.ids)],
+        )
+        ya_existentes = set(self.env.cr.fetchall())
+
+        vals_list = [
+            {
+                "journal_id": journal.id,
                 "l10n_latam_document_type_id": doc.id,
-            })
+            }
+            for journal, tipos_ncf in tipos_por_diario.items()
+            for doc in documentos
+            if doc.l10n_do_ncf_type in tipos_ncf
+            and (journal.id, doc.l10n_do_ncf_type) not in ya_existentes
+        ]
+        if vals_list:
+            JournalDocumentType.sudo().create(vals_list)
 
     @api.model_create_multi
     def create(self, vals_list):
         diarios = super().create(vals_list)
-        for diario in diarios:
-            diario._l10n_do_create_document_types()
+        diarios._l10n_do_create_document_types()
+        self.env.registry.clear_cache()
         return diarios
 
     def write(self, vals):
         campos_clave = {"type", "l10n_latam_use_documents"}
         resultado = super().write(vals)
         if campos_clave.intersection(vals.keys()):
-            for diario in self:
-                diario._l10n_do_create_document_types()
+            self._l10n_do_create_document_types()
+        if campos_clave.union({"company_id"}).intersection(vals.keys()):
+            self.env.registry.clear_cache()
         return resultado
 
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
 
 class AccountJournalDocumentType(models.Model):
     _name = "l10n_do.account.journal.document_type"
@@ -1,13 +1,43 @@
 # -*- coding: utf-8 -*-
+import logging
 import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import psycopg2
 from werkzeug import urls
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, Command, _, _lt
 from odoo.osv import expression
 from odoo.exceptions import ValidationError, UserError, AccessError
-from odoo.tools.sql import column_exists, create_column, drop_index, index_exists
-from lxml import etree
-import base64
+from odoo.tools.sql import column_exists, create_column, create_index, drop_index, index_exists
+
+from . import l10n_do_ecf_edi_file
+from .l10n_latam_document_type import L10N_DO_SELF_ISSUED_PURCHASE_NCF_TYPES, validate_numbers
+
+_logger = logging.getLogger(__name__)
+
+# Reintentos del envío de e-CF: espera base (segundos) duplicada en cada intento
+L10N_DO_ECF_SEND_MAX_ATTEMPTS = 5
+L10N_DO_ECF_SEND_RETRY_DELAY = 60
+
+# Índices únicos de NCF creados en _auto_init y el mensaje que se muestra al usuario
+_L10N_DO_DUPLICATED_NCF_MSG = _lt("Ya existe otro documento con ese NCF en esta empresa.")
+_L10N_DO_DUPLICATED_VENDOR_NCF_MSG = _lt("Vendor bill Fiscal Number must be unique per vendor and company.")
+_L10N_DO_UNIQUE_FISCAL_NUMBER_INDEXES = {
+    "account_move_account_move_unique_l10n_do_fiscal_number_sales": _L10N_DO_DUPLICATED_NCF_MSG,
+    "account_move_unique_l10n_do_fiscal_number_purchase_internal": _L10N_DO_DUPLICATED_NCF_MSG,
+    "account_move_unique_l10n_do_fiscal_number_purchase_manual": _L10N_DO_DUPLICATED_VENDOR_NCF_MSG,
+}
+
+# Texto que parece un NCF/e-CF (completo o parcial): B01..., E3100..., PB01...
+_NCF_SEARCH_RE = re.compile(r"^P?[BE]\d{1,10}$", re.IGNORECASE)
+
+# Caracteres que la DGII exige codificar en el código de seguridad del QR.
+_ECF_SECURITY_CODE_QUOTE = str.maketrans(
+    {c: "%%%02X" % ord(c) for c in " !#$&'()*+,/:;=?@[]\"-.<>\\^_`"}
+)
 
 
 class AccountMove(models.Model):
@@ -100,8 +130,9 @@ class AccountMove(models.Model):
     l10n_do_ecf_sign_date = fields.Datetime(string="Fecha de Firma e-CF", copy=False)
     l10n_do_electronic_stamp = fields.Char(
         string="Sello Electrónico",
-        compute="_compute_l10n_do_electronic_stamp",
-        store=True,
+        readonly=True,
+        copy=False,
+        help="URL de consulta del e-CF en la DGII. Se genera al publicar la factura.",
     )
 
     l10n_do_sequence_prefix = fields.Char(
@@ -154,8 +185,23 @@ class AccountMove(models.Model):
         help="Identificador único devuelto por la DGII al recibir el e-CF"
     )
     
+    l10n_do_ecf_send_state = fields.Selection(
+        [
+            ("to_send", "Por enviar"),
+            ("accepted", "Aceptado"),
+            ("error", "Error"),
+        ],
+        string="Estado de envío e-CF",
+        copy=False,
+        readonly=True,
+        index=True,
+    )
+    l10n_do_ecf_send_attempts = fields.Integer(string="Intentos de envío e-CF", copy=False, readonly=True)
+    l10n_do_ecf_next_attempt = fields.Datetime(string="Próximo intento de envío", copy=False, readonly=True)
+    l10n_do_ecf_log_ids = fields.One2many("account.ecf.log", "move_id", string="Envíos e-CF", readonly=True)
+
     itbis_amount = fields.Monetary(
-        string='ITBIS 18%',
+        string='ITBIS',
         currency_field='currency_id',
         compute='_compute_taxes_split',
         store=False,
@@ -169,17 +215,16 @@ class AccountMove(models.Model):
 
     @api.depends('line_ids.tax_line_id', 'line_ids.balance')
     def _compute_taxes_split(self):
+        categories = self.env["account.tax"]._l10n_do_get_dgii_tax_categories()
         for inv in self:
-            lines = inv.line_ids.filtered(lambda l: l.tax_line_id)
-            # Buscamos por nombre de impuesto
-            inv.itbis_amount = abs(sum(
-                lines.filtered(lambda l: l.tax_line_id.name == '18% ITBIS')
-                     .mapped('balance')
-            ))
-            inv.propina_amount = abs(sum(
-                lines.filtered(lambda l: l.tax_line_id.name == '10% Propina')
-                     .mapped('balance')
-            ))
+            amounts = {"itbis": 0.0, "tip": 0.0}
+            # Clasificamos por la categoría DGII del grupo de impuestos
+            for line in inv.line_ids:
+                category = categories.get(line.tax_line_id.id)
+                if category in amounts:
+                    amounts[category] += line.balance
+            inv.itbis_amount = abs(amounts["itbis"])
+            inv.propina_amount = abs(amounts["tip"])
     
     _sql_constraints = [
         ("unique_l10n_do_fiscal_number_sales",
@@ -196,17 +241,52 @@ class AccountMove(models.Model):
                 
     @api.constrains("l10n_do_fiscal_number", "company_id")
     def _check_unique_fiscal_number(self):
-        for rec in self.filtered(lambda r: r.l10n_do_fiscal_number and r.state != 'cancel'):
-            domain = [
-                ("id", "!=", rec.id),
-                ("company_id", "=", rec.company_id.id),
-                ("l10n_do_fiscal_number", "=", rec.l10n_do_fiscal_number),
-                ("state", "!=", "cancel"),
-            ]
-            if self.search_count(domain):
-                raise ValidationError(_("Ya existe otro documento con ese NCF en esta empresa."))
-
+        records = self.filtered(lambda r: r.l10n_do_fiscal_number and r.state != 'cancel')
+        if not records:
+            return
+        records._l10n_do_flush_fiscal_numbers()
+        # Los pares cubiertos por un mismo índice parcial ya los garantiza la base
+        # de datos; solo se consultan los que el índice no cubre.
+        self.env.cr.execute(
+            """
+            SELECT m.id
+              FROM account_move m
+              JOIN account_move o
+                ON o.company_id = m.company_id
+               AND o.l10n_do_fiscal_number = m.l10n_do_fiscal_number
+               AND o.id != m.id
+               AND o.state != 'cancel'
+             WHERE m.id IN %s
+               AND NOT (
+                    m.l10n_latam_document_type_id IS NOT NULL
+                    AND o.l10n_latam_document_type_id IS NOT NULL
+                    AND (
+                        (m.move_type NOT IN ('in_invoice', 'in_refund')
+                         AND o.move_type NOT IN ('in_invoice', 'in_refund'))
+                        OR (m.move_type IN ('in_invoice', 'in_refund')
+                            AND o.move_type IN ('in_invoice', 'in_refund')
+                            AND m.l10n_latam_manual_document_number = 'f'
+                            AND o.l10n_latam_manual_document_number = 'f')
+                    )
+               )
+             LIMIT 1
+            """,
+            [tuple(records.ids)],
+        )
+        if self.env.cr.fetchone():
+            raise ValidationError(str(_L10N_DO_DUPLICATED_NCF_MSG))
 
+    def _l10n_do_flush_fiscal_numbers(self):
+        """Escribe los cambios pendientes y traduce las violaciones de los índices
+        únicos de NCF al mismo mensaje de las restricciones Python."""
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.flush_model()
+        except psycopg2.errors.UniqueViolation as e:
+            message = _L10N_DO_UNIQUE_FISCAL_NUMBER_INDEXES.get(e.diag.constraint_name)
+            if not message:
+                raise
+            raise ValidationError(str(message)) from e
 
     def _auto_init(self):
         if not index_exists(self.env.cr, "account_move_account_move_unique_l10n_do_fiscal_number_sales"):
@@ -235,11 +315,29 @@ class AccountMove(models.Model):
                 WHERE (l10n_latam_document_type_id IS NOT NULL AND move_type IN ('in_invoice', 'in_refund', 'in_receipt')
                 AND l10n_latam_manual_document_number = 'f') AND l10n_do_fiscal_number <> '';
             """)
-        return super()._auto_init()
+        res = super()._auto_init()
+        # Búsqueda por prefijo de NCF (LIKE 'B01%') en _name_search
+        create_index(
+            self.env.cr,
+            "account_move_l10n_do_fiscal_number_prefix_index",
+            self._table,
+            ["l10n_do_fiscal_number varchar_pattern_ops"],
+            where="l10n_do_fiscal_number IS NOT NULL",
+        )
+        return res
 
 
     @api.model
     def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        if name and operator == "ilike" and _NCF_SEARCH_RE.match(name.strip()):
+            # Un NCF se busca por prefijo para aprovechar el índice btree
+            prefix = name.strip().upper() + "%"
+            domain = expression.AND([[
+                "|",
+                ("name", "=like", prefix),
+                ("l10n_do_fiscal_number", "=like", prefix),
+            ], domain])
+            return super()._name_search("", domain, operator, limit, order)
         if name:
             domain = expression.AND([[
                 "|",
@@ -248,46 +346,83 @@ class AccountMove(models.Model):
             ], domain])
         return super()._name_search(name, domain, operator, limit, order)
 
+    def _l10n_do_get_last_expiration_dates(self):
+        """Fecha de vencimiento del último comprobante publicado con la misma
+        compañía, tipo de factura y tipo de documento de cada factura.
+
+        Una sola consulta para todo el conjunto; se traen los dos últimos por
+        combinación para poder excluir la propia factura.
+
+        :return: dict {id de factura: fecha de vencimiento o False}
+        """
+        keys = {
+            (inv.company_id.id, inv.move_type, inv.l10n_latam_document_type_id.id)
+            for inv in self
+            if inv.l10n_latam_document_type_id
+        }
+        if not keys:
+            return {}
+        self.flush_model([
+            "company_id", "move_type", "l10n_latam_document_type_id",
+            "posted_before", "l10n_do_ncf_expiration_date", "invoice_date",
+        ])
+        self.env.cr.execute(
+            """
+            SELECT company_id, move_type, l10n_latam_document_type_id, id, l10n_do_ncf_expiration_date
+              FROM (
+                    SELECT company_id, move_type, l10n_latam_document_type_id, id,
+                           l10n_do_ncf_expiration_date,
+                           row_number() OVER (
+                               PARTITION BY company_id, move_type, l10n_latam_document_type_id
+                               ORDER BY invoice_date DESC, id DESC
+                           ) AS rank
+                      FROM account_move
+                     WHERE (company_id, move_type, l10n_latam_document_type_id) IN %s
+                       AND posted_before
+                       AND l10n_do_ncf_expiration_date IS NOT NULL
+                   ) last
+             WHERE rank <= 2
+             ORDER BY rank
+            """,
+            [tuple(keys)],
+        )
+        last_by_key = {}
+        for company_id, move_type, doc_type_id, move_id, expiration in self.env.cr.fetchall():
+            last_by_key.setdefault((company_id, move_type, doc_type_id), []).append((move_id, expiration))
+
+        result = {}
+        for inv in self:
+            key = (inv.company_id.id, inv.move_type, inv.l10n_latam_document_type_id.id)
+            own_id = inv.id or inv._origin.id
+            result[inv.id] = next(
+                (expiration for move_id, expiration in last_by_key.get(key, []) if move_id != own_id),
+                False,
+            )
+        return result
+
     def _l10n_do_is_new_expiration_date(self):
         self.ensure_one()
-        last_invoice = self.search(
-            [
-                ("company_id", "=", self.company_id.id),
-                ("move_type", "=", self.move_type),
-                (
-                    "l10n_latam_document_type_id",
-                    "=",
-                    self.l10n_latam_document_type_id.id,
-                ),
-                ("posted_before", "=", True),
-                ("id", "!=", self.id or self._origin.id),
-                ("l10n_do_ncf_expiration_date", "!=", False),
-            ],
-            order="invoice_date desc, id desc",
-            limit=1,
-        )
-        if not last_invoice:
+        last_expiration = self._l10n_do_get_last_expiration_dates().get(self.id)
+        if not last_expiration:
             return False
 
-        return (
-            last_invoice.l10n_do_ncf_expiration_date < self.l10n_do_ncf_expiration_date
-        )
+        return last_expiration < self.l10n_do_ncf_expiration_date
 
     @api.depends("l10n_do_ncf_expiration_date", "journal_id")
     def _compute_l10n_do_show_expiration_date_msg(self):
+        invoices = self.filtered(
+            lambda inv: inv.country_code == "DO"
+            and inv.l10n_latam_use_documents
+            and inv.l10n_latam_document_type_id
+            and not inv.l10n_latam_manual_document_number
+            and inv.l10n_do_ncf_expiration_date
+        )
+        last_expirations = invoices._l10n_do_get_last_expiration_dates()
         for inv in self:
-            if inv.country_code == "DO" and inv.l10n_latam_use_documents and inv.l10n_latam_document_type_id and not inv.l10n_latam_manual_document_number and inv.l10n_do_ncf_expiration_date:
-                last_invoice = self.search([
-                    ("company_id", "=", inv.company_id.id),
-                    ("move_type", "=", inv.move_type),
-                    ("l10n_latam_document_type_id", "=", inv.l10n_latam_document_type_id.id),
-                    ("posted_before", "=", True),
-                    ("id", "!=", inv.id or inv._origin.id),
-                    ("l10n_do_ncf_expiration_date", "!=", False),
-                ], order="invoice_date desc, id desc", limit=1)
-                inv.l10n_do_show_expiration_date_msg = bool(last_invoice and last_invoice.l10n_do_ncf_expiration_date < inv.l10n_do_ncf_expiration_date)
-            else:
-                inv.l10n_do_show_expiration_date_msg = False
+            last_expiration = last_expirations.get(inv.id)
+            inv.l10n_do_show_expiration_date_msg = bool(
+                last_expiration and last_expiration < inv.l10n_do_ncf_expiration_date
+            )
 
     @api.depends(
         "journal_id.l10n_latam_use_documents",
@@ -320,27 +455,44 @@ class AccountMove(models.Model):
 
     def _get_l10n_do_amounts(self):
         self.ensure_one()
-        amounts = {
-            "base_amount": 0.0,
-            "exempt_amount": 0.0,
-            "itbis_18_tax_amount": 0.0,
-            "itbis_18_base_amount": 0.0,
-            "itbis_16_tax_amount": 0.0,
-            "itbis_16_base_amount": 0.0,
-            "itbis_0_tax_amount": 0.0,
-            "itbis_0_base_amount": 0.0,
-            "itbis_withholding_amount": 0.0,
-            "itbis_withholding_base_amount": 0.0,
-            "isr_withholding_amount": 0.0,
-            "isr_withholding_base_amount": 0.0,
-            "l10n_do_invoice_total": 0.0,
-        }
-        for line in self.line_ids.filtered(lambda l: l.currency_id == self.currency_id):
-            line_amounts = line._get_l10n_do_line_amounts()
-            for key in amounts:
-                amounts[key] += line_amounts.get(key, 0.0)
-        return amounts
-    
+        return self._get_l10n_do_amounts_by_move()[self.id]
+
+    def _get_l10n_do_amounts_by_move(self):
+        """Calcula los montos DGII de todas las facturas en una sola pasada.
+
+        Los grupos de impuestos ITBIS/ISR se resuelven una vez por compañía y
+        las líneas se precargan juntas en lugar de factura por factura.
+        """
+        keys = (
+            "base_amount",
+            "exempt_amount",
+            "itbis_18_tax_amount",
+            "itbis_18_base_amount",
+            "itbis_16_tax_amount",
+            "itbis_16_base_amount",
+            "itbis_0_tax_amount",
+            "itbis_0_base_amount",
+            "itbis_withholding_amount",
+            "itbis_withholding_base_amount",
+            "isr_withholding_amount",
+            "isr_withholding_base_amount",
+            "l10n_do_invoice_total",
+        )
+        AccountMoveLine = self.env["account.move.line"]
+        tax_groups = {}
+        result = {}
+        for move in self:
+            amounts = dict.fromkeys(keys, 0.0)
+            company = move.company_id
+            if company.id not in tax_groups:
+                tax_groups[company.id] = AccountMoveLine._get_l10n_do_tax_groups(company)
+            for line in move.line_ids.filtered(lambda l: l.currency_id == move.currency_id):
+                line_amounts = line._get_l10n_do_line_amounts(tax_groups[company.id])
+                for key in keys:
+                    amounts[key] += line_amounts.get(key, 0.0)
+            result[move.id] = amounts
+        return result
+
     @api.depends("company_id", "l10n_latam_document_type_id")
     def _compute_is_ecf_invoice(self):
         for invoice in self.filtered(lambda inv: inv.state == "draft"):
@@ -374,11 +526,16 @@ class AccountMove(models.Model):
                     invoice.l10n_latam_manual_document_number = True
 
 
-    @api.depends("l10n_do_ecf_security_code", "l10n_do_ecf_sign_date", "invoice_date")
-    def _compute_l10n_do_electronic_stamp(self):
+    def _l10n_do_generate_electronic_stamp(self):
+        """Genera y guarda el sello electrónico (URL del QR) de los e-CF publicados.
+
+        Se ejecuta por lotes al publicar; la impresión de recibos y facturas
+        solo lee el valor almacenado.
+        """
         ecf_invoices = self.filtered(
             lambda i: i.is_ecf_invoice and not i.l10n_latam_manual_document_number and i.l10n_do_ecf_security_code and i.state == "posted"
         )
+        amounts_by_move = ecf_invoices._get_l10n_do_amounts_by_move()
         for invoice in ecf_invoices:
             env_type = invoice.company_id.l10n_do_ecf_service_env or "TesteCF"
             prefix = invoice.l10n_latam_document_type_id.doc_code_prefix
@@ -396,43 +553,62 @@ class AccountMove(models.Model):
             total_field = "l10n_do_invoice_total"
             if invoice.currency_id != invoice.company_id.currency_id:
                 total_field += "_currency"
-            total = invoice._get_l10n_do_amounts().get(total_field, 0)
+            total = amounts_by_move[invoice.id].get(total_field, 0)
             query["MontoTotal"] = ("%f" % total).rstrip("0").rstrip(".")
-            security_code = "".join(
-                f"%{c.encode('utf-8').hex()}".upper() if c in " !#$&'()*+,/:;=?@[]\"-.<>\\^_`" else c
-                for c in invoice.l10n_do_ecf_security_code or ""
+            query["CodigoSeguridad"] = (invoice.l10n_do_ecf_security_code or "").translate(
+                _ECF_SECURITY_CODE_QUOTE
             )
-            query["CodigoSeguridad"] = security_code
             qr_string = base_url + "&".join(f"{k}={v}" for k, v in query.items())
             invoice.l10n_do_electronic_stamp = urls.url_quote_plus(qr_string, safe="%")
-        (self - ecf_invoices).l10n_do_electronic_stamp = False
+        (self - ecf_invoices).filtered("l10n_do_electronic_stamp").l10n_do_electronic_stamp = False
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"l10n_do_ecf_security_code", "l10n_do_ecf_sign_date", "invoice_date"} & vals.keys():
+            self.filtered(lambda m: m.state == "posted")._l10n_do_generate_electronic_stamp()
+        return res
 
-    
     @api.constrains(
         "l10n_do_fiscal_number", "partner_id", "company_id", "posted_before"
     )
     def _l10n_do_check_unique_vendor_number(self):
-        for rec in self.filtered(
+        records = self.filtered(
             lambda inv: inv.l10n_do_fiscal_number
             and inv.country_code == "DO"
             and inv.l10n_latam_use_documents
             and inv.is_purchase_document()
             and inv.commercial_partner_id
-        ):
-            domain = [
-                ("move_type", "=", rec.move_type),
-                ("l10n_do_fiscal_number", "=", rec.l10n_do_fiscal_number),
-                ("company_id", "=", rec.company_id.id),
-                ("id", "!=", rec.id),
-                ("commercial_partner_id", "=", rec.commercial_partner_id.id),
-                ("state", "!=", "cancel"),
-            ]
-            if rec.search_count(domain):
-                raise ValidationError(
-                    _(
-                        "Vendor bill Fiscal Number must be unique per vendor and company."
-                    )
-                )
+        )
+        if not records:
+            return
+        records._l10n_do_flush_fiscal_numbers()
+        # Los comprobantes manuales con tipo de documento ya están cubiertos por
+        # el índice account_move_unique_l10n_do_fiscal_number_purchase_manual.
+        self.env.cr.execute(
+            """
+            SELECT m.id
+              FROM account_move m
+              JOIN account_move o
+                ON o.move_type = m.move_type
+               AND o.l10n_do_fiscal_number = m.l10n_do_fiscal_number
+               AND o.company_id = m.company_id
+               AND o.commercial_partner_id = m.commercial_partner_id
+               AND o.id != m.id
+               AND o.state != 'cancel'
+             WHERE m.id IN %s
+               AND NOT (
+                    m.l10n_latam_document_type_id IS NOT NULL
+                    AND o.l10n_latam_document_type_id IS NOT NULL
+                    AND m.move_type IN ('in_invoice', 'in_refund')
+                    AND m.l10n_latam_manual_document_number = 't'
+                    AND o.l10n_latam_manual_document_number = 't'
+               )
+             LIMIT 1
+            """,
+            [tuple(records.ids)],
+        )
+        if self.env.cr.fetchone():
+            raise ValidationError(str(_L10N_DO_DUPLICATED_VENDOR_NCF_MSG))
 
     @api.depends("l10n_do_fiscal_number")
     def _compute_l10n_latam_document_number(self):
@@ -464,7 +640,7 @@ class AccountMove(models.Model):
     def action_reverse(self):
         fiscal_invoice = self.filtered(
             lambda inv: inv.country_code == "DO"
-            and self.move_type[-6:] in ("nvoice", "refund")
+            and inv.move_type[-6:] in ("nvoice", "refund")
         )
         if fiscal_invoice and not self.env.user.has_group(
             "l10n_do_accounting.group_l10n_do_fiscal_credit_note"
@@ -502,28 +678,18 @@ class AccountMove(models.Model):
         ):
             return super()._get_l10n_latam_documents_domain()
 
-        internal_types = ["debit_note"]
-        if self.move_type in ["out_refund", "in_refund"]:
-            internal_types.append("credit_note")
-        else:
-            internal_types.append("invoice")
-
-        domain = [
-            ("internal_type", "in", internal_types),
-            ("country_id", "=", self.company_id.country_id.id),
-        ]
-        ncf_types = self.journal_id._get_journal_ncf_types(
-            counterpart_partner=self.partner_id.commercial_partner_id, invoice=self
+        journal = self.journal_id
+        partner = self.partner_id.commercial_partner_id
+        journal._l10n_do_check_ncf_requirements(partner)
+        doc_type_ids = journal._l10n_do_get_document_type_ids(
+            partner.l10n_do_dgii_tax_payer_type if partner else False,
+            bool(partner) and partner == journal.company_id.partner_id,
+            self.move_type,
+            bool(self.debit_origin_id) or self.env.context.get("internal_type") == "debit_note",
+            journal.company_id.l10n_do_ecf_issuer,
+            bool(self.env.context.get("use_documents", False)),
         )
-        domain += [
-            "|",
-            ("l10n_do_ncf_type", "=", False),
-            ("l10n_do_ncf_type", "in", ncf_types),
-        ]
-        codes = self.journal_id._get_journal_codes()
-        if codes:
-            domain.append(("code", "in", codes))
-        return domain
+        return [("id", "in", doc_type_ids)]
 
     @api.constrains("move_type", "l10n_latam_document_type_id")
     def _check_invoice_type_document_type(self):
@@ -592,16 +758,14 @@ class AccountMove(models.Model):
             and x.l10n_latam_document_type_id
             and x.country_code == "DO"
         )
+        expiration_dates = l10n_do_recs_with_journal_id.journal_id._l10n_do_get_expiration_dates()
         for move in l10n_do_recs_with_journal_id:
             move.l10n_latam_manual_document_number = (
                 move._is_l10n_do_manual_document_number()
             )
 
-            move.l10n_do_ncf_expiration_date = (
-                move.journal_id.l10n_do_document_type_ids.filtered(
-                    lambda doc: doc.l10n_latam_document_type_id
-                    == move.l10n_latam_document_type_id
-                ).l10n_do_ncf_expiration_date
+            move.l10n_do_ncf_expiration_date = expiration_dates.get(
+                (move.journal_id.id, move.l10n_latam_document_type_id.id), False
             )
 
         super(
@@ -623,42 +787,71 @@ class AccountMove(models.Model):
         return self.move_type in (
             "in_invoice",
             "in_refund",
-        ) and self.l10n_latam_document_type_id.l10n_do_ncf_type not in (
-            "minor",
-            "e-minor",
-            "informal",
-            "e-informal",
-            "exterior",
-            "e-exterior",
-        )
+        ) and self.l10n_latam_document_type_id.l10n_do_ncf_type not in L10N_DO_SELF_ISSUED_PURCHASE_NCF_TYPES
 
     def _get_debit_line_tax(self, debit_date):
-        if self.move_type == "out_invoice":
-            return (
-                self.company_id.account_sale_tax_id
-                or self.env.ref("account.%s_tax_18_sale" % self.company_id.id)
-                if (debit_date - self.invoice_date).days <= 30
-                and self.partner_id.l10n_do_dgii_tax_payer_type != "special"
-                else self.env.ref("account.%s_tax_0_sale" % self.company_id.id) or False
-            )
-        else:
-            return self.company_id.account_purchase_tax_id or self.env.ref(
-                "account.%s_tax_0_purch" % self.company_id.id
-            )
+        self.ensure_one()
+        return self._get_debit_line_taxes(debit_date)[self.id]
+
+    def _get_debit_line_taxes(self, debit_date=None):
+        """Impuesto de la línea de nota de débito para cada factura de origen.
+
+        Los impuestos de cada compañía se resuelven una sola vez. Sin
+        ``debit_date`` se usa la fecha de cada factura, como el asistente.
+
+        :return: dict {id de factura: account.tax}
+        """
+        taxes_by_company = {}
+        result = {}
+        for move in self:
+            company = move.company_id
+            if company not in taxes_by_company:
+                taxes_by_company[company] = {
+                    "sale": company.account_sale_tax_id
+                    or self.env.ref("account.%s_tax_18_sale" % company.id, raise_if_not_found=False)
+                    or self.env["account.tax"],
+                    "sale_exempt": self.env.ref("account.%s_tax_0_sale" % company.id, raise_if_not_found=False)
+                    or self.env["account.tax"],
+                    "purchase": company.account_purchase_tax_id
+                    or self.env.ref("account.%s_tax_0_purch" % company.id, raise_if_not_found=False)
+                    or self.env["account.tax"],
+                }
+            taxes = taxes_by_company[company]
+            if move.move_type == "out_invoice":
+                result[move.id] = (
+                    taxes["sale"]
+                    if ((debit_date or move.date) - move.invoice_date).days <= 30
+                    and move.partner_id.l10n_do_dgii_tax_payer_type != "special"
+                    else taxes["sale_exempt"]
+                )
+            else:
+                result[move.id] = taxes["purchase"]
+        return result
 
     def _post(self, soft=True):
         """Asegura que las facturas dominicanas obtengan el siguiente NCF al publicar."""
         l10n_do_invoices = self.filtered(
             lambda inv: inv.country_code == "DO" and inv.l10n_latam_use_documents
         )
-        
-        for invoice in l10n_do_invoices:
-            if invoice.move_type in ('out_invoice', 'out_refund') and not invoice.l10n_do_fiscal_number:
-                # Forzar la generación del siguiente NCF antes de publicar
-                invoice.with_context(is_l10n_do_seq=True)._set_next_sequence()
-                invoice.name = invoice.l10n_do_fiscal_number
+        # Sin transporte configurado los e-CF se publican pero no se encolan
+        ecf_to_queue = l10n_do_invoices.filtered(
+            lambda inv: inv.is_ecf_invoice
+            and inv.company_id.l10n_do_ecf_issuer
+            and inv.company_id.l10n_do_ecf_transport
+            and not inv.l10n_latam_manual_document_number
+        )
+
+        # Forzar la generación del siguiente NCF antes de publicar
+        l10n_do_invoices.filtered(
+            lambda inv: inv.move_type in ('out_invoice', 'out_refund') and not inv.l10n_do_fiscal_number
+        )._l10n_do_allocate_fiscal_numbers()
 
         res = super()._post(soft)
+        l10n_do_invoices._l10n_do_generate_electronic_stamp()
+        l10n_do_invoices.commercial_partner_id.filtered(
+            lambda p: not p.l10n_do_has_fiscal_documents
+        ).sudo().write({"l10n_do_has_fiscal_documents": True})
+        ecf_to_queue._l10n_do_enqueue_ecf()
 
         # Validaciones adicionales para facturas dominicanas
         for invoice in l10n_do_invoices.filtered(lambda inv: inv.l10n_latam_document_type_id):
@@ -669,6 +862,321 @@ class AccountMove(models.Model):
 
         return res
 
+    # -------------------------------------------------------------------------
+    # Importación masiva de facturas de proveedor
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _l10n_do_import_vendor_bills(self, rows, journal, account=None, taxes=None, batch_size=200):
+        """Crea facturas de proveedor a partir de filas ya leídas de un archivo.
+
+        Cada fila es un dict con ``vat``, ``ncf``, ``date``, ``amount`` y
+        opcionalmente ``expense_type`` y ``line`` (número de fila en el archivo).
+        Las validaciones de RNC, estructura del NCF y duplicados se hacen para
+        todo el archivo a la vez, con una consulta para socios y otra para NCF
+        existentes.
+
+        :return: (facturas creadas, lista de (fila, mensaje de error))
+        """
+        journal.ensure_one()
+        company = journal.company_id
+        errors = []
+        parsed = []
+        for index, row in enumerate(rows, start=1):
+            line = row.get("line", index)
+            vat = re.sub(r"\D", "", str(row.get("vat") or ""))
+            ncf = str(row.get("ncf") or "").strip().upper()
+            try:
+                date = fields.Date.to_date(row.get("date"))
+                amount = float(str(row.get("amount") or 0).replace(",", ""))
+            except ValueError:
+                errors.append((line, _("Fecha o monto inválido.")))
+                continue
+            if not vat:
+                errors.append((line, _("La fila no tiene RNC/Cédula.")))
+                continue
+            if not ncf or not date:
+                errors.append((line, _("La fila no tiene NCF o fecha.")))
+                continue
+            parsed.append({
+                "line": line,
+                "vat": vat,
+                "ncf": ncf,
+                "date": date,
+                "amount": amount,
+                "expense_type": row.get("expense_type") or False,
+            })
+
+        # Tipos de documento por prefijo (B01, E31, ...) y validación del NCF
+        doc_types = {
+            doc_type.doc_code_prefix: doc_type
+            for doc_type in self.env["l10n_latam.document.type"].search([
+                ("country_id.code", "=", "DO"),
+                ("internal_type", "=", "invoice"),
+                ("doc_code_prefix", "!=", False),
+            ])
+        }
+        by_doc_type = {}
+        for row in parsed:
+            row["doc_type"] = doc_types.get(row["ncf"].lstrip("P")[:3])
+            if not row["doc_type"]:
+                row["error"] = _("El NCF %s no corresponde a ningún tipo de comprobante.") % row["ncf"]
+                continue
+            by_doc_type.setdefault(row["doc_type"], []).append(row)
+        for doc_type, doc_rows in by_doc_type.items():
+            invalid = validate_numbers(doc_type.l10n_do_ncf_type, [r["ncf"] for r in doc_rows])
+            for position in invalid:
+                doc_rows[position]["error"] = _(
+                    "El NCF %s no cumple con la estructura establecida por la DGII."
+                ) % doc_rows[position]["ncf"]
+
+        # Socios por RNC (normalizado) en una sola consulta
+        vats = {row["vat"] for row in parsed}
+        partners = {}
+        if vats:
+            self.env["res.partner"].flush_model(["vat", "parent_id", "active", "company_id"])
+            self.env.cr.execute(
+                r"""
+                SELECT regexp_replace(vat, '\D', '', 'g'), id
+                  FROM res_partner
+                 WHERE regexp_replace(vat, '\D', '', 'g') IN %s
+                   AND parent_id IS NULL
+                   AND active
+                   AND (company_id IS NULL OR company_id = %s)
+                 ORDER BY id
+                """,
+                [tuple(vats), company.id],
+            )
+            for vat, partner_id in self.env.cr.fetchall():
+                partners.setdefault(vat, partner_id)
+
+            # Los proveedores que no existen se crean desde el registro local de RNC
+            registry = self.env["l10n_do.rnc.registry"]
+            new_partners = {}
+            for vat in vats - partners.keys():
+                data = registry._l10n_do_lookup(vat)
+                if data:
+                    new_partners[vat] = {
+                        "name": data["name"] or data["commercial_name"] or vat,
+                        "vat": vat,
+                        "country_id": self.env.ref("base.do").id,
+                        "is_company": len(vat) == 9,
+                    }
+            if new_partners:
+                created = self.env["res.partner"].create(list(new_partners.values()))
+                partners.update(zip(new_partners, created.ids))
+
+        # NCF ya registrados para esos socios en una sola consulta
+        ncfs = {row["ncf"] for row in parsed}
+        existing = set()
+        if ncfs:
+            self.flush_model(["l10n_do_fiscal_number", "commercial_partner_id", "company_id", "state", "move_type"])
+            self.env.cr.execute(
+                """
+                SELECT commercial_partner_id, l10n_do_fiscal_number
+                  FROM account_move
+                 WHERE company_id = %s
+                   AND move_type IN ('in_invoice', 'in_refund')
+                   AND state != 'cancel'
+                   AND l10n_do_fiscal_number IN %s
+                """,
+                [company.id, tuple(ncfs)],
+            )
+            existing = set(self.env.cr.fetchall())
+
+        Partner = self.env["res.partner"]
+        vals_by_line = []
+        for row in parsed:
+            partner_id = partners.get(row["vat"])
+            if not row.get("error") and not partner_id:
+                row["error"] = _("No existe un socio con RNC/Cédula %s.") % row["vat"]
+            if not row.get("error"):
+                key = (partner_id, row["ncf"])
+                if key in existing:
+                    row["error"] = _("El NCF %s ya está registrado para este proveedor.") % row["ncf"]
+                existing.add(key)
+            if row.get("error"):
+                errors.append((row["line"], row["error"]))
+                continue
+
+            line_vals = {
+                "name": row["ncf"],
+                "quantity": 1,
+                "price_unit": row["amount"],
+            }
+            if account:
+                line_vals["account_id"] = account.id
+            if taxes is not None:
+                line_vals["tax_ids"] = [Command.set(taxes.ids)]
+            vals_by_line.append((row["line"], {
+                "move_type": "in_invoice",
+                "journal_id": journal.id,
+                "partner_id": partner_id,
+                "invoice_date": row["date"],
+                "l10n_latam_document_type_id": row["doc_type"].id,
+                "l10n_latam_document_number": row["ncf"],
+                "l10n_do_expense_type": row["expense_type"] or Partner.browse(partner_id).l10n_do_expense_type,
+                "invoice_line_ids": [Command.create(line_vals)],
+            }))
+
+        moves = self.browse()
+        for start in range(0, len(vals_by_line), batch_size):
+            batch = vals_by_line[start:start + batch_size]
+            try:
+                with self.env.cr.savepoint():
+                    moves |= self.create([vals for _line, vals in batch])
+                continue
+            except (UserError, ValidationError, psycopg2.Error):
+                self.env.invalidate_all()
+            # El lote falló: se crea fila por fila para identificar los errores
+            for line, vals in batch:
+                try:
+                    with self.env.cr.savepoint():
+                        moves |= self.create(vals)
+                except (UserError, ValidationError, psycopg2.Error) as e:
+                    self.env.invalidate_all()
+                    errors.append((line, str(e)))
+
+        errors.sort()
+        return moves, errors
+
+    # -------------------------------------------------------------------------
+    # Envío de e-CF a la DGII
+    # -------------------------------------------------------------------------
+
+    def _l10n_do_check_ecf_transport(self):
+        """Impide encolar e-CF de empresas sin transporte de envío configurado."""
+        companies = self.company_id.filtered(lambda c: not c.l10n_do_ecf_transport)
+        if companies:
+            raise UserError(
+                _("Configure el transporte de envío e-CF de %s antes de emitir comprobantes electrónicos.")
+                % ", ".join(companies.mapped("display_name"))
+            )
+
+    def _l10n_do_enqueue_ecf(self):
+        """Pone las facturas en la cola de envío; el cron se encarga del resto."""
+        self._l10n_do_check_ecf_transport()
+        self.write({
+            "l10n_do_ecf_send_state": "to_send",
+            "l10n_do_ecf_send_attempts": 0,
+            "l10n_do_ecf_next_attempt": False,
+        })
+
+    @api.model
+    def _cron_l10n_do_send_ecf(self, batch_size=100, max_workers=4):
+        """Envía un lote de e-CF pendientes.
+
+        Las filas se bloquean con ``SKIP LOCKED`` para que varios workers de cron
+        puedan procesar lotes distintos al mismo tiempo.
+        """
+        self.flush_model(["l10n_do_ecf_send_state", "l10n_do_ecf_next_attempt"])
+        self.env.cr.execute(
+            """
+            SELECT id FROM account_move
+             WHERE l10n_do_ecf_send_state = 'to_send'
+               AND (l10n_do_ecf_next_attempt IS NULL OR l10n_do_ecf_next_attempt <= %s)
+          ORDER BY l10n_do_ecf_next_attempt NULLS FIRST, id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+            """,
+            (fields.Datetime.now(), batch_size),
+        )
+        moves = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if moves:
+            moves._l10n_do_send_ecf(max_workers=max_workers)
+        return moves
+
+    def _l10n_do_ecf_get_payload(self):
+        self.ensure_one()
+        return {
+            "move_id": self.id,
+            "RncEmisor": self.company_id.vat or "",
+            "ENCF": self.l10n_do_fiscal_number or "",
+            "xml": self.l10n_do_ecf_edi_file or b"",
+        }
+
+    def _l10n_do_ecf_get_transport(self, company):
+        """Retorna la función que envía un payload a la DGII para ``company``.
+
+        La función se ejecuta fuera del hilo principal, por lo que no debe
+        acceder al ORM. Otros módulos agregan transportes extendiendo la
+        selección ``l10n_do_ecf_transport`` y definiendo
+        ``_l10n_do_ecf_transport_<código>``.
+        """
+        if not company.l10n_do_ecf_transport:
+            raise UserError(_("La empresa %s no tiene transporte de envío e-CF configurado.") % company.display_name)
+        return getattr(self, "_l10n_do_ecf_transport_%s" % company.l10n_do_ecf_transport)(company)
+
+    def _l10n_do_ecf_transport_stub(self, company):
+        """Transporte simulado: acepta todo e-CF con e-NCF sin contactar a la DGII."""
+        def send(payload):
+            if not payload["ENCF"]:
+                return {"status": "rejected", "message": "e-NCF no informado"}
+            return {"status": "accepted", "uuid": str(uuid.uuid4()), "message": "Aceptado"}
+
+        return send
+
+    def _l10n_do_send_ecf(self, max_workers=4):
+        """Envía los e-CF en paralelo y registra latencia y resultado en ``account.ecf.log``."""
+        batch_ref = "%s-%s" % (fields.Datetime.now().strftime("%Y%m%d%H%M%S"), uuid.uuid4().hex[:6])
+        log_vals = []
+        for company, moves in self.grouped("company_id").items():
+            if not company.l10n_do_ecf_transport:
+                # Quedan en la cola hasta que se configure un transporte
+                _logger.warning(
+                    "La empresa %s no tiene transporte e-CF; %s documentos no enviados",
+                    company.display_name, len(moves),
+                )
+                continue
+            send = self._l10n_do_ecf_get_transport(company)
+            payloads = [move._l10n_do_ecf_get_payload() for move in moves]
+
+            def timed_send(payload):
+                start = time.perf_counter()
+                try:
+                    response = send(payload)
+                except Exception as e:
+                    response = {"status": "retry", "message": str(e)}
+                return response, (time.perf_counter() - start) * 1000
+
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(payloads)))) as executor:
+                results = list(executor.map(timed_send, payloads))
+
+            now = fields.Datetime.now()
+            for move, (response, latency) in zip(moves, results):
+                attempt = move.l10n_do_ecf_send_attempts + 1
+                status = response.get("status")
+                vals = {"l10n_do_ecf_send_attempts": attempt}
+                if status == "accepted":
+                    log_state = "accepted"
+                    vals.update(l10n_do_ecf_send_state="accepted", l10n_do_dgii_uuid=response.get("uuid"))
+                elif status == "retry" and attempt < L10N_DO_ECF_SEND_MAX_ATTEMPTS:
+                    # Falla de comunicación: se reintenta más tarde con espera exponencial
+                    log_state = "sent"
+                    vals["l10n_do_ecf_next_attempt"] = now + timedelta(
+                        seconds=L10N_DO_ECF_SEND_RETRY_DELAY * 2 ** (attempt - 1)
+                    )
+                else:
+                    log_state = "error"
+                    vals["l10n_do_ecf_send_state"] = "error"
+                move.write(vals)
+                log_vals.append({
+                    "move_id": move.id,
+                    "state": log_state,
+                    "uuid": response.get("uuid"),
+                    "response_message": response.get("message"),
+                    "date_sent": now,
+                    "batch_ref": batch_ref,
+                    "attempt": attempt,
+                    "latency": latency,
+                })
+        self.env["account.ecf.log"].create(log_vals)
+        _logger.info("Lote e-CF %s: %s documentos enviados", batch_ref, len(log_vals))
+        return batch_ref
+
+    def action_l10n_do_retry_ecf(self):
+        self.filtered(lambda m: m.l10n_do_ecf_send_state == "error")._l10n_do_enqueue_ecf()
+
     def _l10n_do_get_formatted_sequence(self):
         self.ensure_one()
         if not self._context.get("is_l10n_do_seq", False):
@@ -821,6 +1329,29 @@ class AccountMove(models.Model):
         )
         self._compute_split_sequence()
     
+    def _l10n_do_allocate_fiscal_numbers(self):
+        """Asigna NCF consecutivos en bloque.
+
+        Se busca la última secuencia una sola vez por (compañía, tipo de
+        documento, tipo de factura) y el resto del bloque se numera a partir de
+        ella, en el orden del conjunto.
+        """
+        groups = self.grouped(
+            lambda inv: (inv.company_id, inv.l10n_latam_document_type_id, inv.move_type)
+        )
+        for invoices in groups.values():
+            first = invoices[0].with_context(is_l10n_do_seq=True)
+            first._set_next_sequence()
+            first.name = first.l10n_do_fiscal_number
+            fmt, fmt_values = first._get_sequence_format_param(first.l10n_do_fiscal_number)
+            for invoice in invoices[1:]:
+                fmt_values["seq"] += 1
+                invoice.l10n_do_fiscal_number = invoice.l10n_latam_document_type_id._format_document_number(
+                    fmt.format(**fmt_values)
+                )
+                invoice._compute_split_sequence()
+                invoice.name = invoice.l10n_do_fiscal_number
+
     # TODO: handle l10n_latam_invoice_document _compute_name() inheritance shit
     @api.depends("l10n_do_fiscal_number", "move_type", "country_code", "l10n_latam_use_documents")
     def _compute_name(self):
@@ -874,17 +1405,19 @@ class AccountMove(models.Model):
                 raise ValidationError(_("Para montos iguales o mayores a RD$250,000 es obligatorio el RNC/Cédula."))
     def _validate_ecf_xml_schema(self):
         self.ensure_one()
-        if not self.l10n_do_ecf_edi_file:
-            return
-
-        xsd_path = get_module_resource('l10n_do_accounting', 'static', 'xsd', 'ECFv1_3.xsd')
-        with open(xsd_path, 'rb') as f:
-            schema_doc = etree.XML(f.read())
-            schema = etree.XMLSchema(schema_doc)
+        l10n_do_ecf_edi_file.validate_ecf_xml_schema(self)
+
+    def _validate_ecf_xml_schemas(self):
+        """Valida en lote los XML e-CF con el mismo esquema compilado."""
+        errors = l10n_do_ecf_edi_file.validate_many(self)
+        if errors:
+            moves = self.browse(list(errors))
+            raise ValidationError(
+                _("Los siguientes archivos e-CF no son válidos según el XSD:\n%s")
+                % "\n".join(f"{move.display_name}: {errors[move.id]}" for move in moves)
+            )
 
-        xml_data = base64.b64decode(self.l10n_do_ecf_edi_file)
-        doc = etree.XML(xml_data)
-        try:
-            schema.assertValid(doc)
-        except Exception as e:
-            raise ValidationError(_("El archivo e-CF no es válido según el XSD: %s") % str(e))
+    def _register_hook(self):
+        # El XSD puede cambiar con una actualización del módulo
+        l10n_do_ecf_edi_file.clear_schema_cache()
+        return super()._register_hook()
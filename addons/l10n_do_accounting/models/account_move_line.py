@@ -77,21 +77,30 @@ class AccountMoveLine(models.Model):
         for line in self:
             line.l10n_do_discount_amount = (line.discount / 100.0) * line.price_unit * line.quantity
     
-    def _get_l10n_do_line_amounts(self):
+    @api.model
+    def _get_l10n_do_tax_groups(self, company):
+        """Retorna los grupos de impuestos (ITBIS, ISR) de la compañía."""
+        TaxGroup = self.env["account.tax.group"]
+        group_itbis = TaxGroup.search([
+            ("name", "ilike", "ITBIS"),
+            ("company_id", "=", company.id),
+        ], limit=1)
+        group_isr = TaxGroup.search([
+            ("name", "ilike", "ISR"),
+            ("company_id", "=", company.id),
+        ], limit=1)
+        return group_itbis, group_isr
+
+    def _get_l10n_do_line_amounts(self, tax_groups=None):
         """
         Retorna un diccionario con los montos agrupados por tipo de impuesto (ITBIS, ISR).
         Incluye cálculos para diferentes tasas y retenciones.
+
+        :param tax_groups: tupla (grupo ITBIS, grupo ISR) ya resuelta para evitar
+            buscarla en cada llamada cuando se procesan varias facturas.
         """
         # Buscar grupos de impuestos ITBIS e ISR
-        group_itbis = self.env["account.tax.group"].search([
-            ("name", "ilike", "ITBIS"),
-            ("company_id", "=", self.company_id.id),
-        ], limit=1)
-
-        group_isr = self.env["account.tax.group"].search([
-            ("name", "ilike", "ISR"),
-            ("company_id", "=", self.company_id.id),
-        ], limit=1)
+        group_itbis, group_isr = tax_groups or self._get_l10n_do_tax_groups(self.company_id)
 
         # Separar líneas de impuestos por grupo
         tax_lines = self.filtered(lambda x: x.tax_group_id in (group_itbis, group_isr))
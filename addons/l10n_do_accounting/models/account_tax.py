@@ -0,0 +1,40 @@
+from odoo import api, models, tools
+
+
+class AccountTax(models.Model):
+    _inherit = "account.tax"
+
+    @api.model
+    def _l10n_do_get_dgii_tax_categories(self):
+        """Categoría DGII de cada impuesto: {id de impuesto: categoría}."""
+        self.env["account.tax.group"].flush_model(["l10n_do_dgii_tax_category"])
+        self.flush_model(["tax_group_id"])
+        return self._l10n_do_get_dgii_tax_categories_cached()
+
+    @tools.ormcache()
+    def _l10n_do_get_dgii_tax_categories_cached(self):
+        self.env.cr.execute(
+            """
+            SELECT tax.id, tax_group.l10n_do_dgii_tax_category
+              FROM account_tax tax
+              JOIN account_tax_group tax_group ON tax_group.id = tax.tax_group_id
+            """
+        )
+        return dict(self.env.cr.fetchall())
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        taxes = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return taxes
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "tax_group_id" in vals:
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
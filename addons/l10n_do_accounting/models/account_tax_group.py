@@ -0,0 +1,44 @@
+from odoo import api, fields, models
+
+L10N_DO_DGII_TAX_CATEGORIES = [
+    ("itbis", "ITBIS"),
+    ("isc", "Impuesto Selectivo al Consumo"),
+    ("tip", "Propina Legal"),
+    ("other", "Otros Impuestos/Tasas"),
+]
+
+
+class AccountTaxGroup(models.Model):
+    _inherit = "account.tax.group"
+
+    l10n_do_dgii_tax_category = fields.Selection(
+        L10N_DO_DGII_TAX_CATEGORIES,
+        string="Categoría DGII",
+        compute="_compute_l10n_do_dgii_tax_category",
+        store=True,
+        readonly=False,
+        precompute=True,
+        help="Clasificación del grupo en los reportes de la DGII.",
+    )
+
+    @api.depends("name")
+    def _compute_l10n_do_dgii_tax_category(self):
+        """Propone la categoría a partir del nombre; luego puede ajustarse a mano."""
+        for group in self:
+            if group.l10n_do_dgii_tax_category:
+                continue
+            name = (group.with_context(lang="en_US").name or "").upper()
+            if "PROPINA" in name:
+                group.l10n_do_dgii_tax_category = "tip"
+            elif "SELECTIVO" in name or "ISC" in name.split():
+                group.l10n_do_dgii_tax_category = "isc"
+            elif "ITBIS" in name and "RETEN" not in name:
+                group.l10n_do_dgii_tax_category = "itbis"
+            else:
+                group.l10n_do_dgii_tax_category = "other"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "l10n_do_dgii_tax_category" in vals:
+            self.env.registry.clear_cache()
+        return res
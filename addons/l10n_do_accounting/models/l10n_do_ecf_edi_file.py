@@ -1,21 +1,105 @@
+import base64
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from lxml import etree
+
+from odoo import _
 from odoo.exceptions import ValidationError
-import base64
+from odoo.tools.misc import file_path
+
+ECF_XSD_PATH = "l10n_do_accounting/static/xsd/ECFv1_3.xsd"
+
+# Cache del XSD compilado. Un ``etree.XMLSchema`` de lxml no es seguro para
+# uso concurrente (``validate`` escribe en su ``error_log``), por lo que cada
+# hilo del servidor compila y guarda su propia instancia. La clave incluye la
+# fecha de modificación del archivo y una generación que ``clear_schema_cache``
+# incrementa, de modo que una actualización del módulo invalida la copia de
+# todos los hilos.
+_schema_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_generation = 0
+
+
+def clear_schema_cache():
+    global _schema_generation
+    with _schema_lock:
+        _schema_generation += 1
+    _schema_local.__dict__.clear()
+
+
+def get_ecf_schema():
+    """Retorna el ``etree.XMLSchema`` del e-CF del hilo actual.
+
+    El esquema se compila una sola vez por hilo; nunca se comparte una misma
+    instancia entre hilos.
+    """
+    path = file_path(ECF_XSD_PATH)
+    key = (path, os.path.getmtime(path), _schema_generation)
+    cached = getattr(_schema_local, "schema", None)
+    if cached is None or cached[0] != key:
+        with open(path, "rb") as f:
+            cached = (key, etree.XMLSchema(etree.XML(f.read())))
+        _schema_local.schema = cached
+    return cached[1]
 
-def _validate_ecf_xml_schema(self):
-    self.ensure_one()
-    if not self.l10n_do_ecf_edi_file:
-        return
 
-    # Ruta al archivo XSD (debes cargarlo a tu módulo)
-    xsd_path = get_module_resource('l10n_do_accounting', 'static', 'xsd', 'ECFv1_3.xsd')
-    with open(xsd_path, 'rb') as f:
-        schema_doc = etree.XML(f.read())
-        schema = etree.XMLSchema(schema_doc)
+def _schema_error(schema):
+    """Mensaje del último error de ``schema``, leído en el hilo que validó."""
+    error = schema.error_log.last_error
+    return str(error) if error is not None else _("Documento no válido según el XSD")
+
+
+def _parse_ecf(edi_file):
+    return etree.XML(base64.b64decode(edi_file))
+
+
+def validate_many(moves, max_workers=4):
+    """Valida los XML e-CF de ``moves`` contra el XSD compilado una sola vez.
+
+    El decodificado y el parseo de los XML se hacen en hilos (lxml libera el
+    GIL mientras parsea); la validación y la lectura de ``error_log`` se
+    hacen solo en el hilo actual, con su propio esquema, porque un
+    ``XMLSchema`` de lxml no es seguro para uso concurrente.
+
+    :return: dict {move_id: mensaje de error} solo con los documentos inválidos
+    """
+    data = [
+        (move["id"], move["l10n_do_ecf_edi_file"])
+        for move in moves.read(["l10n_do_ecf_edi_file"])
+        if move["l10n_do_ecf_edi_file"]
+    ]
+    if not data:
+        return {}
+
+    schema = get_ecf_schema()
+    errors = {}
+
+    def parse(item):
+        move_id, edi_file = item
+        try:
+            return move_id, _parse_ecf(edi_file), None
+        except Exception as e:
+            return move_id, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(data))) as executor:
+        for move_id, doc, error in executor.map(parse, data):
+            if error is None and not schema.validate(doc):
+                error = _schema_error(schema)
+            if error:
+                errors[move_id] = error
+    return errors
+
+
+def validate_ecf_xml_schema(move):
+    """Valida el XML e-CF de una factura y lanza ``ValidationError`` si no es válido."""
+    move.ensure_one()
+    if not move.l10n_do_ecf_edi_file:
+        return
 
+    schema = get_ecf_schema()
     try:
-        xml = base64.b64decode(self.l10n_do_ecf_edi_file)
-        doc = etree.XML(xml)
-        schema.assertValid(doc)
+        schema.assertValid(_parse_ecf(move.l10n_do_ecf_edi_file))
     except Exception as e:
-        raise ValidationError(_("El archivo XML e-CF no es válido: %s") % str(e))
+        raise ValidationError(_("El archivo e-CF no es válido según el XSD: %s") % str(e))
@@ -0,0 +1,151 @@
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+
+from .l10n_latam_document_type import L10N_DO_SELF_ISSUED_PURCHASE_NCF_TYPES
+
+
+class L10nDoNcfRange(models.Model):
+    """Rango de NCF autorizado por la DGII para un tipo de comprobante."""
+
+    _name = "l10n_do.ncf.range"
+    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _description = "Rango de NCF autorizado"
+    _order = "expiration_date, id"
+
+    name = fields.Char("Descripción", compute="_compute_name")
+    active = fields.Boolean(default=True)
+    company_id = fields.Many2one(
+        "res.company", string="Compañía", required=True, default=lambda self: self.env.company
+    )
+    l10n_latam_document_type_id = fields.Many2one(
+        "l10n_latam.document.type",
+        string="Tipo de Comprobante Fiscal (NCF)",
+        required=True,
+        domain="[('country_id.code', '=', 'DO'), ('l10n_do_ncf_type', '!=', False)]",
+    )
+    number_from = fields.Integer("Desde", required=True, default=1, tracking=True)
+    number_to = fields.Integer("Hasta", required=True, tracking=True)
+    expiration_date = fields.Date("Fecha de vencimiento", required=True, tracking=True)
+    user_id = fields.Many2one(
+        "res.users", string="Responsable", default=lambda self: self.env.user,
+        help="Usuario que recibe las alertas del rango.",
+    )
+    alert_remaining = fields.Integer(
+        "Alertar con", default=100,
+        help="Cantidad de números restantes a partir de la cual se genera una alerta.",
+    )
+    alert_days = fields.Integer(
+        "Días de aviso", default=30,
+        help="Días antes del vencimiento a partir de los cuales se genera una alerta.",
+    )
+    last_number = fields.Integer("Último usado", compute="_compute_usage")
+    used_count = fields.Integer("Usados", compute="_compute_usage")
+    remaining = fields.Integer("Restantes", compute="_compute_usage")
+    state = fields.Selection(
+        [
+            ("available", "Disponible"),
+            ("warning", "Por agotarse"),
+            ("exhausted", "Agotado"),
+            ("expired", "Vencido"),
+        ],
+        string="Estado",
+        compute="_compute_usage",
+    )
+
+    @api.constrains("number_from", "number_to")
+    def _check_numbers(self):
+        for ncf_range in self:
+            if ncf_range.number_from <= 0 or ncf_range.number_to < ncf_range.number_from:
+                raise ValidationError(_("El rango de NCF no es válido."))
+
+    @api.depends("l10n_latam_document_type_id", "number_from", "number_to")
+    def _compute_name(self):
+        for ncf_range in self:
+            prefix = ncf_range.l10n_latam_document_type_id.doc_code_prefix or ""
+            ncf_range.name = "%s %s - %s" % (prefix, ncf_range.number_from, ncf_range.number_to)
+
+    def _get_usage(self):
+        """Último número y cantidad de NCF emitidos dentro de cada rango.
+
+        Se cuentan las facturas y notas de crédito de venta y, para los
+        comprobantes que la empresa emite al comprar (gastos menores,
+        proveedores informales, pagos al exterior), también las de compra.
+
+        :return: dict {id de rango: (último número, cantidad)}
+        """
+        ranges = self.filtered("id")
+        if not ranges:
+            return {}
+        self.env["account.move"].flush_model([
+            "company_id", "l10n_latam_document_type_id", "l10n_do_fiscal_number", "state", "move_type",
+        ])
+        self.env["l10n_latam.document.type"].flush_model(["l10n_do_ncf_type"])
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            SELECT r.id, max(m.number), count(m.number)
+              FROM l10n_do_ncf_range r
+              JOIN l10n_latam_document_type d ON d.id = r.l10n_latam_document_type_id
+              LEFT JOIN LATERAL (
+                    SELECT CASE WHEN l10n_do_fiscal_number ~ '^[BE][0-9]{10,12}$'
+                                THEN substring(l10n_do_fiscal_number FROM 4)::bigint
+                           END AS number
+                      FROM account_move
+                     WHERE company_id = r.company_id
+                       AND l10n_latam_document_type_id = r.l10n_latam_document_type_id
+                       AND (
+                            move_type IN ('out_invoice', 'out_refund')
+                            OR (
+                                move_type IN ('in_invoice', 'in_refund')
+                                AND d.l10n_do_ncf_type IN %s
+                            )
+                       )
+                       AND state = 'posted'
+              ) m ON m.number BETWEEN r.number_from AND r.number_to
+             WHERE r.id IN %s
+             GROUP BY r.id
+            """,
+            [L10N_DO_SELF_ISSUED_PURCHASE_NCF_TYPES, tuple(ranges.ids)],
+        )
+        return {range_id: (last or 0, count) for range_id, last, count in self.env.cr.fetchall()}
+
+    @api.depends("number_from", "number_to", "expiration_date", "alert_remaining", "alert_days")
+    def _compute_usage(self):
+        usage = self._get_usage()
+        today = fields.Date.context_today(self)
+        for ncf_range in self:
+            last_number, used_count = usage.get(ncf_range.id, (0, 0))
+            ncf_range.last_number = last_number
+            ncf_range.used_count = used_count
+            ncf_range.remaining = ncf_range.number_to - max(last_number, ncf_range.number_from - 1)
+            if ncf_range.expiration_date and ncf_range.expiration_date < today:
+                ncf_range.state = "expired"
+            elif ncf_range.remaining <= 0:
+                ncf_range.state = "exhausted"
+            elif ncf_range.remaining <= ncf_range.alert_remaining or (
+                ncf_range.expiration_date
+                and (ncf_range.expiration_date - today).days <= ncf_range.alert_days
+            ):
+                ncf_range.state = "warning"
+            else:
+                ncf_range.state = "available"
+
+    @api.model
+    def _cron_l10n_do_check_ncf_ranges(self):
+        """Programa una actividad para los rangos por agotarse, agotados o vencidos."""
+        activity_type = self.env.ref("mail.mail_activity_data_warning")
+        for ncf_range in self.search([]):
+            if ncf_range.state == "available" or ncf_range.activity_ids.filtered(
+                lambda a: a.activity_type_id == activity_type
+            ):
+                continue
+            ncf_range.activity_schedule(
+                activity_type_id=activity_type.id,
+                summary=_("Rango de NCF %s: %s") % (
+                    ncf_range.name, dict(self._fields["state"].selection)[ncf_range.state]
+                ),
+                note=_("Quedan %s números disponibles; vence el %s.") % (
+                    ncf_range.remaining, ncf_range.expiration_date
+                ),
+                user_id=(ncf_range.user_id or self.env.user).id,
+            )
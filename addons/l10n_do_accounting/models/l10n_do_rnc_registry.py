@@ -0,0 +1,145 @@
+import io
+import logging
+import re
+import zipfile
+
+from odoo import _, api, fields, models, tools
+from odoo.exceptions import UserError
+from odoo.tools import frozendict
+
+_logger = logging.getLogger(__name__)
+
+# Caracteres que deben escaparse en el formato de texto de COPY
+_COPY_ESCAPE = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value):
+    value = (value or "").strip()
+    return value.translate(_COPY_ESCAPE) if value else "\\N"
+
+
+class L10nDoRncRegistry(models.Model):
+    """Copia local del padrón de RNC publicado por la DGII."""
+
+    _name = "l10n_do.rnc.registry"
+    _description = "Registro de RNC (DGII)"
+    _rec_name = "rnc"
+    _order = "rnc"
+
+    rnc = fields.Char("RNC/Cédula", required=True, readonly=True)
+    name = fields.Char("Razón social", readonly=True)
+    commercial_name = fields.Char("Nombre comercial", readonly=True)
+    activity = fields.Char("Actividad económica", readonly=True)
+    state = fields.Char("Estado", readonly=True)
+
+    _sql_constraints = [
+        # El índice único (btree) es el que usan las búsquedas por RNC
+        ("rnc_unique", "unique(rnc)", "El RNC ya existe en el registro."),
+    ]
+
+    @api.model
+    def _l10n_do_lookup(self, rnc):
+        """Datos del RNC en el registro local, o ``None`` si no existe."""
+        rnc = re.sub(r"\D", "", rnc or "")
+        return self._l10n_do_lookup_cached(rnc) if rnc else None
+
+    @tools.ormcache("rnc")
+    def _l10n_do_lookup_cached(self, rnc):
+        self.env.cr.execute(
+            "SELECT name, commercial_name, state FROM l10n_do_rnc_registry WHERE rnc = %s",
+            [rnc],
+        )
+        row = self.env.cr.fetchone()
+        if not row:
+            return None
+        return frozendict(rnc=rnc, name=row[0], commercial_name=row[1], state=row[2])
+
+    @api.model
+    def _l10n_do_load_file(self, fileobj, chunk_size=50000):
+        """Carga el archivo de RNC de la DGII (TXT o ZIP) usando COPY.
+
+        El archivo se lee línea a línea y se envía a una tabla temporal en
+        bloques de ``chunk_size`` filas; luego se actualiza el registro con un
+        único ``INSERT ... ON CONFLICT``. Si un RNC aparece varias veces en
+        el archivo, prevalece la última fila.
+
+        :return: cantidad de filas leídas
+        """
+        if zipfile.is_zipfile(fileobj):
+            archive = zipfile.ZipFile(fileobj)
+            member = next((n for n in archive.namelist() if n.lower().endswith(".txt")), None)
+            if member is None:
+                raise UserError(_("El archivo ZIP no contiene un archivo de RNC (.txt)."))
+            fileobj = archive.open(member)
+        else:
+            fileobj.seek(0)
+        lines = io.TextIOWrapper(fileobj, encoding="latin-1", newline="")
+
+        cr = self.env.cr
+        cr.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS l10n_do_rnc_registry_load (
+                position bigint, rnc varchar, name varchar, commercial_name varchar,
+                activity varchar, state varchar
+            ) ON COMMIT DROP;
+            TRUNCATE l10n_do_rnc_registry_load;
+            """
+        )
+
+        def copy(buffer):
+            buffer.seek(0)
+            cr.copy_expert(
+                "COPY l10n_do_rnc_registry_load"
+                " (position, rnc, name, commercial_name, activity, state) FROM STDIN",
+                buffer,
+            )
+
+        buffer = io.StringIO()
+        count = pending = 0
+        for line in lines:
+            parts = line.rstrip("\r\n").split("|")
+            rnc = re.sub(r"\D", "", parts[0])
+            if not rnc or len(parts) < 2:
+                continue
+            parts += [""] * (10 - len(parts))
+            count += 1
+            buffer.write("\t".join([
+                str(count),
+                rnc,
+                _copy_value(parts[1]),
+                _copy_value(parts[2]),
+                _copy_value(parts[3]),
+                _copy_value(parts[9]),
+            ]) + "\n")
+            pending += 1
+            if pending == chunk_size:
+                copy(buffer)
+                buffer = io.StringIO()
+                pending = 0
+        if pending:
+            copy(buffer)
+
+        self.flush_model()
+        cr.execute(
+            """
+            INSERT INTO l10n_do_rnc_registry
+                   (rnc, name, commercial_name, activity, state,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT DISTINCT ON (rnc) rnc, name, commercial_name, activity, state,
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM l10n_do_rnc_registry_load
+          ORDER BY rnc, position DESC
+            ON CONFLICT (rnc) DO UPDATE
+               SET name = EXCLUDED.name,
+                   commercial_name = EXCLUDED.commercial_name,
+                   activity = EXCLUDED.activity,
+                   state = EXCLUDED.state,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            """,
+            {"uid": self.env.uid},
+        )
+        self.invalidate_model()
+        self.env.registry.clear_cache()
+        _logger.info("Registro de RNC: %s filas cargadas", count)
+        return count
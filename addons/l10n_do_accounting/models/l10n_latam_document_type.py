@@ -1,37 +1,88 @@
-from re import compile
-from odoo import models, fields, _
+import re
+
+from odoo import api, models, fields, _
 from odoo.exceptions import ValidationError
 
+L10N_DO_NCF_TYPES = [
+    ("fiscal", "01"),
+    ("consumer", "02"),            # Consumo
+    ("debit_note", "03"),          # Nota de Débito
+    ("credit_note", "04"),         # Nota de Crédito
+    ("informal", "11"),            # Proveedores informales
+    ("unique", "12"),              # Regímenes únicos de tributación
+    ("minor", "13"),               # Gastos menores
+    ("special", "14"),             # Rentas presuntas
+    ("governmental", "15"),        # Gubernamentales
+    ("export", "16"),              # Exportaciones
+    ("exterior", "17"),            # Pagos al exterior
+    ("e-fiscal", "31"),
+    ("e-consumer", "32"),
+    ("e-debit_note", "33"),
+    ("e-credit_note", "34"),
+    ("e-informal", "41"),
+    ("e-minor", "43"),
+    ("e-special", "44"),
+    ("e-governmental", "45"),
+    ("e-export", "46"),
+    ("e-exterior", "47"),
+    ("in_fiscal", "01"),  # Interno, mismo que fiscal
+]
+
+# Campos que definen los tipos de documento permitidos por diario
+# (account.journal._l10n_do_get_document_type_ids); solo su cambio limpia la caché
+L10N_DO_DOCUMENT_TYPE_CACHE_FIELDS = {
+    "active",
+    "code",
+    "country_id",
+    "internal_type",
+    "l10n_do_ncf_type",
+    "sequence",
+}
+
+# Comprobantes que la propia empresa emite al registrar una compra
+L10N_DO_SELF_ISSUED_PURCHASE_NCF_TYPES = (
+    "minor",
+    "e-minor",
+    "informal",
+    "e-informal",
+    "exterior",
+    "e-exterior",
+)
+
+# Expresión regular según normativas 2025:
+# ECF: E + tipo + 10 dígitos = 13 caracteres
+# NCF físico: B + tipo + 8 dígitos = 11 caracteres
+# Opcionalmente se permite el prefijo P para preimpresos: PE / PB
+L10N_DO_NCF_PATTERNS = {
+    ncf_type: re.compile(r"^(P?)([EB])%s(\d{10}|\d{8})$" % code)
+    for ncf_type, code in L10N_DO_NCF_TYPES
+}
+
+
+def validate_numbers(ncf_type, numbers):
+    """Valida en una sola pasada una lista de NCF de un mismo tipo.
+
+    :param ncf_type: valor de ``l10n_do_ncf_type`` (ej. ``"fiscal"``)
+    :param numbers: iterable de números de comprobante
+    :return: dict {posición: número} con los números inválidos
+    """
+    pattern = L10N_DO_NCF_PATTERNS.get(ncf_type)
+    if pattern is None:
+        return {i: number for i, number in enumerate(numbers)}
+    match = pattern.match
+    return {
+        i: number
+        for i, number in enumerate(numbers)
+        if not number or not match(number)
+    }
+
 
 class L10nLatamDocumentType(models.Model):
     _inherit = "l10n_latam.document.type"
 
     def _get_l10n_do_ncf_types(self):
         """Retorna los tipos de comprobantes fiscales (NCF/ECF) utilizados en República Dominicana."""
-        return [
-            ("fiscal", "01"),
-            ("consumer", "02"),            # Consumo
-            ("debit_note", "03"),          # Nota de Débito
-            ("credit_note", "04"),         # Nota de Crédito
-            ("informal", "11"),            # Proveedores informales
-            ("unique", "12"),              # Regímenes únicos de tributación
-            ("minor", "13"),               # Gastos menores
-            ("special", "14"),             # Rentas presuntas
-            ("governmental", "15"),        # Gubernamentales
-            ("export", "16"),              # Exportaciones
-            ("exterior", "17"),            # Pagos al exterior
-            ("e-fiscal", "31"),
-            ("e-consumer", "32"),
-            ("e-debit_note", "33"),
-            ("e-credit_note", "34"),
-            ("e-informal", "41"),
-            ("e-minor", "43"),
-            ("e-special", "44"),
-            ("e-governmental", "45"),
-            ("e-export", "46"),
-            ("e-exterior", "47"),
-            ("in_fiscal", "01"),  # Interno, mismo que fiscal
-        ]
+        return L10N_DO_NCF_TYPES
         
     l10n_do_company_in_contingency = fields.Boolean("Empresa en contingencia")
     
@@ -67,6 +118,23 @@ class L10nLatamDocumentType(models.Model):
         default=False,
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        if L10N_DO_DOCUMENT_TYPE_CACHE_FIELDS.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
     def _format_document_number(self, document_number):
         """Valida y formatea un número de NCF/ECF basado en la estructura DGII 2025."""
         self.ensure_one()
@@ -78,24 +146,10 @@ class L10nLatamDocumentType(models.Model):
         if not document_number:
             return False
 
-        # Obtener el código del tipo de NCF (ej. "31", "04", etc.)
-        ncf_code = dict(self._get_l10n_do_ncf_types()).get(self.l10n_do_ncf_type)
-        if not ncf_code:
+        pattern = L10N_DO_NCF_PATTERNS.get(self.l10n_do_ncf_type)
+        if not pattern:
             raise ValidationError(_("El tipo de NCF seleccionado no es válido o no está definido."))
 
-        # Expresión regular según normativas 2025:
-        # ECF: E + tipo + 10 dígitos = 13 caracteres
-        # NCF físico: B + tipo + 8 dígitos = 11 caracteres
-        # Opcionalmente se permite el prefijo P para preimpresos: PE / PB
-        regex = (
-            r"^(P?)"                       # Prefijo opcional "P"
-            r"([EB])"                      # Debe comenzar con E o B
-            r"%s"                          # Código del tipo (ej. 31, 02)
-            r"(\d{10}|\d{8})$"             # 10 dígitos si es E, 8 si es B
-        ) % ncf_code
-
-        pattern = compile(regex)
-
         if not pattern.match(document_number):
             raise ValidationError(
                 _("El NCF '%s' no cumple con la estructura establecida por la DGII para el tipo '%s'.") %
@@ -103,3 +157,19 @@ class L10nLatamDocumentType(models.Model):
             )
 
         return document_number
+
+    def _l10n_do_validate_numbers(self, numbers):
+        """Valida varios NCF de este tipo y reporta todos los inválidos en un
+        solo ``ValidationError``."""
+        self.ensure_one()
+        if not self.l10n_do_ncf_type:
+            raise ValidationError(_("El tipo de NCF seleccionado no es válido o no está definido."))
+        invalid = validate_numbers(self.l10n_do_ncf_type, numbers)
+        if invalid:
+            raise ValidationError(
+                _("Los siguientes NCF no cumplen con la estructura establecida por la DGII para el tipo '%s':\n%s")
+                % (
+                    self.l10n_do_ncf_type,
+                    "\n".join(_("Línea %s: %s") % (i + 1, number or "") for i, number in invalid.items()),
+                )
+            )
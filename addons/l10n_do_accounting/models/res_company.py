@@ -19,6 +19,21 @@ class ResCompany(models.Model):
         help="Indica si la empresa tiene autorización para emitir e-CF de forma diferida, por ejemplo, con dispositivos móviles fuera de línea (Handheld)."
     )
 
+    l10n_do_ecf_transport = fields.Selection(
+        selection=[("stub", "Modo de pruebas (simulado, no envía a la DGII)")],
+        string="Transporte de envío e-CF",
+        help="Medio utilizado por la cola de envío para remitir los e-CF a la DGII. "
+        "Mientras no se configure, los e-CF no se ponen en cola ni se envían. "
+        "El modo de pruebas acepta todos los documentos sin contactar a la DGII.",
+    )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"l10n_do_ecf_issuer", "country_id"}.intersection(vals):
+            # Los tipos de documento permitidos por diario dependen de estos campos
+            self.env.registry.clear_cache()
+        return res
+
     def _localization_use_documents(self):
         """La localización dominicana usa documentos fiscales (NCF)."""
         self.ensure_one()
@@ -1,5 +1,57 @@
+import logging
+
 from odoo import models, fields, api, _
 from odoo.exceptions import AccessError
+from odoo.tools.sql import column_exists, create_column
+
+_logger = logging.getLogger(__name__)
+
+# Parámetro con el último id reclasificado; vacío si no hay reclasificación en curso
+_L10N_DO_RECLASSIFY_PARAM = "l10n_do_accounting.payer_type_reclassify_last_id"
+
+# Misma clasificación que l10n_do_classify_payer_type, para reclasificar por lotes.
+# Los socios con tipo asignado manualmente se respetan.
+_L10N_DO_PAYER_TYPE_SQL = """
+    UPDATE res_partner p
+       SET l10n_do_dgii_tax_payer_type = CASE
+            WHEN p.country_id IS DISTINCT FROM %(do_country)s THEN 'foreigner'
+            WHEN c.vat !~ '^[0-9]+$' OR length(c.vat) != 9 THEN 'non_payer'
+            WHEN c.name LIKE '%%MINISTERIO%%' AND c.vat NOT LIKE '4%%' THEN 'governmental'
+            WHEN c.name LIKE '%%ZONA FRANCA%%' THEN 'special'
+            WHEN c.name LIKE '%%IGLESIA%%' OR c.name LIKE '%%MINISTERIO%%' THEN 'special'
+            WHEN c.vat NOT LIKE '4%%' THEN 'taxpayer'
+            ELSE 'nonprofit'
+       END
+      FROM (
+            SELECT id,
+                   COALESCE(NULLIF(vat, ''), name, '') AS vat,
+                   upper(COALESCE(name, '')) AS name
+              FROM res_partner
+             WHERE id IN %(ids)s
+               AND NOT COALESCE(l10n_do_dgii_tax_payer_type_manual, FALSE)
+      ) c
+     WHERE p.id = c.id
+ RETURNING p.id
+"""
+
+
+def l10n_do_classify_payer_type(vat, name, is_dominican):
+    """Tipo de contribuyente DGII según RNC/cédula, nombre y país."""
+    if not is_dominican:
+        return "foreigner"
+    vat = vat or name or ""
+    if not vat.isdigit() or len(vat) != 9:
+        return "non_payer"
+    upper_name = name.upper() if name else ""
+    if "MINISTERIO" in upper_name and not vat.startswith("4"):
+        return "governmental"
+    if "ZONA FRANCA" in upper_name:
+        return "special"
+    if "IGLESIA" in upper_name or ("MINISTERIO" in upper_name and vat.startswith("4")):
+        return "special"
+    if not vat.startswith("4"):
+        return "taxpayer"
+    return "nonprofit"
 
 
 class Partner(models.Model):
@@ -38,6 +90,13 @@ class Partner(models.Model):
         index=True,
         store=True,
     )
+    l10n_do_dgii_tax_payer_type_manual = fields.Boolean(
+        string="Tipo de Contribuyente Manual",
+        copy=False,
+        help="El tipo de contribuyente fue asignado por el usuario y difiere de "
+        "la clasificación automática; la reclasificación masiva no lo modifica. "
+        "Desmarcar para volver a la clasificación automática.",
+    )
 
     l10n_do_expense_type = fields.Selection(
         selection="_get_l10n_do_expense_type",
@@ -45,6 +104,14 @@ class Partner(models.Model):
         store=True,
     )
 
+    l10n_do_has_fiscal_documents = fields.Boolean(
+        string="Tiene comprobantes fiscales",
+        readonly=True,
+        copy=False,
+        index=True,
+        help="Se marca al publicar el primer comprobante fiscal del socio.",
+    )
+
     country_id = fields.Many2one(
         default=lambda self: self.env.ref("base.do")
         if self.env.user.company_id.country_id == self.env.ref("base.do")
@@ -52,66 +119,139 @@ class Partner(models.Model):
     )
 
     def _check_l10n_do_fiscal_fields(self, vals):
-        if not self or self.parent_id:
-            return
-
         fiscal_fields = [
             f for f in ["name", "vat", "country_id"] if f in vals
         ]
+        if not fiscal_fields or self.env.user.has_group("l10n_do_accounting.group_l10n_do_edit_fiscal_partner"):
+            return
 
-        if (
-            fiscal_fields
-            and not self.env.user.has_group("l10n_do_accounting.group_l10n_do_edit_fiscal_partner")
-            and self.env["account.move"]
-            .sudo()
-            .search([
-                ("l10n_latam_use_documents", "=", True),
-                ("country_code", "=", "DO"),
-                ("commercial_partner_id", "=", self.id),
-                ("state", "=", "posted"),
-            ], limit=1)
-        ):
+        if self.filtered(lambda p: not p.parent_id and p.l10n_do_has_fiscal_documents):
             raise AccessError(_(
                 "No tienes permisos para modificar %s luego de emitir comprobantes fiscales."
             ) % (", ".join(self._fields[f].string for f in fiscal_fields)))
 
+    def _auto_init(self):
+        if not column_exists(self.env.cr, "res_partner", "l10n_do_has_fiscal_documents"):
+            create_column(self.env.cr, "res_partner", "l10n_do_has_fiscal_documents", "boolean")
+            self.env.cr.execute("""
+                UPDATE res_partner p
+                   SET l10n_do_has_fiscal_documents = TRUE
+                 WHERE EXISTS (
+                        SELECT 1
+                          FROM account_move m
+                          JOIN account_journal j ON j.id = m.journal_id
+                          JOIN res_company c ON c.id = m.company_id
+                          JOIN res_country co ON co.id = c.account_fiscal_country_id
+                         WHERE m.commercial_partner_id = p.id
+                           AND m.state = 'posted'
+                           AND j.l10n_latam_use_documents
+                           AND co.code = 'DO'
+                 )
+            """)
+        return super()._auto_init()
+
     def write(self, vals):
+        reset_payer_type = (
+            vals.get("l10n_do_dgii_tax_payer_type_manual") is False
+            and "l10n_do_dgii_tax_payer_type" not in vals
+        )
+        if {"vat", "country_id"}.intersection(vals) and "l10n_do_dgii_tax_payer_type" not in vals:
+            # Un nuevo RNC o país vuelve a la clasificación automática
+            vals = dict(vals, l10n_do_dgii_tax_payer_type_manual=False)
         res = super().write(vals)
+        if reset_payer_type:
+            # Se desmarcó el tipo manual: se vuelve a clasificar
+            self.env.add_to_compute(self._fields["l10n_do_dgii_tax_payer_type"], self)
         self._check_l10n_do_fiscal_fields(vals)
         return res
 
-    @api.depends("vat", "country_id", "name")
+    @api.depends("vat", "country_id")
     def _compute_l10n_do_dgii_payer_type(self):
+        # El nombre se usa para clasificar pero no es dependencia: renombrar un
+        # socio no cambia su tipo de contribuyente (ver acción de reclasificación)
+        do_country = self.env.ref("base.do")
         for partner in self:
-            vat = partner.vat or partner.name or ""
-            vat_len = len(vat)
-            upper_name = partner.name.upper() if partner.name else ""
-            is_dominican = partner.country_code == "DO"
-
-            if not is_dominican:
-                partner.l10n_do_dgii_tax_payer_type = "foreigner"
-                continue
-
-            if not vat.isdigit():
-                partner.l10n_do_dgii_tax_payer_type = "non_payer"
-                continue
-
-            if vat_len == 11:
-                partner.l10n_do_dgii_tax_payer_type = "non_payer"
-            elif vat_len == 9:
-                if "MINISTERIO" in upper_name and not vat.startswith("4"):
-                    partner.l10n_do_dgii_tax_payer_type = "governmental"
-                elif "ZONA FRANCA" in upper_name:
-                    partner.l10n_do_dgii_tax_payer_type = "special"
-                elif "IGLESIA" in upper_name or ("MINISTERIO" in upper_name and vat.startswith("4")):
-                    partner.l10n_do_dgii_tax_payer_type = "special"
-                elif not vat.startswith("4"):
-                    partner.l10n_do_dgii_tax_payer_type = "taxpayer"
-                else:
-                    partner.l10n_do_dgii_tax_payer_type = "nonprofit"
-            else:
-                partner.l10n_do_dgii_tax_payer_type = "non_payer"
+            partner.l10n_do_dgii_tax_payer_type = l10n_do_classify_payer_type(
+                partner.vat, partner.name, partner.country_id == do_country
+            )
+
+    @api.model
+    def _l10n_do_reclassify_payer_type(self, ids):
+        """Reclasifica en SQL el tipo de contribuyente de los socios ``ids``.
+
+        Los socios con tipo manual no se tocan. Los campos que dependen del
+        tipo de contribuyente se marcan para recálculo.
+        """
+        self.flush_model([
+            "vat", "name", "country_id",
+            "l10n_do_dgii_tax_payer_type", "l10n_do_dgii_tax_payer_type_manual",
+        ])
+        self.env.cr.execute(
+            _L10N_DO_PAYER_TYPE_SQL,
+            {"ids": tuple(ids), "do_country": self.env.ref("base.do").id},
+        )
+        partners = self.browse([row[0] for row in self.env.cr.fetchall()])
+        self.invalidate_model(["l10n_do_dgii_tax_payer_type"])
+        partners.modified(["l10n_do_dgii_tax_payer_type"])
+        return len(partners)
+
+    @api.model
+    def action_l10n_do_reclassify_payer_type(self):
+        """Programa la reclasificación de todos los socios por lotes."""
+        self.env["ir.config_parameter"].sudo().set_param(_L10N_DO_RECLASSIFY_PARAM, "0")
+        self.env.ref("l10n_do_accounting.ir_cron_l10n_do_reclassify_payer_type")._trigger()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "type": "info",
+                "message": _("La reclasificación de tipos de contribuyente se ejecutará en segundo plano."),
+            },
+        }
+
+    @api.model
+    def _cron_l10n_do_reclassify_payer_type(self, chunk_size=10000):
+        ICP = self.env["ir.config_parameter"].sudo()
+        last_id = ICP.get_param(_L10N_DO_RECLASSIFY_PARAM)
+        if last_id is False:
+            return
+        self.env.cr.execute(
+            "SELECT id FROM res_partner WHERE id > %s ORDER BY id LIMIT %s",
+            [int(last_id), chunk_size],
+        )
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        if ids:
+            self._l10n_do_reclassify_payer_type(ids)
+            last_id = ids[-1]
+        self.env.cr.execute("SELECT count(*) FROM res_partner WHERE id > %s", [int(last_id)])
+        remaining = self.env.cr.fetchone()[0]
+        if remaining:
+            ICP.set_param(_L10N_DO_RECLASSIFY_PARAM, str(last_id))
+        else:
+            ICP.set_param(_L10N_DO_RECLASSIFY_PARAM, False)
+        _logger.info("Tipo de contribuyente: %s socios reclasificados, %s pendientes", len(ids), remaining)
+        self.env["ir.cron"]._notify_progress(done=len(ids), remaining=remaining)
+
+    @api.onchange("vat")
+    def _onchange_l10n_do_vat_registry(self):
+        """Completa nombre y tipo de contribuyente desde el registro local de RNC."""
+        if self.country_id != self.env.ref("base.do") or not self.vat:
+            return
+        data = self.env["l10n_do.rnc.registry"]._l10n_do_lookup(self.vat)
+        if not data:
+            return
+        if not self.name:
+            self.name = data["name"]
+        self.l10n_do_dgii_tax_payer_type = l10n_do_classify_payer_type(data["rnc"], data["name"], True)
 
     def _inverse_l10n_do_dgii_tax_payer_type(self):
+        # Solo es manual si difiere de la clasificación automática; el
+        # cliente web envía el campo al guardar aunque no se haya cambiado
+        do_country = self.env.ref("base.do")
         for partner in self:
-            partner.l10n_do_dgii_tax_payer_type = partner.l10n_do_dgii_tax_payer_type
+            partner.l10n_do_dgii_tax_payer_type_manual = (
+                partner.l10n_do_dgii_tax_payer_type
+                != l10n_do_classify_payer_type(
+                    partner.vat, partner.name, partner.country_id == do_country
+                )
+            )
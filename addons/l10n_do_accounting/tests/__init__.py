@@ -1,3 +1,7 @@
 from . import common
 from . import test_account_move
 from . import test_account_journal
+from . import test_res_partner
+from . import test_rnc_registry
+from . import test_ncf_search_benchmark
+from . import test_ecf_edi_file
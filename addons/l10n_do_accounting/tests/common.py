@@ -14,6 +14,8 @@ class L10nDOTestsCommon(AccountTestInvoicingCommon):
             street="dummy address",
             country_id=cls.env.ref("base.do").id,
         )["company"]
+        # Los e-CF de las pruebas se envían con el transporte simulado
+        cls.do_company.l10n_do_ecf_transport = "stub"
 
         # multi-currency variables
         cls.usd_currency = cls.env.ref("base.USD")
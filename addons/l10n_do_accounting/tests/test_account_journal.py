@@ -22,3 +22,27 @@ class AccountJournalTest(common.L10nDOTestsCommon):
         with self.assertRaises(RedirectWarning):
             self.do_company.vat = False
             journal._get_journal_ncf_types()
+
+    def test_002_bulk_document_types(self):
+        """
+        Checks journals created together get the same fiscal document
+        types as a single journal, without duplicates on later writes
+        """
+        journals = self.env["account.journal"].create([
+            {
+                "name": "POS %s" % i,
+                "code": "POS%s" % i,
+                "type": "sale",
+                "company_id": self.do_company.id,
+                "l10n_latam_use_documents": True,
+            }
+            for i in range(3)
+        ])
+        expected = self.fiscal_sale_journal.l10n_do_document_type_ids.l10n_latam_document_type_id
+        for journal in journals:
+            self.assertEqual(
+                journal.l10n_do_document_type_ids.l10n_latam_document_type_id, expected
+            )
+
+        journals.write({"l10n_latam_use_documents": True})
+        self.assertEqual(len(journals.l10n_do_document_type_ids), 3 * len(expected))
@@ -1,8 +1,9 @@
+import base64
+
 from . import common
 from odoo import fields
 from odoo.tests import tagged
-from odoo.exceptions import ValidationError
-import psycopg2
+from odoo.exceptions import UserError, ValidationError
 
 
 @tagged("-at_install", "post_install")
@@ -638,7 +639,7 @@ class AccountMoveTest(common.L10nDOTestsCommon):
 
         invoice_2 = self._create_l10n_do_invoice()
         invoice_2._post()
-        with self.assertRaises(psycopg2.errors.UniqueViolation):
+        with self.assertRaises(ValidationError):
             invoice_2.write({"l10n_do_fiscal_number": "B0100000001"})
 
     def test_008_check_sequence(self):
@@ -819,3 +820,178 @@ class AccountMoveTest(common.L10nDOTestsCommon):
                 "l10n_do_invoice_total_currency": 6962.000000974679,
             },
         )
+
+    def test_012_ecf_send_queue(self):
+        """
+        Check posted e-CF are queued and the cron sends them, logging each batch
+        """
+        self.do_company.l10n_do_ecf_issuer = True
+        invoice = self._create_l10n_do_invoice(
+            data={
+                "document_type": self.do_document_type["e-fiscal"],
+            }
+        )
+        # Sin transporte configurado se publica pero no se pone en cola
+        self.do_company.l10n_do_ecf_transport = False
+        not_queued = self._create_l10n_do_invoice(
+            data={
+                "document_type": self.do_document_type["e-fiscal"],
+            }
+        )
+        not_queued._post()
+        self.assertEqual(not_queued.state, "posted")
+        self.assertFalse(not_queued.l10n_do_ecf_send_state)
+        with self.assertRaises(UserError):
+            not_queued._l10n_do_enqueue_ecf()
+
+        self.do_company.l10n_do_ecf_transport = "stub"
+        invoice._post()
+        self.assertEqual(invoice.l10n_do_ecf_send_state, "to_send")
+
+        self.env["account.move"]._cron_l10n_do_send_ecf()
+        self.assertEqual(invoice.l10n_do_ecf_send_state, "accepted")
+        self.assertTrue(invoice.l10n_do_dgii_uuid)
+        self.assertEqual(len(invoice.l10n_do_ecf_log_ids), 1)
+
+        log = invoice.l10n_do_ecf_log_ids
+        stats = self.env["account.ecf.log"]._get_batch_stats(log.batch_ref)
+        self.assertEqual(stats["accepted"], 1)
+        self.assertEqual(stats["acceptance_rate"], 1.0)
+
+    def test_013_import_vendor_bills(self):
+        rows = [
+            {"vat": "131-56633-2", "ncf": "B0100000101", "date": "2024-01-15", "amount": "1000"},
+            {"vat": "131566332", "ncf": "B0100000101", "date": "2024-01-16", "amount": "500"},
+            {"vat": "131566332", "ncf": "B01001", "date": "2024-01-16", "amount": "500"},
+            {"vat": "000000000", "ncf": "B0100000102", "date": "2024-01-16", "amount": "500"},
+        ]
+        moves, errors = self.env["account.move"]._l10n_do_import_vendor_bills(
+            rows, self.fiscal_purchase_journal
+        )
+        self.assertEqual(len(moves), 1)
+        self.assertEqual(moves.partner_id, self.fiscal_partner)
+        self.assertEqual(moves.l10n_do_fiscal_number, "B0100000101")
+        self.assertEqual([line for line, _msg in errors], [2, 3, 4])
+
+        # Las filas 606 incompletas o sin fecha se reportan en el asistente
+        content = (
+            "606|131793916|202401|3\n"
+            "131566332|1|02|B0100000103\n"
+            "131566332|1|02|B0100000104||||||500.00\n"
+            "131566332|1|02|B0100000105||20240116||||500.00\n"
+        )
+        wizard = self.env["l10n_do.vendor.bill.import"].create({
+            "file": base64.b64encode(content.encode()),
+            "file_format": "dgii_606",
+            "company_id": self.do_company.id,
+            "journal_id": self.fiscal_purchase_journal.id,
+        })
+        wizard.action_import()
+        self.assertEqual(len(wizard.move_ids), 1)
+        self.assertEqual(
+            wizard.error_report.splitlines(),
+            ["Fila 2: Fila 606 incompleta (4 campos)", "Fila 3: Fecha requerida"],
+        )
+
+    def test_014_ncf_range(self):
+        ncf_range = self.env["l10n_do.ncf.range"].create({
+            "company_id": self.do_company.id,
+            "l10n_latam_document_type_id": self.do_document_type["fiscal"].id,
+            "number_from": 1,
+            "number_to": 20,
+            "alert_remaining": 19,
+            "expiration_date": fields.Date.add(fields.Date.today(), years=1),
+        })
+        self.assertEqual(ncf_range.remaining, 20)
+        self.assertEqual(ncf_range.state, "available")
+
+        invoice = self._create_l10n_do_invoice()
+        invoice._post()
+        ncf_range.invalidate_recordset()
+        self.assertEqual(invoice.l10n_do_fiscal_number, "B01%08d" % ncf_range.last_number)
+        self.assertEqual(ncf_range.used_count, 1)
+        self.assertEqual(ncf_range.remaining, 20 - ncf_range.last_number)
+        self.assertEqual(ncf_range.state, "warning")
+
+        self.env["l10n_do.ncf.range"]._cron_l10n_do_check_ncf_ranges()
+        self.assertEqual(len(ncf_range.activity_ids), 1)
+
+        # Los gastos menores se emiten desde facturas de proveedor
+        minor_range = self.env["l10n_do.ncf.range"].create({
+            "company_id": self.do_company.id,
+            "l10n_latam_document_type_id": self.do_document_type["minor"].id,
+            "number_from": 1,
+            "number_to": 20,
+            "expiration_date": fields.Date.add(fields.Date.today(), years=1),
+        })
+        bill = self._create_l10n_do_invoice(
+            data={
+                "partner": self.consumo_partner,
+                "document_type": self.do_document_type["minor"],
+                "document_number": "B1300000005",
+                "expense_type": "02",
+            },
+            invoice_type="in_invoice",
+        )
+        bill._post()
+        minor_range.invalidate_recordset()
+        self.assertEqual(minor_range.used_count, 1)
+        self.assertEqual(minor_range.last_number, 5)
+
+    def test_015_batch_reversal(self):
+        invoices = self.env["account.move"]
+        for _i in range(3):
+            invoices |= self._create_l10n_do_invoice()
+        invoices._post()
+
+        wizard = (
+            self.env["account.move.reversal"]
+            .with_context(active_ids=invoices.ids, active_model="account.move")
+            .create({"journal_id": self.fiscal_sale_journal.id})
+        )
+        self.assertEqual(wizard.l10n_latam_document_type_id, self.do_document_type["credit_note"])
+        wizard.reverse_moves()
+
+        credit_notes = self.env["account.move"].search([("reversed_entry_id", "in", invoices.ids)])
+        self.assertEqual(len(credit_notes), 3)
+        credit_notes._post()
+        numbers = sorted(credit_notes.mapped("l10n_do_sequence_number"))
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 3)))
+        self.assertEqual(set(credit_notes.mapped("l10n_do_origin_ncf")), set(invoices.mapped("l10n_do_fiscal_number")))
+
+    def test_016_batch_debit_note(self):
+        invoices = self.env["account.move"]
+        for partner in (self.fiscal_partner, self.consumo_partner, self.fiscal_partner):
+            invoices |= self._create_l10n_do_invoice(data={"partner": partner})
+        invoices._post()
+
+        wizard = (
+            self.env["account.debit.note"]
+            .with_context(active_ids=invoices.ids, active_model="account.move")
+            .create(
+                {
+                    "l10n_do_debit_type": "percentage",
+                    "l10n_do_percentage": "5",
+                    "l10n_do_debit_action": "apply_debit",
+                }
+            )
+        )
+        debit_notes = self.env["account.move"].search(wizard.create_debit()["domain"])
+        self.assertEqual(len(debit_notes), 3)
+        self.assertEqual(debit_notes.debit_origin_id, invoices)
+        self.assertEqual(set(debit_notes.mapped("state")), {"posted"})
+        self.assertEqual(debit_notes.l10n_latam_document_type_id, self.do_document_type["debit_note"])
+        numbers = sorted(debit_notes.mapped("l10n_do_sequence_number"))
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 3)))
+
+    def test_017_taxes_split_by_dgii_category(self):
+        invoice = self._create_l10n_do_invoice()
+        tax_group = invoice.line_ids.tax_line_id.tax_group_id
+        tax_group.l10n_do_dgii_tax_category = "itbis"
+        self.assertEqual(invoice.itbis_amount, 18)
+        self.assertEqual(invoice.propina_amount, 0)
+
+        tax_group.l10n_do_dgii_tax_category = "tip"
+        invoice.invalidate_recordset(["itbis_amount", "propina_amount"])
+        self.assertEqual(invoice.itbis_amount, 0)
+        self.assertEqual(invoice.propina_amount, 18)
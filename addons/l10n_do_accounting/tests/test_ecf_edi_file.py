@@ -0,0 +1,89 @@
+import base64
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+from . import common
+from odoo.tests import tagged
+from odoo.exceptions import ValidationError
+
+from ..models import l10n_do_ecf_edi_file
+
+ECF_XSD = b"""<?xml version="1.0" encoding="utf-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="ECF">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="eNCF" type="xs:string"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+
+@tagged("-at_install", "post_install")
+class EcfEdiFileTest(common.L10nDOTestsCommon):
+    def setUp(self):
+        super().setUp()
+        fd, self.xsd_path = tempfile.mkstemp(suffix=".xsd")
+        with os.fdopen(fd, "wb") as f:
+            f.write(ECF_XSD)
+        self.addCleanup(os.remove, self.xsd_path)
+        patcher = patch.object(
+            l10n_do_ecf_edi_file, "file_path", return_value=self.xsd_path
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        l10n_do_ecf_edi_file.clear_schema_cache()
+        self.addCleanup(l10n_do_ecf_edi_file.clear_schema_cache)
+
+    def _set_ecf_xml(self, invoice, xml):
+        invoice.l10n_do_ecf_edi_file = base64.b64encode(xml)
+        return invoice
+
+    def test_001_schema_cache_per_thread(self):
+        """
+        Checks the compiled XSD is reused within a thread, never shared
+        between threads and recompiled after the cache is cleared
+        """
+        schema = l10n_do_ecf_edi_file.get_ecf_schema()
+        self.assertIs(l10n_do_ecf_edi_file.get_ecf_schema(), schema)
+
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(l10n_do_ecf_edi_file.get_ecf_schema())
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], schema)
+
+        l10n_do_ecf_edi_file.clear_schema_cache()
+        self.assertIsNot(l10n_do_ecf_edi_file.get_ecf_schema(), schema)
+
+    def test_002_validate_many(self):
+        """
+        Checks the batch validation only reports the invalid documents,
+        each with its own error message
+        """
+        valid = self._set_ecf_xml(
+            self._create_l10n_do_invoice(), b"<ECF><eNCF>E310000000001</eNCF></ECF>"
+        )
+        invalid = self._set_ecf_xml(
+            self._create_l10n_do_invoice(), b"<ECF><Otro>1</Otro></ECF>"
+        )
+        malformed = self._set_ecf_xml(self._create_l10n_do_invoice(), b"<ECF>")
+        empty = self._create_l10n_do_invoice()
+        moves = valid | invalid | malformed | empty
+
+        errors = l10n_do_ecf_edi_file.validate_many(moves)
+        self.assertEqual(set(errors), {invalid.id, malformed.id})
+        self.assertIn("Otro", errors[invalid.id])
+
+        valid._validate_ecf_xml_schema()
+        with self.assertRaises(ValidationError):
+            invalid._validate_ecf_xml_schema()
+        with self.assertRaises(ValidationError):
+            moves._validate_ecf_xml_schemas()
+        (valid | empty)._validate_ecf_xml_schemas()
@@ -0,0 +1,74 @@
+import logging
+import time
+
+from . import common
+from odoo.tests import tagged
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged("-standard", "l10n_do_benchmark")
+class NcfSearchBenchmark(common.L10nDOTestsCommon):
+    """Mide la búsqueda de NCF de ``_name_search`` sobre 1M de facturas.
+
+    Las facturas se clonan en SQL a partir de una factura publicada, de modo
+    que la consulta usa la tabla ``account_move`` y sus índices reales.
+    Se ejecuta solo a pedido: ``--test-tags l10n_do_benchmark``.
+    """
+
+    ROWS = 1000000
+
+    def _clone_invoice(self, invoice):
+        cr = self.env.cr
+        self.env.flush_all()
+        cr.execute(
+            """
+            SELECT column_name FROM information_schema.columns
+             WHERE table_name = 'account_move' AND column_name != 'id'
+            """
+        )
+        columns = [row[0] for row in cr.fetchall()]
+        overrides = {
+            "name": "'BENCH/' || n",
+            "l10n_do_fiscal_number": (
+                "CASE WHEN n %% 2 = 0 THEN 'B01' || lpad(n::text, 8, '0')"
+                " ELSE 'E31' || lpad(n::text, 10, '0') END"
+            ),
+        }
+        cr.execute(
+            'INSERT INTO account_move (%s) SELECT %s FROM account_move m,'
+            " generate_series(1, %%s) n WHERE m.id = %%s"
+            % (
+                ", ".join('"%s"' % column for column in columns),
+                ", ".join(overrides.get(column, 'm."%s"' % column) for column in columns),
+            ),
+            [self.ROWS, invoice.id],
+        )
+        cr.execute("ANALYZE account_move")
+
+    def _time(self, function):
+        start = time.perf_counter()
+        function()
+        return (time.perf_counter() - start) * 1000
+
+    def test_ncf_prefix_lookup(self):
+        invoice = self._create_l10n_do_invoice()
+        invoice._post()
+        self._clone_invoice(invoice)
+
+        Move = self.env["account.move"]
+        prefix_ms = self._time(lambda: list(Move._name_search("B01000123", limit=8)))
+        ilike_ms = self._time(
+            lambda: Move.search([("l10n_do_fiscal_number", "ilike", "b01000123")], limit=8)
+        )
+        _logger.info(
+            "Búsqueda de NCF en %s facturas: _name_search %.2f ms, ilike %.2f ms",
+            self.ROWS, prefix_ms, ilike_ms,
+        )
+
+        query = Move._name_search("B01000123", limit=8)
+        self.env.cr.execute(SQL("EXPLAIN %s", query.select()))
+        plan = "\n".join(row[0] for row in self.env.cr.fetchall())
+        _logger.info("Plan de _name_search:\n%s", plan)
+        self.assertNotIn("Seq Scan on account_move", plan)
@@ -0,0 +1,75 @@
+from . import common
+from odoo.tests import tagged
+from odoo.exceptions import AccessError
+
+
+@tagged("-at_install", "post_install")
+class ResPartnerTest(common.L10nDOTestsCommon):
+    def test_001_payer_type_sql_matches_compute(self):
+        """
+        Checks batch SQL reclassification gives the same payer type
+        as the compute, and that renaming a partner does not recompute it
+        """
+        do_country = self.env.ref("base.do")
+        partners = self.env["res.partner"].create([
+            {"name": "MINISTERIO DE HACIENDA", "vat": "101000001", "country_id": do_country.id},
+            {"name": "ZONA FRANCA SANTIAGO", "vat": "101000002", "country_id": do_country.id},
+            {"name": "IGLESIA EVANGELICA", "vat": "401000003", "country_id": do_country.id},
+            {"name": "FUNDACION SOLIDARIA", "vat": "401000004", "country_id": do_country.id},
+            {"name": "EMPRESA SRL", "vat": "101000005", "country_id": do_country.id},
+            {"name": "JUAN PEREZ", "vat": "00100000006", "country_id": do_country.id},
+            {"name": "FOREIGN INC", "vat": "123456789", "country_id": self.env.ref("base.us").id},
+        ])
+        expected = [
+            "governmental", "special", "special", "nonprofit", "taxpayer", "non_payer", "foreigner",
+        ]
+        self.assertEqual(partners.mapped("l10n_do_dgii_tax_payer_type"), expected)
+
+        partners[4].name = "MINISTERIO DE EMPRESA"
+        self.assertEqual(partners[4].l10n_do_dgii_tax_payer_type, "taxpayer")
+
+        partners[4].name = "EMPRESA SRL"
+        self.assertEqual(self.env["res.partner"]._l10n_do_reclassify_payer_type(partners.ids), 7)
+        self.assertEqual(partners.mapped("l10n_do_dgii_tax_payer_type"), expected)
+
+        # Solo es manual el tipo que difiere de la clasificación automática
+        partners.write({"l10n_do_dgii_tax_payer_type": "taxpayer"})
+        self.assertEqual(
+            partners.mapped("l10n_do_dgii_tax_payer_type_manual"),
+            [True, True, True, True, False, True, True],
+        )
+        self.assertEqual(self.env["res.partner"]._l10n_do_reclassify_payer_type(partners.ids), 1)
+        self.assertEqual(set(partners.mapped("l10n_do_dgii_tax_payer_type")), {"taxpayer"})
+
+        # Desmarcar el tipo manual vuelve a la clasificación automática
+        partners[1].l10n_do_dgii_tax_payer_type_manual = False
+        self.assertEqual(partners[1].l10n_do_dgii_tax_payer_type, "special")
+
+        # Un cambio de RNC vuelve a la clasificación automática
+        partners[0].vat = "101000010"
+        self.assertFalse(partners[0].l10n_do_dgii_tax_payer_type_manual)
+        self.assertEqual(partners[0].l10n_do_dgii_tax_payer_type, "governmental")
+
+    def test_002_fiscal_partner_edit_guard(self):
+        """
+        Checks posting flags the partner and the guard blocks fiscal edits
+        on any partner of the recordset
+        """
+        partner = self.env["res.partner"].create({
+            "name": "PROVEEDOR SRL",
+            "vat": "101000007",
+            "country_id": self.env.ref("base.do").id,
+        })
+        other = partner.copy({"name": "OTRO SRL", "vat": "101000008"})
+        self.assertFalse(partner.l10n_do_has_fiscal_documents)
+
+        invoice = self._create_l10n_do_invoice(data={"partner": partner})
+        invoice._post()
+        self.assertTrue(partner.l10n_do_has_fiscal_documents)
+        self.assertFalse(other.l10n_do_has_fiscal_documents)
+
+        self.env.user.groups_id -= self.env.ref("l10n_do_accounting.group_l10n_do_edit_fiscal_partner")
+        (other | partner).write({"email": "info@example.com"})
+        other.write({"name": "OTRO NOMBRE SRL"})
+        with self.assertRaises(AccessError):
+            (other | partner).write({"vat": "101000009"})
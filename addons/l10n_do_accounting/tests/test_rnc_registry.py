@@ -0,0 +1,47 @@
+import io
+import zipfile
+
+from . import common
+from odoo.tests import tagged
+from odoo.exceptions import UserError
+from odoo.tests.common import Form
+
+RNC_FILE = (
+    "101000011|EMPRESA DE PRUEBA SRL|PRUEBA|COMERCIO|||||01/01/2010|ACTIVO|NORMAL\n"
+    "401000022|FUNDACION\\ PRUEBA|FUNDACION|ONG|||||01/01/2011|ACTIVO|NORMAL\n"
+    "101000011|EMPRESA DE PRUEBA SRL|PRUEBA|COMERCIO|||||01/01/2010|SUSPENDIDO|NORMAL\n"
+).encode("latin-1")
+
+
+@tagged("-at_install", "post_install")
+class RncRegistryTest(common.L10nDOTestsCommon):
+    def test_001_load_and_lookup(self):
+        """
+        Checks the RNC file loads through COPY (plain and zipped), keeps one
+        row per RNC and feeds the partner onchange
+        """
+        Registry = self.env["l10n_do.rnc.registry"]
+        self.assertEqual(Registry._l10n_do_load_file(io.BytesIO(RNC_FILE)), 3)
+        self.assertEqual(Registry.search_count([("rnc", "in", ["101000011", "401000022"])]), 2)
+        self.assertEqual(Registry._l10n_do_lookup("401-00002-2")["name"], "FUNDACION\\ PRUEBA")
+        self.assertIsNone(Registry._l10n_do_lookup("999999999"))
+        # Con RNC repetidos prevalece la última fila del archivo
+        self.assertEqual(Registry._l10n_do_lookup("101000011")["state"], "SUSPENDIDO")
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("TMP/DGII_RNC.TXT", RNC_FILE.replace(b"SUSPENDIDO", b"ACTIVO"))
+        Registry._l10n_do_load_file(archive)
+        self.assertEqual(Registry._l10n_do_lookup("101000011")["state"], "ACTIVO")
+
+        empty_archive = io.BytesIO()
+        with zipfile.ZipFile(empty_archive, "w") as zf:
+            zf.writestr("LEEME.md", "sin datos")
+        with self.assertRaises(UserError):
+            Registry._l10n_do_load_file(empty_archive)
+
+        with Form(self.env["res.partner"]) as partner_form:
+            partner_form.country_id = self.env.ref("base.do")
+            partner_form.vat = "101000011"
+            self.assertEqual(partner_form.name, "EMPRESA DE PRUEBA SRL")
+            self.assertEqual(partner_form.l10n_do_dgii_tax_payer_type, "taxpayer")
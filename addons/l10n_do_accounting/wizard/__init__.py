@@ -2,3 +2,5 @@ from . import account_move_reversal
 from . import account_move_cancel
 from . import account_debit_note
 from . import account_resequence
+from . import l10n_do_vendor_bill_import
+from . import l10n_do_rnc_registry_load
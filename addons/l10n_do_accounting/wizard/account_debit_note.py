@@ -97,25 +97,27 @@ class AccountDebitNote(models.TransientModel):
         res["l10n_latam_use_documents"] = journal.l10n_latam_use_documents
 
         # Do not allow Debit Notes if Comprobante de Compra or Gastos Menores
-        if move_ids[0].l10n_latam_document_type_id.l10n_do_ncf_type in (
-            "informal",
-            "minor",
-            "e-informal",
-            "e-minor",
-        ):
+        not_allowed = move_ids.l10n_latam_document_type_id.filtered(
+            lambda d: d.l10n_do_ncf_type in ("informal", "minor", "e-informal", "e-minor")
+        )
+        if not_allowed:
             raise UserError(
                 _("You cannot issue Credit/Debit Notes for %s document type")
-                % move_ids_use_document.l10n_latam_document_type_id.name
+                % ", ".join(not_allowed.mapped("name"))
             )
 
-        if len(move_ids_use_document) > 1:
+        # En lote solo facturas de venta de una misma compañía: el NCF de las
+        # notas de débito de proveedor se digita para cada documento.
+        if len(move_ids_use_document) > 1 and (
+            not all(move.is_sale_document() for move in move_ids_use_document)
+            or len(move_ids_use_document.company_id) > 1
+        ):
             raise UserError(
                 _("You cannot create Debit Notes from multiple documents at a time.")
             )
-        else:
-            res["is_ecf_invoice"] = (
-                move_ids_use_document and move_ids_use_document[0].is_ecf_invoice
-            )
+        res["is_ecf_invoice"] = bool(
+            move_ids_use_document and move_ids_use_document[0].is_ecf_invoice
+        )
 
         return res
 
@@ -176,24 +178,17 @@ class AccountDebitNote(models.TransientModel):
                 )
             )
 
-            origin_invoice_id = self.move_ids or self.env["account.move"].browse(
-                self.env.context.get("active_ids")
-            )
-            taxes = (
-                [
-                    (
-                        6,
-                        0,
-                        [origin_invoice_id._get_debit_line_tax(res["invoice_date"]).id],
-                    )
-                ]
-                if self.l10n_do_debit_type
-                else [(5, 0)]
+            debit_taxes = self.env.context.get("l10n_do_debit_taxes") or {}
+            tax = (
+                self.env["account.tax"].browse(debit_taxes[move.id])
+                if move.id in debit_taxes
+                else move._get_debit_line_tax(res["invoice_date"])
             )
+            taxes = [(6, 0, tax.ids)] if self.l10n_do_debit_type else [(5, 0)]
             price_unit = (
                 self.l10n_do_amount
                 if self.l10n_do_debit_type == "fixed_amount"
-                else origin_invoice_id.amount_untaxed * (self.l10n_do_percentage / 100)
+                else move.amount_untaxed * (self.l10n_do_percentage / 100)
             )
             res["invoice_line_ids"] = [
                 (
@@ -211,10 +206,56 @@ class AccountDebitNote(models.TransientModel):
         return res
 
     def create_debit(self):
-        action = super(AccountDebitNote, self).create_debit()
+        self.ensure_one()
+        if not (
+            self.l10n_latam_country_code == "DO"
+            and len(self.move_ids) > 1
+            and any(self.move_ids.mapped("l10n_latam_use_documents"))
+        ):
+            action = super(AccountDebitNote, self).create_debit()
+            new_moves = self.env["account.move"].browse(action.get("res_id", False))
+        else:
+            new_moves = self._l10n_do_create_debit_batch()
+            action = {
+                "name": _("Debit Notes"),
+                "type": "ir.actions.act_window",
+                "res_model": "account.move",
+                "view_mode": "list,form",
+                "domain": [("id", "in", new_moves.ids)],
+                "context": {"default_move_type": new_moves[:1].move_type},
+            }
+
         if self.l10n_do_debit_action == "apply_debit":
             # Post Debit Note
-            move_id = self.env["account.move"].browse(action.get("res_id", False))
-            move_id._post()
+            new_moves._post()
 
         return action
+
+    def _l10n_do_create_debit_batch(self):
+        """Crea todas las notas de débito con un solo ``create``.
+
+        Los impuestos se resuelven una vez por compañía y los NCF se asignan
+        en bloque al publicar.
+        """
+        moves = self.move_ids.with_context(include_business_fields=True)
+        debit_taxes = {
+            move_id: tax.id
+            for move_id, tax in moves._get_debit_line_taxes(self.date).items()
+        }
+        wizard = self.with_context(l10n_do_debit_taxes=debit_taxes)
+        vals_list = []
+        for move in moves:
+            default_values = wizard._prepare_default_values(move)
+            # El NCF de cada nota se asigna en bloque al publicar
+            default_values["l10n_do_fiscal_number"] = False
+            if not default_values.get("l10n_latam_document_type_id"):
+                default_values.pop("l10n_latam_document_type_id", None)
+            vals_list.append(move.copy_data(default=default_values)[0])
+        new_moves = self.env["account.move"].create(vals_list)
+        new_moves._message_log_batch(
+            bodies={
+                new_move.id: _("This debit note was created from: %s", move._get_html_link())
+                for new_move, move in zip(new_moves, moves)
+            }
+        )
+        return new_moves
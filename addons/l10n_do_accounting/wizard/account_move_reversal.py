@@ -146,19 +146,25 @@ class AccountMoveReversal(models.TransientModel):
             and w.country_code == "DO"
         )
         for record in do_wizard:
-            if len(record.move_ids) > 1:
-                move_ids_use_document = record.move_ids._origin.filtered(
-                    lambda move: move.l10n_latam_use_documents
-                )
-                if move_ids_use_document:
-                    raise UserError(
-                        _(
-                            "You can only reverse documents with legal invoicing documents from Latin America "
-                            "one at a time.\nProblematic documents: %s"
-                        )
-                        % ", ".join(move_ids_use_document.mapped("name"))
+            move_ids_use_document = record.move_ids._origin.filtered(
+                lambda move: move.l10n_latam_use_documents
+            )
+            # En lote solo se revierten comprobantes con numeración automática
+            # (ventas) de una misma compañía y tipo; los de numeración manual
+            # necesitan el NCF de cada nota de crédito.
+            if len(record.move_ids) > 1 and move_ids_use_document and (
+                any(move_ids_use_document.mapped("l10n_latam_manual_document_number"))
+                or len(move_ids_use_document.company_id) > 1
+                or len(set(move_ids_use_document.mapped("move_type"))) > 1
+            ):
+                raise UserError(
+                    _(
+                        "You can only reverse documents with legal invoicing documents from Latin America "
+                        "one at a time.\nProblematic documents: %s"
                     )
-            else:
+                    % ", ".join(move_ids_use_document.mapped("name"))
+                )
+            if len(record.move_ids) == 1 or move_ids_use_document:
                 record.write(
                     {
                         "l10n_latam_use_documents": record.journal_id.l10n_latam_use_documents,
@@ -167,14 +173,13 @@ class AccountMoveReversal(models.TransientModel):
                 )
 
             if record.l10n_latam_use_documents:
+                move = record.move_ids[0]
                 refund = record.env["account.move"].new(
                     {
-                        "move_type": record._reverse_type_map(
-                            record.move_ids.move_type
-                        ),
+                        "move_type": record._reverse_type_map(move.move_type),
                         "journal_id": record.journal_id.id,
-                        "partner_id": record.move_ids.partner_id.id,
-                        "company_id": record.move_ids.company_id.id,
+                        "partner_id": move.partner_id.id,
+                        "company_id": move.company_id.id,
                     }
                 )
                 record.l10n_latam_document_type_id = refund.l10n_latam_document_type_id
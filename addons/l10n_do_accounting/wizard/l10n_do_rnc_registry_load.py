@@ -0,0 +1,27 @@
+import base64
+import io
+
+from odoo import models, fields, _
+
+
+class L10nDoRncRegistryLoad(models.TransientModel):
+    _name = "l10n_do.rnc.registry.load"
+    _description = "Cargar registro de RNC de la DGII"
+
+    file = fields.Binary("Archivo RNC (TXT o ZIP)", required=True)
+    filename = fields.Char("Nombre del archivo")
+
+    def action_load(self):
+        self.ensure_one()
+        count = self.env["l10n_do.rnc.registry"]._l10n_do_load_file(
+            io.BytesIO(base64.b64decode(self.file))
+        )
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "type": "success",
+                "message": _("Se cargaron %s RNC.") % count,
+                "next": {"type": "ir.actions.act_window_close"},
+            },
+        }
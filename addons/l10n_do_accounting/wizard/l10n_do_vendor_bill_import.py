@@ -0,0 +1,191 @@
+import base64
+import csv
+import io
+from datetime import datetime
+
+from odoo import api, models, fields, _
+from odoo.exceptions import UserError
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Columnas esperadas en CSV/XLSX (la primera fila es el encabezado)
+CSV_COLUMNS = {
+    "rnc": "vat",
+    "ncf": "ncf",
+    "fecha": "date",
+    "monto": "amount",
+    "tipo_gasto": "expense_type",
+}
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if not value or not isinstance(value, str):
+        return value
+    value = value.strip()
+    for fmt in ("%Y%m%d", "%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+def _map_row(line, values):
+    row = {CSV_COLUMNS[k]: v for k, v in values.items() if k in CSV_COLUMNS}
+    row["line"] = line
+    return row
+
+
+def read_csv(data):
+    text = data.decode("utf-8-sig")
+    dialect = csv.Sniffer().sniff(text[:2048], delimiters=",;")
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or []]
+    return [_map_row(line, values) for line, values in enumerate(reader, start=2)]
+
+
+def read_xlsx(data):
+    if openpyxl is None:
+        raise UserError(_("Se requiere la librería openpyxl para importar archivos XLSX."))
+    book = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    rows = book.active.iter_rows(values_only=True)
+    header = [str(name or "").strip().lower() for name in next(rows, [])]
+    return [
+        _map_row(line, dict(zip(header, values)))
+        for line, values in enumerate(rows, start=2)
+        if any(values)
+    ]
+
+
+def read_dgii_606(data):
+    """Lee el formato de envío 606 de la DGII (campos separados por ``|``)."""
+    rows = []
+    for line, text in enumerate(data.decode("utf-8-sig").splitlines(), start=1):
+        fields_606 = text.strip().split("|")
+        if not text.strip() or fields_606[0] == "606":
+            continue
+        if len(fields_606) < 10:
+            rows.append({
+                "line": line,
+                "error": _("Fila 606 incompleta (%s campos)") % len(fields_606),
+            })
+            continue
+        rows.append({
+            "line": line,
+            "vat": fields_606[0],
+            "expense_type": fields_606[2],
+            "ncf": fields_606[3],
+            "date": fields_606[5],
+            "amount": fields_606[9],
+        })
+    return rows
+
+
+class L10nDoVendorBillImport(models.TransientModel):
+    _name = "l10n_do.vendor.bill.import"
+    _description = "Importación masiva de facturas de proveedor"
+
+    file = fields.Binary("Archivo", required=True)
+    filename = fields.Char("Nombre del archivo")
+    file_format = fields.Selection(
+        [
+            ("csv", "CSV"),
+            ("xlsx", "Excel (XLSX)"),
+            ("dgii_606", "Formato 606 DGII"),
+        ],
+        string="Formato",
+        required=True,
+        default="csv",
+    )
+    company_id = fields.Many2one("res.company", required=True, default=lambda self: self.env.company)
+    journal_id = fields.Many2one(
+        "account.journal",
+        string="Diario",
+        required=True,
+        domain="[('type', '=', 'purchase'), ('l10n_latam_use_documents', '=', True), ('company_id', '=', company_id)]",
+    )
+    account_id = fields.Many2one(
+        "account.account",
+        string="Cuenta de gasto",
+        domain="[('deprecated', '=', False)]",
+        help="Si se deja vacío se usa la cuenta por defecto del diario.",
+    )
+    tax_ids = fields.Many2many(
+        "account.tax",
+        string="Impuestos",
+        domain="[('type_tax_use', '=', 'purchase'), ('company_id', '=', company_id)]",
+    )
+    move_ids = fields.Many2many("account.move", string="Facturas creadas", readonly=True)
+    error_report = fields.Text("Errores", readonly=True)
+
+    @api.model
+    def _read_file(self, file_format, data):
+        return {
+            "csv": read_csv,
+            "xlsx": read_xlsx,
+            "dgii_606": read_dgii_606,
+        }[file_format](data)
+
+    def action_import(self):
+        self.ensure_one()
+        rows = self._read_file(self.file_format, base64.b64decode(self.file))
+        if not rows:
+            raise UserError(_("El archivo no contiene filas para importar."))
+
+        errors = []
+        valid_rows = []
+        for row in rows:
+            if row.get("error"):
+                errors.append((row["line"], row["error"]))
+                continue
+            try:
+                row["date"] = _parse_date(row.get("date"))
+            except ValueError:
+                errors.append((row["line"], _("Fecha inválida: %s") % row.get("date")))
+                continue
+            if not row["date"]:
+                errors.append((row["line"], _("Fecha requerida")))
+                continue
+            valid_rows.append(row)
+
+        moves, import_errors = self.env["account.move"]._l10n_do_import_vendor_bills(
+            valid_rows,
+            self.journal_id,
+            account=self.account_id or None,
+            taxes=self.tax_ids if self.tax_ids else None,
+        )
+        errors = sorted(errors + import_errors)
+        self.write({
+            "move_ids": [(6, 0, moves.ids)],
+            "error_report": "\n".join(_("Fila %s: %s") % (line, message) for line, message in errors),
+        })
+        if errors:
+            return {
+                "type": "ir.actions.act_window",
+                "res_model": self._name,
+                "res_id": self.id,
+                "view_mode": "form",
+                "target": "new",
+            }
+        return {
+            "name": _("Facturas importadas"),
+            "type": "ir.actions.act_window",
+            "res_model": "account.move",
+            "view_mode": "list,form",
+            "domain": [("id", "in", moves.ids)],
+        }
+
+    def action_view_moves(self):
+        self.ensure_one()
+        return {
+            "name": _("Facturas importadas"),
+            "type": "ir.actions.act_window",
+            "res_model": "account.move",
+            "view_mode": "list,form",
+            "domain": [("id", "in", self.move_ids.ids)],
+        }
@@ -7,6 +7,7 @@
     "depends": ["base", "account", "l10n_do_accounting"],  # Verify if l10n_do_accounting is available for Odoo 18
     "data": [
         "data/invoice_service_type_detail_data.xml",
+        "data/ir_cron.xml",
         "security/ir.model.access.csv",
         "views/res_partner_view.xml",
         "views/account_tax_view.xml",
@@ -22,6 +23,7 @@
         ]
     },
     "license": "LGPL-3",
+    "post_init_hook": "post_init_hook",
     "external_dependencies": {"python": ["pycountry"]},
     "application": True,  # Added for better module categorization in Odoo 18
 }
\ No newline at end of file
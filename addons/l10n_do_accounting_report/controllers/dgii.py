@@ -12,6 +12,22 @@ class DgiiReportsControllers(Controller):
         """Return a simple greeting for testing the endpoint."""
         return "hola amigos"
 
+    @staticmethod
+    def _get_record_url(model_name: str, record_id: int) -> str:
+        """Build the backend URL of a record, using the cached action and form view ids."""
+        action_id, view_id = request.env["dgii.reports"]._get_redirect_action_view(model_name)
+        if not action_id:
+            return "/web"
+        url_params = {
+            "model": model_name,
+            "action": action_id,
+            "id": record_id,
+            "active_id": record_id,
+        }
+        if view_id:
+            url_params["view_id"] = view_id
+        return f"/web?{urlencode(url_params)}"
+
     @route("/dgii_reports", type="http", auth="user", methods=["GET"])
     def redirect_link(self, rnc: str = None, invoice_id: str = None, modify: str = None) -> werkzeug_redirect:
         """Redirect to a partner or invoice form view based on RNC or invoice ID.
@@ -45,29 +61,57 @@ class DgiiReportsControllers(Controller):
             pass
 
         if record:
-            # Use action reference instead of get_access_action (deprecated in Odoo 18)
-            model_action_map = {
-                "res.partner": "base.action_partner_form",
-                "account.move": "account.action_move_out_invoice_type",
-            }
-            action_ref = model_action_map.get(record._name)
-            if not action_ref:
-                return werkzeug_redirect(url)
-
-            url_params = {
-                "model": record._name,
-                "action": request.env.ref(action_ref).id,
-            }
-
-            if len(record) == 1:
-                url_params["id"] = record.id
-                url_params["active_id"] = record.id
-
-            # Use form view directly (get_formview_id is deprecated)
-            form_view = request.env.ref(f"{record._module}.{record._name}_view_form", False)
-            if form_view:
-                url_params["view_id"] = form_view.id
-
-            url = f"/web?{urlencode(url_params)}"
-
-        return werkzeug_redirect(url)
\ No newline at end of file
+            url = self._get_record_url(record._name, record.id)
+
+        return werkzeug_redirect(url)
+
+    @route("/dgii_reports/lines", type="json", auth="user")
+    def report_lines(self, report_id: int, report_type: str, after_line: int = 0, limit: int = 80, fields: list = None) -> dict:
+        """Return a page of report lines after ``after_line`` plus the report totals.
+
+        Args:
+            report_id (int): ID of the DGII report.
+            report_type (str): "606", "607", "608" or "609".
+            after_line (int): Last line number of the previous page (keyset cursor).
+            limit (int): Page size, capped at 500.
+            fields (list, optional): Line fields to return.
+
+        Returns:
+            dict: ``lines``, ``next_after_line`` (False on the last page) and ``totals``.
+        """
+        report = request.env["dgii.reports"].browse(int(report_id))
+        return report._get_report_lines_page(
+            report_type,
+            after_line=int(after_line),
+            limit=min(int(limit), 500),
+            fields=fields,
+        )
+
+    @route("/dgii_reports/urls", type="json", auth="user")
+    def redirect_links(self, rncs: list = None, invoice_ids: list = None) -> dict:
+        """Resolve many RNCs and invoice IDs to backend URLs in one call.
+
+        Args:
+            rncs (list, optional): Partner VATs (RNC/Cédula).
+            invoice_ids (list, optional): Invoice IDs.
+
+        Returns:
+            dict: ``{"rnc": {rnc: url}, "invoice": {invoice_id: url}}``; unknown values are omitted.
+        """
+        partner_ids = {}
+        if rncs:
+            for partner in request.env["res.partner"].search_read([("vat", "in", list(rncs))], ["vat"]):
+                partner_ids.setdefault(partner["vat"], partner["id"])
+        invoices = request.env["account.move"].browse(
+            [int(invoice_id) for invoice_id in invoice_ids or []]
+        ).exists()
+        return {
+            "rnc": {
+                vat: self._get_record_url("res.partner", partner_id)
+                for vat, partner_id in partner_ids.items()
+            },
+            "invoice": {
+                str(invoice.id): self._get_record_url("account.move", invoice.id)
+                for invoice in invoices
+            },
+        }
@@ -0,0 +1,7 @@
+from .models.account_move import DGII_BACKFILL_PARAM
+
+
+def post_init_hook(env):
+    """Programa el llenado por bloques de los campos DGII de las facturas existentes."""
+    env["ir.config_parameter"].sudo().set_param(DGII_BACKFILL_PARAM, "0")
+    env.ref("l10n_do_accounting_report.ir_cron_l10n_do_backfill_dgii_fields")._trigger()
@@ -1,6 +1,159 @@
 # -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
+
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import column_exists, create_column
+
+_logger = logging.getLogger(__name__)
+
+# Cantidad de facturas clasificadas por cada lectura de apuntes
+DGII_COMPUTE_CHUNK = 1000
+DGII_LINE_FIELDS = ["move_id", "tax_line_id", "tax_ids", "account_id", "balance"]
+
+# Forma de pago del 606 según la forma de pago del diario del pago
+DGII_606_JOURNAL_PAYMENT_FORMS = {
+    "cash": "01",
+    "bank": "02",
+    "card": "03",
+    "credit": "04",
+    "swap": "05",
+}
+DGII_606_JOURNAL_TYPE_PAYMENT_FORMS = {"cash": "01", "bank": "02"}
+# Compensaciones en diarios que no son de caja ni banco
+DGII_606_SWAP = "05"
+# Facturas conciliadas con la del proveedor: las de cliente son una permuta
+# y las de proveedor (notas de crédito) cuentan como nota de crédito
+DGII_606_MOVE_TYPE_PAYMENT_FORMS = {
+    "out_invoice": DGII_606_SWAP,
+    "out_refund": DGII_606_SWAP,
+    "in_invoice": "06",
+    "in_refund": "06",
+}
+DGII_606_MIXED = "07"
+
+# Último id procesado por el backfill de campos DGII (False: no hay pendiente)
+DGII_BACKFILL_PARAM = "l10n_do_accounting_report.dgii_backfill_last_id"
+DGII_BACKFILL_COLUMNS = {
+    "service_total_amount": "numeric",
+    "good_total_amount": "numeric",
+    "invoiced_itbis": "numeric",
+    "withholded_itbis": "numeric",
+    "income_withholding": "numeric",
+    "third_withheld_itbis": "numeric",
+    "third_income_withholding": "numeric",
+    "amount_with_isr_withholding": "numeric",
+    "payment_date": "date",
+    "proportionality_tax": "numeric",
+    "cost_itbis": "numeric",
+    "selective_tax": "numeric",
+    "other_taxes": "numeric",
+    "legal_tip": "numeric",
+    "advance_itbis": "numeric",
+    "isr_withholding_type": "varchar(2)",
+    "payment_form": "varchar",
+    "is_exterior": "boolean",
+}
+_DGII_BACKFILL_SQL = """
+    WITH moves AS (
+        SELECT move.id,
+               move.payment_state,
+               move.move_type IN ('in_invoice', 'in_refund') AS is_purchase,
+               move.move_type IN ('out_invoice', 'out_refund') AS is_sale,
+               COALESCE(company_partner.country_id <> partner.country_id, FALSE) AS is_exterior
+          FROM account_move move
+          JOIN res_company company ON company.id = move.company_id
+          JOIN res_partner company_partner ON company_partner.id = company.partner_id
+     LEFT JOIN res_partner partner ON partner.id = move.partner_id
+         WHERE move.id IN %(ids)s
+    ),
+    amounts AS (
+        SELECT line.move_id,
+               sum(line.price_subtotal) FILTER (WHERE tmpl.type = 'service') AS service,
+               sum(line.price_subtotal) FILTER (WHERE tmpl.type IS DISTINCT FROM 'service') AS goods
+          FROM account_move_line line
+     LEFT JOIN product_product product ON product.id = line.product_id
+     LEFT JOIN product_template tmpl ON tmpl.id = product.product_tmpl_id
+         WHERE line.move_id IN %(ids)s
+           AND line.display_type = 'product'
+         GROUP BY line.move_id
+    ),
+    taxes AS (
+        SELECT line.move_id,
+               sum(line.balance) FILTER (WHERE tax.purchase_tax_type = 'itbis') AS itbis,
+               sum(line.balance) FILTER (WHERE tax.purchase_tax_type = 'ritbis') AS ritbis,
+               sum(line.balance) FILTER (WHERE tax.purchase_tax_type = 'isr') AS isr,
+               sum(abs(line.balance)) FILTER (
+                   WHERE tax.purchase_tax_type = 'isr'
+                     AND EXISTS (
+                         SELECT 1
+                           FROM account_move_line_account_tax_rel rel
+                          WHERE rel.account_move_line_id = line.id
+                     )
+               ) AS isr_base,
+               sum(line.balance) FILTER (WHERE account.account_fiscal_type IN ('A29', 'A30')) AS proportionality,
+               sum(line.balance) FILTER (WHERE account.account_fiscal_type = 'A51') AS cost_itbis,
+               sum(line.balance) FILTER (WHERE tax_group.l10n_do_dgii_tax_category = 'isc') AS selective,
+               sum(line.balance) FILTER (WHERE tax_group.l10n_do_dgii_tax_category = 'tip') AS legal_tip,
+               sum(line.balance) FILTER (
+                   WHERE tax.id IS NOT NULL
+                     AND COALESCE(tax_group.l10n_do_dgii_tax_category, 'other') NOT IN ('isc', 'tip')
+                     AND COALESCE(tax.purchase_tax_type, 'none') NOT IN ('itbis', 'ritbis', 'isr', 'rext')
+               ) AS others,
+               (array_agg(tax.isr_retention_type ORDER BY line.id) FILTER (
+                   WHERE tax.purchase_tax_type = 'isr' AND tax.isr_retention_type IS NOT NULL
+               ))[1] AS isr_code
+          FROM account_move_line line
+     LEFT JOIN account_account account ON account.id = line.account_id
+     LEFT JOIN account_tax tax ON tax.id = line.tax_line_id
+     LEFT JOIN account_tax_group tax_group ON tax_group.id = tax.tax_group_id
+         WHERE line.move_id IN %(ids)s
+         GROUP BY line.move_id
+    ),
+    payments AS (
+        SELECT line.move_id,
+               max(COALESCE(part.max_date, part.create_date::date)) AS payment_date
+          FROM account_move_line line
+          JOIN account_move move ON move.id = line.move_id
+          JOIN account_account account ON account.id = line.account_id
+          JOIN account_partial_reconcile part
+            ON line.id IN (part.debit_move_id, part.credit_move_id)
+         WHERE line.move_id IN %(ids)s
+           AND move.payment_state = 'paid'
+           AND account.account_type IN ('asset_receivable', 'liability_payable')
+         GROUP BY line.move_id
+    )
+    UPDATE account_move move
+       SET service_total_amount = CASE WHEN m.is_purchase THEN COALESCE(a.service, 0) ELSE 0 END,
+           good_total_amount = CASE WHEN m.is_purchase THEN COALESCE(a.goods, 0) ELSE 0 END,
+           invoiced_itbis = COALESCE(t.itbis, 0),
+           withholded_itbis = CASE WHEN m.is_purchase THEN COALESCE(t.ritbis, 0) ELSE 0 END,
+           income_withholding = CASE WHEN m.is_purchase THEN COALESCE(t.isr, 0) ELSE 0 END,
+           third_withheld_itbis = CASE WHEN m.is_sale THEN COALESCE(t.ritbis, 0) ELSE 0 END,
+           third_income_withholding = CASE WHEN m.is_sale THEN COALESCE(t.isr, 0) ELSE 0 END,
+           amount_with_isr_withholding = CASE
+               WHEN m.is_purchase OR m.is_sale THEN COALESCE(t.isr_base, 0) ELSE 0
+           END,
+           payment_date = p.payment_date,
+           proportionality_tax = COALESCE(t.proportionality, 0),
+           cost_itbis = COALESCE(t.cost_itbis, 0),
+           selective_tax = COALESCE(t.selective, 0),
+           other_taxes = COALESCE(t.others, 0),
+           legal_tip = COALESCE(t.legal_tip, 0),
+           advance_itbis = CASE
+               WHEN m.is_purchase
+               THEN COALESCE(t.itbis, 0) - COALESCE(t.proportionality, 0) - COALESCE(t.cost_itbis, 0)
+               ELSE 0
+           END,
+           isr_withholding_type = t.isr_code,
+           is_exterior = m.is_exterior
+      FROM moves m
+ LEFT JOIN amounts a ON a.move_id = m.id
+ LEFT JOIN taxes t ON t.move_id = m.id
+ LEFT JOIN payments p ON p.move_id = m.id
+     WHERE move.id = m.id
+"""
 
 
 class InvoiceServiceTypeDetail(models.Model):
@@ -42,82 +195,82 @@ class AccountMove(models.Model):
 
     invoiced_itbis = fields.Monetary(
         string="ITBIS Facturado",
-        compute="_compute_invoiced_itbis",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
 
     withholded_itbis = fields.Monetary(
         string="ITBIS Retenido",
-        compute="_compute_withheld_taxes",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
     income_withholding = fields.Monetary(
         string="ISR Retenido",
-        compute="_compute_withheld_taxes",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
     third_withheld_itbis = fields.Monetary(
         string="ITBIS Retenido (Terceros)",
-        compute="_compute_withheld_taxes",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
     third_income_withholding = fields.Monetary(
         string="ISR Retenido (Terceros)",
-        compute="_compute_withheld_taxes",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
 
     payment_date = fields.Date(
         string="Fecha de Pago",
-        compute="_compute_taxes_fields",
+        compute="_compute_payment_date",
         store=True,
     )
     proportionality_tax = fields.Monetary(
         string="ITBIS Sujeto a Proporcionalidad",
-        compute="_compute_taxes_fields",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
     cost_itbis = fields.Monetary(
         string="ITBIS Llevado al Costo",
-        compute="_compute_taxes_fields",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
     selective_tax = fields.Monetary(
         string="Impuesto Selectivo al Consumo",
-        compute="_compute_taxes_fields",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
     other_taxes = fields.Monetary(
         string="Otros Impuestos/Tasas",
-        compute="_compute_taxes_fields",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
     legal_tip = fields.Monetary(
         string="Propina Legal",
-        compute="_compute_taxes_fields",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
 
     advance_itbis = fields.Monetary(
         string="ITBIS por Adelantar",
-        compute="_compute_advance_itbis",
+        compute="_compute_dgii_tax_fields",
         store=True,
         currency_field="company_currency_id",
     )
 
     isr_withholding_type = fields.Char(
         string="Tipo de Retención ISR",
-        compute="_compute_isr_withholding_type",
+        compute="_compute_dgii_tax_fields",
         store=True,
         size=2,
     )
@@ -231,162 +384,263 @@ class AccountMove(models.Model):
             move.service_total_amount = service_total
             move.good_total_amount = goods_total
 
-    @api.depends("line_ids.tax_line_id", "line_ids.balance")
-    def _compute_invoiced_itbis(self):
-        for move in self:
-            itbis_amount = 0.0
-            for line in move.line_ids:
-                tax = line.tax_line_id
-                if tax and tax.purchase_tax_type == "itbis":
-                    itbis_amount += line.balance
-            move.invoiced_itbis = itbis_amount
-
     @api.depends(
         "move_type",
         "line_ids.tax_line_id",
         "line_ids.tax_line_id.purchase_tax_type",
+        "line_ids.tax_line_id.isr_retention_type",
+        "line_ids.tax_line_id.tax_group_id.l10n_do_dgii_tax_category",
+        "line_ids.tax_ids",
+        "line_ids.account_id.account_fiscal_type",
         "line_ids.balance",
     )
-    def _compute_withheld_taxes(self):
+    def _compute_dgii_tax_fields(self):
+        """
+        Clasifica los apuntes de cada factura en un solo recorrido y
+        asigna todos los montos DGII que dependen de los impuestos.
+        """
+        for index in range(0, len(self), DGII_COMPUTE_CHUNK):
+            self[index:index + DGII_COMPUTE_CHUNK]._l10n_do_classify_dgii_taxes()
+
+    def _l10n_do_read_dgii_lines(self):
+        """
+        Columnas de apuntes necesarias para la clasificación, leídas con un
+        único ``read`` para todo el bloque de facturas.
+        """
+        lines = self.line_ids
+        if all(isinstance(line_id, int) for line_id in lines._ids):
+            return lines.read(DGII_LINE_FIELDS, load=False)
+        # Registros nuevos (onchange): no hay nada que leer en la base de datos
+        return [
+            {
+                "move_id": line.move_id.id,
+                "tax_line_id": line.tax_line_id.id,
+                "tax_ids": line.tax_ids.ids,
+                "account_id": line.account_id.id,
+                "balance": line.balance,
+            }
+            for line in lines
+        ]
+
+    def _l10n_do_classify_dgii_taxes(self):
         purchase_types = ("in_invoice", "in_refund")
         sale_types = ("out_invoice", "out_refund")
 
+        line_values = self._l10n_do_read_dgii_lines()
+        categories = self.env["account.tax"]._l10n_do_get_dgii_tax_categories()
+        taxes = self.env["account.tax"].browse(
+            {vals["tax_line_id"] for vals in line_values if vals["tax_line_id"]}
+        )
+        tax_info = {
+            tax.id: (
+                tax.purchase_tax_type,
+                tax.isr_retention_type,
+                categories.get(tax.id),
+            )
+            for tax in taxes
+        }
+        accounts = self.env["account.account"].browse(
+            {vals["account_id"] for vals in line_values if vals["account_id"]}
+        )
+        fiscal_types = {account.id: account.account_fiscal_type for account in accounts}
+
+        lines_by_move = defaultdict(list)
+        for vals in line_values:
+            lines_by_move[vals["move_id"]].append(vals)
+
         for move in self:
+            is_purchase = move.move_type in purchase_types
+            is_sale = move.move_type in sale_types
+            itbis = 0.0
             wh_itbis = wh_isr = 0.0
             third_wh_itbis = third_wh_isr = 0.0
             isr_base = 0.0
+            proportionality = 0.0
+            cost_itbis = 0.0
+            selective = 0.0
+            others = 0.0
+            legal_tip = 0.0
+            isr_code = False
 
-            for line in move.line_ids:
-                tax = line.tax_line_id
-                if not tax:
-                    continue
+            for vals in lines_by_move.get(move.id, ()):
+                balance = vals["balance"]
 
-                tax_type = tax.purchase_tax_type
-
-                if move.move_type in purchase_types:
-                    if tax_type == "ritbis":
-                        wh_itbis += line.balance
-                    elif tax_type == "isr":
-                        wh_isr += line.balance
-                        if line.tax_ids:
-                            isr_base += abs(line.balance)
-                elif move.move_type in sale_types:
-                    if tax_type == "ritbis":
-                        third_wh_itbis += line.balance
-                    elif tax_type == "isr":
-                        third_wh_isr += line.balance
-                        if line.tax_ids:
-                            isr_base += abs(line.balance)
+                fiscal_type = fiscal_types.get(vals["account_id"])
+                if fiscal_type in ("A29", "A30"):
+                    proportionality += balance
+                elif fiscal_type == "A51":
+                    cost_itbis += balance
 
+                if not vals["tax_line_id"]:
+                    continue
+                tax_type, retention_type, category = tax_info[vals["tax_line_id"]]
+
+                if tax_type == "itbis":
+                    itbis += balance
+                elif tax_type == "ritbis":
+                    if is_purchase:
+                        wh_itbis += balance
+                    elif is_sale:
+                        third_wh_itbis += balance
+                elif tax_type == "isr":
+                    if is_purchase:
+                        wh_isr += balance
+                    elif is_sale:
+                        third_wh_isr += balance
+                    if (is_purchase or is_sale) and vals["tax_ids"]:
+                        isr_base += abs(balance)
+                    if not isr_code and retention_type:
+                        isr_code = retention_type
+
+                if category == "isc":
+                    selective += balance
+                elif category == "tip":
+                    legal_tip += balance
+                elif tax_type not in ("itbis", "ritbis", "isr", "rext"):
+                    others += balance
+
+            move.invoiced_itbis = itbis
             move.withholded_itbis = wh_itbis
             move.income_withholding = wh_isr
             move.third_withheld_itbis = third_wh_itbis
             move.third_income_withholding = third_wh_isr
             move.amount_with_isr_withholding = isr_base
+            move.proportionality_tax = proportionality
+            move.cost_itbis = cost_itbis
+            move.selective_tax = selective
+            move.other_taxes = others
+            move.legal_tip = legal_tip
+            move.advance_itbis = (
+                itbis - proportionality - cost_itbis if is_purchase else 0.0
+            )
+            move.isr_withholding_type = isr_code
 
     @api.depends(
         "payment_state",
-        "line_ids.account_id.account_type",
         "line_ids.matched_debit_ids",
         "line_ids.matched_credit_ids",
-        "line_ids.tax_line_id",
-        "line_ids.tax_line_id.purchase_tax_type",
-        "line_ids.account_id.account_fiscal_type",
-        "line_ids.balance",
     )
-    def _compute_taxes_fields(self):
+    def _compute_payment_date(self):
+        """Fecha de la última conciliación de cada factura pagada."""
+        paid_moves = self.filtered(
+            lambda m: m.payment_state == "paid" and isinstance(m.id, int)
+        )
+        payment_dates = paid_moves._l10n_do_get_payment_dates()
         for move in self:
-            pay_date = False
-            if move.payment_state == "paid":
-                payment_dates = set()
-                rec_pay_lines = move.line_ids.filtered(
-                    lambda l: l.account_id.account_type
-                    in ("asset_receivable", "liability_payable")
-                )
-                for line in rec_pay_lines:
-                    partials = line.matched_debit_ids | line.matched_credit_ids
-                    for partial in partials:
-                        if getattr(partial, "max_date", False):
-                            payment_dates.add(partial.max_date)
-                        elif partial.create_date:
-                            payment_dates.add(partial.create_date.date())
-                if payment_dates:
-                    pay_date = max(payment_dates)
+            move.payment_date = payment_dates.get(move.id, False)
 
-            proportionality = 0.0
-            cost_itbis = 0.0
-            selective = 0.0
-            others = 0.0
-            legal_tip = 0.0
-
-            for line in move.line_ids:
-                tax = line.tax_line_id
-                acc = line.account_id
+    def _l10n_do_get_payment_dates(self):
+        """
+        Fecha máxima de conciliación por factura, en una sola consulta
+        agrupada sobre ``account.partial.reconcile``.
 
-                if acc and acc.account_fiscal_type:
-                    if acc.account_fiscal_type in ("A29", "A30"):
-                        proportionality += line.balance
-                    elif acc.account_fiscal_type == "A51":
-                        cost_itbis += line.balance
+        :return: dict {id de factura: fecha}
+        """
+        if not self:
+            return {}
+        self.env["account.move.line"].flush_model(["move_id", "account_id"])
+        self.env["account.partial.reconcile"].flush_model(
+            ["debit_move_id", "credit_move_id", "max_date"]
+        )
+        self.env.cr.execute(
+            """
+            SELECT line.move_id,
+                   max(COALESCE(part.max_date, part.create_date::date))
+              FROM account_move_line line
+              JOIN account_account account ON account.id = line.account_id
+              JOIN account_partial_reconcile part
+                ON line.id IN (part.debit_move_id, part.credit_move_id)
+             WHERE line.move_id IN %s
+               AND account.account_type IN ('asset_receivable', 'liability_payable')
+             GROUP BY line.move_id
+            """,
+            [tuple(self.ids)],
+        )
+        return dict(self.env.cr.fetchall())
 
-                if tax:
-                    group_name = (tax.tax_group_id.name or "").upper()
-                    tax_type = tax.purchase_tax_type
+    @api.depends(
+        "payment_state",
+        "move_type",
+        "line_ids.matched_debit_ids",
+        "line_ids.matched_credit_ids",
+    )
+    def _compute_in_invoice_payment_form(self):
+        payment_forms = self._l10n_do_get_606_payment_forms()
+        for move in self:
+            move.payment_form = payment_forms.get(move.id, False)
 
-                    if "SELECTIVO" in group_name:
-                        selective += line.balance
-                    elif "PROPINA" in group_name:
-                        legal_tip += line.balance
-                    else:
-                        if tax_type not in ("itbis", "ritbis", "isr", "rext"):
-                            others += line.balance
+    def _l10n_do_get_606_payment_forms(self):
+        """
+        Forma de pago del 606 de las facturas de proveedor, a partir de lo
+        que se concilió con ellas, en una sola consulta agrupada.
 
-            move.payment_date = pay_date
-            move.proportionality_tax = proportionality
-            move.cost_itbis = cost_itbis
-            move.selective_tax = selective
-            move.other_taxes = others
-            move.legal_tip = legal_tip
+        Cada contrapartida se clasifica por la forma de pago de su diario
+        (o el tipo de diario: caja "01", banco "02", otro "05"). Las notas
+        de crédito de proveedor cuentan como "06" y las facturas de cliente
+        como permuta "05". Si hay más de una forma, o queda saldo pendiente
+        junto a pagos, la factura es "07" (mixto).
 
-    @api.depends("invoiced_itbis", "proportionality_tax", "cost_itbis", "move_type")
-    def _compute_advance_itbis(self):
-        purchase_types = ("in_invoice", "in_refund")
-        for move in self:
-            if move.move_type in purchase_types:
-                move.advance_itbis = (
-                    (move.invoiced_itbis or 0.0)
-                    - (move.proportionality_tax or 0.0)
-                    - (move.cost_itbis or 0.0)
-                )
+        :return: dict {id de factura: código de forma de pago}
+        """
+        bills = self.filtered(
+            lambda m: m.move_type in ("in_invoice", "in_refund") and isinstance(m.id, int)
+        )
+        if not bills:
+            return {}
+        self.env["account.move.line"].flush_model(["move_id", "account_id"])
+        self.env["account.partial.reconcile"].flush_model(["debit_move_id", "credit_move_id"])
+        self.env["account.journal"].flush_model(["type", "l10n_do_payment_form"])
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT line.move_id, counterpart_move.move_type,
+                   journal.l10n_do_payment_form, journal.type
+              FROM account_move_line line
+              JOIN account_account account ON account.id = line.account_id
+              JOIN account_partial_reconcile part
+                ON line.id IN (part.debit_move_id, part.credit_move_id)
+              JOIN account_move_line counterpart
+                ON counterpart.id = CASE WHEN part.debit_move_id = line.id
+                                         THEN part.credit_move_id
+                                         ELSE part.debit_move_id END
+              JOIN account_move counterpart_move ON counterpart_move.id = counterpart.move_id
+              JOIN account_journal journal ON journal.id = counterpart_move.journal_id
+             WHERE line.move_id IN %s
+               AND account.account_type = 'liability_payable'
+            """,
+            [tuple(bills.ids)],
+        )
+        codes_by_bill = defaultdict(set)
+        for bill_id, move_type, payment_form, journal_type in self.env.cr.fetchall():
+            if move_type in DGII_606_MOVE_TYPE_PAYMENT_FORMS:
+                code = DGII_606_MOVE_TYPE_PAYMENT_FORMS[move_type]
             else:
-                move.advance_itbis = 0.0
-
-    @api.depends("line_ids.tax_line_id", "line_ids.tax_line_id.purchase_tax_type")
-    def _compute_isr_withholding_type(self):
-        for move in self:
-            code = False
-            for line in move.line_ids:
-                tax = line.tax_line_id
-                if (
-                    tax
-                    and tax.purchase_tax_type == "isr"
-                    and tax.isr_retention_type
-                ):
-                    code = tax.isr_retention_type
-                    break
-            move.isr_withholding_type = code or False
-
-    @api.depends("payment_state", "move_type")
-    def _compute_in_invoice_payment_form(self):
-        purchase_types = ("in_invoice", "in_refund")
-        for move in self:
-            code = False
-            if move.move_type in purchase_types:
-                if move.payment_state in ("not_paid", "partial"):
-                    code = "04"
-                elif move.payment_state == "paid":
-                    code = "02"
-            move.payment_form = code
+                code = DGII_606_JOURNAL_PAYMENT_FORMS.get(
+                    payment_form
+                ) or DGII_606_JOURNAL_TYPE_PAYMENT_FORMS.get(journal_type, DGII_606_SWAP)
+            codes_by_bill[bill_id].add(code)
+
+        payment_forms = {}
+        for bill in bills:
+            codes = codes_by_bill.get(bill.id, set())
+            if bill.payment_state in ("not_paid", "partial"):
+                codes.add("04")
+            if len(codes) > 1:
+                payment_forms[bill.id] = DGII_606_MIXED
+            elif codes:
+                payment_forms[bill.id] = codes.pop()
+            else:
+                payment_forms[bill.id] = "02"
+        return payment_forms
+
+    def _l10n_do_refresh_606_payment_form(self):
+        """Recalcula y guarda la forma de pago del 606, agrupando las escrituras."""
+        moves_by_form = defaultdict(list)
+        for move_id, code in self._l10n_do_get_606_payment_forms().items():
+            moves_by_form[code].append(move_id)
+        for code, move_ids in moves_by_form.items():
+            moves = self.browse(move_ids).filtered(lambda m: m.payment_form != code)
+            if moves:
+                moves.write({"payment_form": code})
 
     @api.depends("partner_id.country_id", "company_id.country_id")
     def _compute_is_exterior(self):
@@ -398,3 +652,74 @@ class AccountMove(models.Model):
                 and partner_country
                 and company_country != partner_country
             )
+
+    # -------------------------------------------------------------------------
+    #   BACKFILL
+    # -------------------------------------------------------------------------
+    def _auto_init(self):
+        # Se crean las columnas antes que el ORM para que la instalación no
+        # recalcule factura por factura; el llenado lo hace el backfill.
+        for column, column_type in DGII_BACKFILL_COLUMNS.items():
+            if not column_exists(self.env.cr, "account_move", column):
+                create_column(self.env.cr, "account_move", column, column_type)
+        return super()._auto_init()
+
+    @api.model
+    def _l10n_do_backfill_dgii_chunk(self, ids):
+        """Calcula en SQL los campos DGII almacenados de las facturas ``ids``."""
+        self.env["account.move.line"].flush_model()
+        self.env["account.partial.reconcile"].flush_model()
+        self.env["account.tax.group"].flush_model(["l10n_do_dgii_tax_category"])
+        self.flush_model()
+        self.env.cr.execute(_DGII_BACKFILL_SQL, {"ids": tuple(ids)})
+        self.invalidate_model(list(DGII_BACKFILL_COLUMNS))
+        self.browse(ids)._l10n_do_refresh_606_payment_form()
+
+    @api.model
+    def _l10n_do_backfill_dgii_step(self, chunk_size):
+        """
+        Procesa el siguiente bloque pendiente del backfill.
+
+        :return: (facturas procesadas, facturas pendientes)
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        last_id = ICP.get_param(DGII_BACKFILL_PARAM)
+        if last_id is False:
+            return 0, 0
+        self.env.cr.execute(
+            "SELECT id FROM account_move WHERE id > %s ORDER BY id LIMIT %s",
+            [int(last_id), chunk_size],
+        )
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        if ids:
+            self._l10n_do_backfill_dgii_chunk(ids)
+            last_id = ids[-1]
+        self.env.cr.execute("SELECT count(*) FROM account_move WHERE id > %s", [int(last_id)])
+        remaining = self.env.cr.fetchone()[0]
+        ICP.set_param(DGII_BACKFILL_PARAM, str(last_id) if remaining else False)
+        _logger.info("Backfill DGII: %s facturas procesadas, %s pendientes", len(ids), remaining)
+        return len(ids), remaining
+
+    @api.model
+    def _cron_l10n_do_backfill_dgii_fields(self, chunk_size=5000):
+        done, remaining = self._l10n_do_backfill_dgii_step(chunk_size)
+        self.env["ir.cron"]._notify_progress(done=done, remaining=remaining)
+
+    @api.model
+    def _l10n_do_backfill_dgii_fields(self, chunk_size=5000, restart=False):
+        """
+        Llena los campos DGII almacenados de todas las facturas por bloques,
+        confirmando la transacción entre bloques. Si se interrumpe, la
+        siguiente ejecución continúa desde el último bloque confirmado.
+
+        Uso desde la consola::
+
+            env["account.move"]._l10n_do_backfill_dgii_fields()
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        if restart or ICP.get_param(DGII_BACKFILL_PARAM) is False:
+            ICP.set_param(DGII_BACKFILL_PARAM, "0")
+        remaining = True
+        while remaining:
+            _done, remaining = self._l10n_do_backfill_dgii_step(chunk_size)
+            self.env.cr.commit()
@@ -1,14 +1,18 @@
 """file: dgii_report.py ."""
 import base64
 import calendar
+import gzip
 import tempfile
 from datetime import datetime as dt, date as ddate
 import logging
 import json
 _logger = logging.getLogger(__name__)
 
-from odoo import _, _lt, api, fields, models
-from odoo.exceptions import ValidationError
+from odoo import _, _lt, api, fields, models, tools
+from odoo.exceptions import AccessError, ValidationError
+from odoo.tools.sql import column_exists, create_index, table_exists
+
+from .dgii_txt_validator import validate_txt
 
 try:
     import pycountry
@@ -22,6 +26,125 @@ except ImportError:
     )
 
 
+# Campos de las líneas del 607 copiados de la factura. Los reportes generados
+# con líneas livianas no los guardan y los leen de la factura.
+DGII_SALE_LINE_INVOICE_FIELDS = [
+    "fiscal_invoice_number",
+    "invoice_date",
+    "invoiced_amount",
+    "invoiced_itbis",
+    "selective_tax",
+    "other_taxes",
+    "legal_tip",
+    "credit_note",
+]
+# Modelos de líneas de reporte que se limpian al quedar huérfanos
+DGII_REPORT_LINE_MODELS = [
+    "dgii.reports.purchase.line",
+    "dgii.reports.sale.line",
+    "dgii.reports.cancel.line",
+    "dgii.reports.exterior.line",
+]
+# Por tipo de reporte: modelo de líneas y campos de totales del reporte
+DGII_REPORT_LINE_TYPES = {
+    "606": (
+        "dgii.reports.purchase.line",
+        [
+            "purchase_records",
+            "service_total_amount",
+            "good_total_amount",
+            "purchase_invoiced_amount",
+            "purchase_invoiced_itbis",
+            "purchase_withholded_itbis",
+            "cost_itbis",
+            "advance_itbis",
+            "income_withholding",
+            "purchase_selective_tax",
+            "purchase_other_taxes",
+            "purchase_legal_tip",
+        ],
+    ),
+    "607": (
+        "dgii.reports.sale.line",
+        [
+            "sale_records",
+            "sale_invoiced_amount",
+            "sale_invoiced_itbis",
+            "sale_withholded_itbis",
+            "sale_withholded_isr",
+            "sale_selective_tax",
+            "sale_other_taxes",
+            "sale_legal_tip",
+        ],
+    ),
+    "608": ("dgii.reports.cancel.line", ["cancel_records"]),
+    "609": (
+        "dgii.reports.exterior.line",
+        [
+            "exterior_records",
+            "presumed_income",
+            "exterior_withholded_isr",
+            "exterior_invoiced_amount",
+        ],
+    ),
+}
+# Columna de las líneas que suma cada total del reporte (None: cantidad de
+# líneas). Se usa para cargar los totales de reportes anteriores a que se
+# guardaran.
+DGII_REPORT_TOTAL_COLUMNS = {
+    "purchase_records": None,
+    "service_total_amount": "service_total_amount",
+    "good_total_amount": "good_total_amount",
+    "purchase_invoiced_amount": "invoiced_amount",
+    "purchase_invoiced_itbis": "invoiced_itbis",
+    "purchase_withholded_itbis": "withholded_itbis",
+    "cost_itbis": "cost_itbis",
+    "advance_itbis": "advance_itbis",
+    "income_withholding": "income_withholding",
+    "purchase_selective_tax": "selective_tax",
+    "purchase_other_taxes": "other_taxes",
+    "purchase_legal_tip": "legal_tip",
+    "sale_records": None,
+    "sale_invoiced_amount": "invoiced_amount",
+    "sale_invoiced_itbis": "invoiced_itbis",
+    "sale_withholded_itbis": "third_withheld_itbis",
+    "sale_withholded_isr": "third_income_withholding",
+    "sale_selective_tax": "selective_tax",
+    "sale_other_taxes": "other_taxes",
+    "sale_legal_tip": "legal_tip",
+    "cancel_records": None,
+    "exterior_records": None,
+    "presumed_income": "presumed_income",
+    "exterior_withholded_isr": "withholded_isr",
+    "exterior_invoiced_amount": "invoiced_amount",
+}
+
+
+# Meses que deben pasar para archivar las líneas de un reporte enviado
+DGII_ARCHIVE_MONTHS_PARAM = "l10n_do_accounting_report.archive_after_months"
+DGII_ARCHIVE_MONTHS_DEFAULT = 24
+# Reportes que archiva cada ejecución del cron
+DGII_ARCHIVE_BATCH_SIZE = 5
+# Si está activo, los 607 que se generen no copian los datos de la factura
+DGII_LEAN_607_PARAM = "l10n_do_accounting_report.lean_607_lines"
+
+# Acción y vista de formulario a las que enlazan las líneas de los reportes
+DGII_REDIRECT_TARGETS = {
+    "res.partner": ("base.action_partner_form", "base.view_partner_form"),
+    "account.move": ("account.action_move_out_invoice_type", "account.view_move_form"),
+}
+
+
+def _create_report_line_index(line_model):
+    """Índice compuesto usado para paginar las líneas de un reporte."""
+    create_index(
+        line_model.env.cr,
+        "%s_report_line_index" % line_model._table,
+        line_model._table,
+        ["dgii_report_id", "line"],
+    )
+
+
 class DgiiReportSaleSummary(models.Model):
     _name = "dgii.reports.sale.summary"
     _description = "DGII Report Sale Summary"
@@ -103,6 +226,39 @@ class DgiiReport(models.Model):
         )
     ]
 
+    def _auto_init(self):
+        # Los totales se guardan desde que existen; los de reportes anteriores
+        # se cargan en SQL desde sus líneas
+        backfill = not column_exists(self.env.cr, self._table, "purchase_records")
+        res = super()._auto_init()
+        if backfill:
+            for line_model, total_fields in DGII_REPORT_LINE_TYPES.values():
+                table = self.env[line_model]._table
+                if not table_exists(self.env.cr, table):
+                    continue
+                self.env.cr.execute(
+                    """
+                    UPDATE "%s" r SET %s
+                      FROM (SELECT dgii_report_id, %s
+                              FROM "%s"
+                             GROUP BY dgii_report_id) t
+                     WHERE t.dgii_report_id = r.id
+                    """
+                    % (
+                        self._table,
+                        ", ".join('"%s" = t."%s"' % (name, name) for name in total_fields),
+                        ", ".join(
+                            'abs(COALESCE(sum("%s"), 0)) AS "%s"'
+                            % (DGII_REPORT_TOTAL_COLUMNS[name], name)
+                            if DGII_REPORT_TOTAL_COLUMNS[name]
+                            else 'count(*) AS "%s"' % name
+                            for name in total_fields
+                        ),
+                        table,
+                    )
+                )
+        return res
+
     @api.model
     def _compute_606_fields(self):
         for rec in self:
@@ -165,15 +321,17 @@ class DgiiReport(models.Model):
             sale_line_ids = self.env["dgii.reports.sale.line"].search(
                 [("dgii_report_id", "=", rec.id)]
             )
+            invoice_values = sale_line_ids._get_invoice_values()
             for inv in sale_line_ids:
+                inv_values = invoice_values[inv.id]
                 data["sale_records"] += 1
-                data["sale_invoiced_amount"] += inv.invoiced_amount
-                data["sale_invoiced_itbis"] += inv.invoiced_itbis
+                data["sale_invoiced_amount"] += inv_values["invoiced_amount"]
+                data["sale_invoiced_itbis"] += inv_values["invoiced_itbis"]
                 data["sale_withholded_itbis"] += inv.third_withheld_itbis
                 data["sale_withholded_isr"] += inv.third_income_withholding
-                data["sale_selective_tax"] += inv.selective_tax
-                data["sale_other_taxes"] += inv.other_taxes
-                data["sale_legal_tip"] += inv.legal_tip
+                data["sale_selective_tax"] += inv_values["selective_tax"]
+                data["sale_other_taxes"] += inv_values["other_taxes"]
+                data["sale_legal_tip"] += inv_values["legal_tip"]
             rec.sale_records = abs(data["sale_records"])
             rec.sale_invoiced_amount = abs(data["sale_invoiced_amount"])
             rec.sale_invoiced_itbis = abs(data["sale_invoiced_itbis"])
@@ -213,47 +371,70 @@ class DgiiReport(models.Model):
             rec.exterior_withholded_isr = abs(data["exterior_withholded_isr"])
             rec.exterior_invoiced_amount = abs(data["exterior_invoiced_amount"])
 
+    # Totales de cada formato. Son campos guardados, sin dependencias: los
+    # escriben los métodos _compute_60X_fields al generar el reporte, de modo
+    # que reflejan las líneas tal como se generaron.
+
     # 606
-    purchase_records = fields.Integer(compute="_compute_606_fields")
-    service_total_amount = fields.Monetary(compute="_compute_606_fields")
-    good_total_amount = fields.Monetary(compute="_compute_606_fields")
-    purchase_invoiced_amount = fields.Monetary(compute="_compute_606_fields")
-    purchase_invoiced_itbis = fields.Monetary(compute="_compute_606_fields")
-    purchase_withholded_itbis = fields.Monetary(compute="_compute_606_fields")
-    cost_itbis = fields.Monetary(compute="_compute_606_fields")
-    advance_itbis = fields.Monetary(compute="_compute_606_fields")
-    income_withholding = fields.Monetary(compute="_compute_606_fields")
-    purchase_selective_tax = fields.Monetary(compute="_compute_606_fields")
-    purchase_other_taxes = fields.Monetary(compute="_compute_606_fields")
-    purchase_legal_tip = fields.Monetary(compute="_compute_606_fields")
+    purchase_records = fields.Integer(readonly=True, copy=False)
+    service_total_amount = fields.Monetary(readonly=True, copy=False)
+    good_total_amount = fields.Monetary(readonly=True, copy=False)
+    purchase_invoiced_amount = fields.Monetary(readonly=True, copy=False)
+    purchase_invoiced_itbis = fields.Monetary(readonly=True, copy=False)
+    purchase_withholded_itbis = fields.Monetary(readonly=True, copy=False)
+    cost_itbis = fields.Monetary(readonly=True, copy=False)
+    advance_itbis = fields.Monetary(readonly=True, copy=False)
+    income_withholding = fields.Monetary(readonly=True, copy=False)
+    purchase_selective_tax = fields.Monetary(readonly=True, copy=False)
+    purchase_other_taxes = fields.Monetary(readonly=True, copy=False)
+    purchase_legal_tip = fields.Monetary(readonly=True, copy=False)
     purchase_filename = fields.Char()
     purchase_binary = fields.Binary(string="606 file")
 
     # 607
-    sale_records = fields.Integer(compute="_compute_607_fields")
-    sale_invoiced_amount = fields.Float(compute="_compute_607_fields")
-    sale_invoiced_itbis = fields.Float(compute="_compute_607_fields")
-    sale_withholded_itbis = fields.Float(compute="_compute_607_fields")
-    sale_withholded_isr = fields.Float(compute="_compute_607_fields")
-    sale_selective_tax = fields.Float(compute="_compute_607_fields")
-    sale_other_taxes = fields.Float(compute="_compute_607_fields")
-    sale_legal_tip = fields.Float(compute="_compute_607_fields")
+    sale_records = fields.Integer(readonly=True, copy=False)
+    sale_invoiced_amount = fields.Float(readonly=True, copy=False)
+    sale_invoiced_itbis = fields.Float(readonly=True, copy=False)
+    sale_withholded_itbis = fields.Float(readonly=True, copy=False)
+    sale_withholded_isr = fields.Float(readonly=True, copy=False)
+    sale_selective_tax = fields.Float(readonly=True, copy=False)
+    sale_other_taxes = fields.Float(readonly=True, copy=False)
+    sale_legal_tip = fields.Float(readonly=True, copy=False)
     sale_filename = fields.Char()
     sale_binary = fields.Binary(string="607 file")
 
     # 608
-    cancel_records = fields.Integer(compute="_compute_608_fields")
+    cancel_records = fields.Integer(readonly=True, copy=False)
     cancel_filename = fields.Char()
     cancel_binary = fields.Binary(string="608 file")
 
     # 609
-    exterior_records = fields.Integer(compute="_compute_609_fields")
-    presumed_income = fields.Float(compute="_compute_609_fields")
-    exterior_withholded_isr = fields.Float(compute="_compute_609_fields")
-    exterior_invoiced_amount = fields.Float(compute="_compute_609_fields")
+    exterior_records = fields.Integer(readonly=True, copy=False)
+    presumed_income = fields.Float(readonly=True, copy=False)
+    exterior_withholded_isr = fields.Float(readonly=True, copy=False)
+    exterior_invoiced_amount = fields.Float(readonly=True, copy=False)
     exterior_filename = fields.Char()
     exterior_binary = fields.Binary(string="609 file")
 
+    # Errores de la validación de los TXT, en JSON: [{report, row, column, value, error}]
+    txt_errors = fields.Text("TXT validation errors", readonly=True, copy=False)
+    txt_error_count = fields.Integer("TXT errors", readonly=True, copy=False)
+
+    # Archivo de líneas: JSON comprimido con gzip en un adjunto del reporte
+    lines_archived = fields.Boolean("Archived lines", readonly=True, copy=False)
+    # Los reportes restaurados a mano no los vuelve a archivar el cron
+    lines_restored_date = fields.Date("Lines restored on", readonly=True, copy=False)
+
+    # Se fija al generar el 607 según DGII_LEAN_607_PARAM
+    lean_lines = fields.Boolean(
+        "Lean 607 lines",
+        readonly=True,
+        copy=False,
+        help="The 607 lines of this report do not store the invoice data; "
+        "it is read from the invoice.",
+    )
+    lines_archive_id = fields.Many2one("ir.attachment", readonly=True, copy=False)
+
     # IT-1
     ncf_sale_summary_ids = fields.One2many(
         "dgii.reports.sale.summary",
@@ -510,6 +691,22 @@ class DgiiReport(models.Model):
                 "purchase_binary": base64.b64encode(open(file_path, "rb").read()),
             }
         )
+        self._validate_txt("606", data, period)
+
+    def _validate_txt(self, report_type, data, period):
+        """Agrega al reporte los errores estructurales del TXT generado."""
+        errors = json.loads(self.txt_errors or "[]")
+        errors = [error for error in errors if error["report"] != report_type]
+        errors += [
+            dict(error, report=report_type)
+            for error in validate_txt(report_type, data, period)
+        ]
+        self.write(
+            {
+                "txt_errors": json.dumps(errors) if errors else False,
+                "txt_error_count": len(errors),
+            }
+        )
 
     def _include_in_current_report(self, invoice):
         """
@@ -540,6 +737,7 @@ class DgiiReport(models.Model):
             PurchaseLine.search([("dgii_report_id", "=", rec.id)]).unlink()
 
             invoice_ids = self._get_invoices(["posted"], ["in_invoice", "in_refund"])
+            invoice_ids._l10n_do_refresh_606_payment_form()
 
             line = 0
             report_data = ""
@@ -587,6 +785,7 @@ class DgiiReport(models.Model):
                 PurchaseLine.create(values)
                 report_data += self.process_606_report_data(values) + "\n"
             self._generate_606_txt(report_data, line)
+            rec._compute_606_fields()
 
     def _get_payments_dict(self):
         return {
@@ -925,6 +1124,7 @@ class DgiiReport(models.Model):
                 "sale_binary": base64.b64encode(open(file_path, "rb").read()),
             }
         )
+        self._validate_txt("607", data, period)
 
     def _get_csmr_vals_dict(self):
         return {
@@ -962,6 +1162,16 @@ class DgiiReport(models.Model):
             csmr_dict = self._get_csmr_vals_dict()
 
             report_data = ""
+            rec.lean_lines = bool(
+                self.env["ir.config_parameter"].sudo().get_param(DGII_LEAN_607_PARAM)
+            )
+            stored_fields = [
+                name
+                for name, field in SaleLine._fields.items()
+                if field.store
+                and not (rec.lean_lines and name in DGII_SALE_LINE_INVOICE_FIELDS)
+            ]
+            line_vals_list = []
             for inv in invoice_ids:
                 op_dict = self._process_op_dict(op_dict, inv)
                 income_dict = self._process_income_dict(income_dict, inv)
@@ -1046,7 +1256,9 @@ class DgiiReport(models.Model):
                     csmr_dict["csmr_others"] += values["others"]
                 line += 1
                 values.update({"line": line})
-                SaleLine.create(values)
+                line_vals_list.append(
+                    {key: values[key] for key in stored_fields if key in values}
+                )
                 if (
                     str(values.get("fiscal_invoice_number"))[-10:-8] == "02"
                     and inv.amount_untaxed_signed < 250000
@@ -1063,12 +1275,14 @@ class DgiiReport(models.Model):
                         if inv.move_type == "out_refund"
                         else payments[k]
                     )
+            SaleLine.create(line_vals_list)
             for k in op_dict:
                 self.env["dgii.reports.sale.summary"].create(op_dict[k])
             self._set_csmr_fields_vals(csmr_dict)
             self._set_payment_form_fields(payment_dict)
             self._set_income_type_fields(income_dict)
             self._generate_607_txt(report_data, line - excluded_line)
+            rec._compute_607_fields()
 
     def process_608_report_data(self, values):
 
@@ -1128,6 +1342,7 @@ class DgiiReport(models.Model):
                 CancelLine.create(values)
                 report_data += self.process_608_report_data(values) + "\n"
             self._generate_608_txt(report_data, line)
+            rec._compute_608_fields()
 
     def process_609_report_data(self, values):
 
@@ -1238,6 +1453,7 @@ class DgiiReport(models.Model):
                 ExteriorLine.create(values)
                 report_data += self.process_609_report_data(values) + "\n"
             self._generate_609_txt(report_data, line)
+            rec._compute_609_fields()
 
     @api.model
     def _generate_report(self):
@@ -1250,10 +1466,10 @@ class DgiiReport(models.Model):
         self._compute_607_data()
         self._compute_608_data()
         self._compute_609_data()
-        self.state = "generated"
+        self.state = "error" if self.txt_error_count else "generated"
 
     def generate_report(self):
-        if self.state == "generated":
+        if self.state in ("generated", "error"):
             action = self.env.ref(
                 "l10n_do_accounting_report.dgii_report_regenerate_wizard_action"
             ).read()[0]
@@ -1323,12 +1539,192 @@ class DgiiReport(models.Model):
         )
         invoice_ids.write({"fiscal_status": "done"})
 
+    @staticmethod
+    def _get_line_archive_fields(line_model):
+        return [
+            name
+            for name, field in line_model._fields.items()
+            if field.store
+            and name not in models.MAGIC_COLUMNS
+            and name != "dgii_report_id"
+        ]
+
+    def _archive_lines(self):
+        """
+        Guarda las líneas de los reportes en un adjunto JSON comprimido y
+        las elimina de sus tablas. Los totales quedan en el reporte y los
+        TXT ya se guardan como adjuntos (filestore).
+        """
+        for report in self.filtered(lambda r: r.state == "sent" and not r.lines_archived):
+            data = {}
+            for model in DGII_REPORT_LINE_MODELS:
+                LineModel = self.env[model]
+                lines = LineModel.search([("dgii_report_id", "=", report.id)])
+                data[model] = lines.read(
+                    self._get_line_archive_fields(LineModel), load=False
+                )
+            attachment = self.env["ir.attachment"].create(
+                {
+                    "name": "DGII_%s_lines.json.gz" % report.name.replace("/", ""),
+                    "res_model": report._name,
+                    "res_id": report.id,
+                    "mimetype": "application/gzip",
+                    "raw": gzip.compress(json.dumps(data, default=str).encode()),
+                }
+            )
+            for model in DGII_REPORT_LINE_MODELS:
+                self.env.cr.execute(
+                    'DELETE FROM "%s" WHERE dgii_report_id = %%s' % self.env[model]._table,
+                    [report.id],
+                )
+                self.env[model].invalidate_model()
+            report.write({"lines_archived": True, "lines_archive_id": attachment.id})
+            _logger.info("Reporte DGII %s: líneas archivadas", report.name)
+
+    def action_restore_lines(self):
+        """Restaura las líneas archivadas de los reportes."""
+        if not self.env.user.has_group("account.group_account_manager"):
+            raise AccessError(
+                _("Only accounting administrators can restore archived report lines.")
+            )
+        for report in self.filtered("lines_archived"):
+            data = json.loads(gzip.decompress(report.lines_archive_id.raw))
+            for model, rows in data.items():
+                for row in rows:
+                    row.pop("id", None)
+                    row["dgii_report_id"] = report.id
+                self._clear_missing_references(self.env[model], rows)
+                self.env[model].create(rows)
+            attachment = report.lines_archive_id
+            report.write(
+                {
+                    "lines_archived": False,
+                    "lines_archive_id": False,
+                    "lines_restored_date": fields.Date.context_today(report),
+                }
+            )
+            attachment.unlink()
+
+    @api.model
+    def _clear_missing_references(self, line_model, rows):
+        """
+        Deja vacías en ``rows`` las referencias a registros que ya no
+        existen (facturas o contactos eliminados después de archivar).
+        """
+        for name, field in line_model._fields.items():
+            if field.type != "many2one" or name == "dgii_report_id":
+                continue
+            ids = {row[name] for row in rows if row.get(name)}
+            if not ids:
+                continue
+            existing = set(self.env[field.comodel_name].browse(ids).exists().ids)
+            for row in rows:
+                if row.get(name) and row[name] not in existing:
+                    row[name] = False
+
+    @api.model
+    def _cron_archive_reports(self, batch_size=DGII_ARCHIVE_BATCH_SIZE):
+        """
+        Archiva hasta ``batch_size`` reportes por ejecución, confirmando la
+        transacción después de cada uno. Si quedan reportes pendientes, el
+        cron se vuelve a ejecutar. Omite los reportes cuyas líneas fueron
+        restauradas con ``action_restore_lines``.
+        """
+        months = int(
+            self.env["ir.config_parameter"].sudo().get_param(
+                DGII_ARCHIVE_MONTHS_PARAM, DGII_ARCHIVE_MONTHS_DEFAULT
+            )
+        )
+        today = fields.Date.context_today(self)
+        limit = today.year * 12 + today.month - months
+        reports = self.search(
+            [
+                ("state", "=", "sent"),
+                ("lines_archived", "=", False),
+                ("lines_restored_date", "=", False),
+            ],
+            order="id",
+        ).filtered(lambda r: int(r.name[3:]) * 12 + int(r.name[:2]) <= limit)
+        for report in reports[:batch_size]:
+            report._archive_lines()
+            self.env.cr.commit()
+        done = min(len(reports), batch_size)
+        self.env["ir.cron"]._notify_progress(done=done, remaining=len(reports) - done)
+
     def state_sent(self):
         for report in self:
             report._invoice_status_sent()
             report.update_pending_invoices()
             report.state = "sent"
 
+    @api.model
+    def _get_redirect_action_view(self, model_name):
+        """
+        Ids de la acción y la vista de formulario para abrir registros de
+        ``model_name`` desde los reportes.
+
+        :return: (id de acción, id de vista), o (False, False)
+        """
+        return self._get_redirect_action_view_cached(model_name)
+
+    @tools.ormcache("model_name")
+    def _get_redirect_action_view_cached(self, model_name):
+        action_xmlid, view_xmlid = DGII_REDIRECT_TARGETS.get(model_name, (None, None))
+        if not action_xmlid:
+            return False, False
+        action = self.env.ref(action_xmlid, raise_if_not_found=False)
+        view = self.env.ref(view_xmlid, raise_if_not_found=False)
+        return (action.id if action else False), (view.id if view else False)
+
+    @api.autovacuum
+    def _gc_orphan_report_lines(self):
+        """
+        Elimina las líneas que quedaron sin reporte, y las líneas livianas
+        del 607 sin factura (sus datos se leen de la factura).
+        """
+        for model in DGII_REPORT_LINE_MODELS:
+            condition = "dgii_report_id IS NULL"
+            if model == "dgii.reports.sale.line":
+                condition += (
+                    " OR (invoice_id IS NULL AND dgii_report_id IN"
+                    " (SELECT id FROM dgii_reports WHERE lean_lines))"
+                )
+            self.env.cr.execute(
+                'DELETE FROM "%s" WHERE %s' % (self.env[model]._table, condition)
+            )
+            if self.env.cr.rowcount:
+                _logger.info("%s: %s líneas huérfanas eliminadas", model, self.env.cr.rowcount)
+            self.env[model].invalidate_model()
+
+    def action_cleanup_orphan_lines(self):
+        self.env["dgii.reports"]._gc_orphan_report_lines()
+
+    def _get_report_lines_page(self, report_type, after_line=0, limit=80, fields=None):
+        """
+        Página de líneas de un reporte, paginada por número de línea
+        (keyset) sobre el índice (dgii_report_id, line). Los totales se
+        toman de los resúmenes guardados en el reporte.
+
+        :param report_type: "606", "607", "608" o "609"
+        :param after_line: último número de línea de la página anterior
+        :return: dict con las líneas, el cursor siguiente y los totales
+        """
+        self.ensure_one()
+        if report_type not in DGII_REPORT_LINE_TYPES:
+            raise ValidationError(_("Tipo de reporte desconocido: %s") % report_type)
+        line_model, total_fields = DGII_REPORT_LINE_TYPES[report_type]
+        lines = self.env[line_model].search_read(
+            [("dgii_report_id", "=", self.id), ("line", ">", after_line)],
+            fields,
+            order="line",
+            limit=limit,
+        )
+        return {
+            "lines": lines,
+            "next_after_line": lines[-1]["line"] if len(lines) == limit else False,
+            "totals": self.read(total_fields)[0],
+        }
+
     def get_606_tree_view(self):
         return {
             "name": "606",
@@ -1381,11 +1777,14 @@ class DgiiReport(models.Model):
 class DgiiReportPurchaseLine(models.Model):
     _name = "dgii.reports.purchase.line"
     _description = "DGII Reports Purchase Line"
-    _order = "line asc"
+    _order = "dgii_report_id, line"
 
     dgii_report_id = fields.Many2one("dgii.reports", ondelete="cascade")
     line = fields.Integer()
 
+    def init(self):
+        _create_report_line_index(self)
+
     rnc_cedula = fields.Char(size=11)
     identification_type = fields.Char(size=1)
     expense_type = fields.Char(size=2)
@@ -1418,12 +1817,22 @@ class DgiiReportPurchaseLine(models.Model):
 
 
 class DgiiReportSaleLine(models.Model):
+    """
+    Línea del 607. Por defecto guarda una copia de los datos de la factura
+    tal como se reportaron. En los reportes con líneas livianas esos campos
+    quedan vacíos y se leen de la factura (ver ``_get_invoice_values``).
+    """
+
     _name = "dgii.reports.sale.line"
     _description = "DGII Reports Sale Line"
+    _order = "dgii_report_id, line"
 
     dgii_report_id = fields.Many2one("dgii.reports", ondelete="cascade")
     line = fields.Integer()
 
+    def init(self):
+        _create_report_line_index(self)
+
     rnc_cedula = fields.Char(size=11)
     identification_type = fields.Char(size=1)
     fiscal_invoice_number = fields.Char(size=19)
@@ -1454,14 +1863,93 @@ class DgiiReportSaleLine(models.Model):
     invoice_id = fields.Many2one("account.move")
     credit_note = fields.Boolean()
 
+    # Valores mostrados: la copia guardada o, en líneas livianas, la factura
+    display_fiscal_invoice_number = fields.Char(
+        "Fiscal Invoice Number", compute="_compute_display_invoice_values"
+    )
+    display_invoice_date = fields.Date(
+        "Invoice Date", compute="_compute_display_invoice_values"
+    )
+    display_invoiced_amount = fields.Float(
+        "Invoiced Amount", compute="_compute_display_invoice_values"
+    )
+    display_invoiced_itbis = fields.Float(
+        "Invoiced ITBIS", compute="_compute_display_invoice_values"
+    )
+    display_selective_tax = fields.Float(
+        "Selective Tax", compute="_compute_display_invoice_values"
+    )
+    display_other_taxes = fields.Float(
+        "Other Taxes", compute="_compute_display_invoice_values"
+    )
+    display_legal_tip = fields.Float(
+        "Legal Tip", compute="_compute_display_invoice_values"
+    )
+
+    def _get_invoice_values(self):
+        """
+        Datos de la factura de cada línea: los guardados en la línea o, si
+        el reporte se generó con líneas livianas, los de la factura.
+
+        :return: dict {id de línea: {campo: valor}} con los campos de
+            DGII_SALE_LINE_INVOICE_FIELDS
+        """
+        result = {}
+        for rec in self:
+            if not rec.dgii_report_id.lean_lines:
+                result[rec.id] = {
+                    name: rec[name] for name in DGII_SALE_LINE_INVOICE_FIELDS
+                }
+                continue
+            inv = rec.invoice_id
+            result[rec.id] = {
+                "fiscal_invoice_number": inv.l10n_latam_document_number,
+                "invoice_date": inv.invoice_date,
+                "invoiced_amount": abs(inv.amount_untaxed_signed),
+                "invoiced_itbis": inv.invoiced_itbis,
+                "selective_tax": inv.selective_tax,
+                "other_taxes": inv.other_taxes,
+                "legal_tip": inv.legal_tip,
+                "credit_note": inv.move_type == "out_refund",
+            }
+        return result
+
+    @api.depends(
+        "dgii_report_id.lean_lines",
+        *DGII_SALE_LINE_INVOICE_FIELDS,
+        "invoice_id.l10n_latam_document_number",
+        "invoice_id.invoice_date",
+        "invoice_id.move_type",
+        "invoice_id.amount_untaxed_signed",
+        "invoice_id.invoiced_itbis",
+        "invoice_id.selective_tax",
+        "invoice_id.other_taxes",
+        "invoice_id.legal_tip",
+    )
+    def _compute_display_invoice_values(self):
+        invoice_values = self._get_invoice_values()
+        for rec in self:
+            values = invoice_values[rec.id]
+            rec.display_fiscal_invoice_number = values["fiscal_invoice_number"]
+            rec.display_invoice_date = values["invoice_date"]
+            rec.display_invoiced_amount = values["invoiced_amount"]
+            rec.display_invoiced_itbis = values["invoiced_itbis"]
+            rec.display_selective_tax = values["selective_tax"]
+            rec.display_other_taxes = values["other_taxes"]
+            rec.display_legal_tip = values["legal_tip"]
+
 
 class DgiiCancelReportLine(models.Model):
     _name = "dgii.reports.cancel.line"
     _description = "DGII Reports Cancel Line"
+    _order = "dgii_report_id, line"
 
     dgii_report_id = fields.Many2one("dgii.reports", ondelete="cascade")
     line = fields.Integer()
 
+    def init(self):
+        _create_report_line_index(self)
+
     fiscal_invoice_number = fields.Char(size=19)
     invoice_date = fields.Date()
     anulation_type = fields.Char(size=2)
@@ -1473,10 +1961,14 @@ class DgiiCancelReportLine(models.Model):
 class DgiiExteriorReportLine(models.Model):
     _name = "dgii.reports.exterior.line"
     _description = "DGII Reports Exterior Line"
+    _order = "dgii_report_id, line"
 
     dgii_report_id = fields.Many2one("dgii.reports", ondelete="cascade")
     line = fields.Integer()
 
+    def init(self):
+        _create_report_line_index(self)
+
     legal_name = fields.Char()
     tax_id_type = fields.Integer()
     partner_id = fields.Integer()
@@ -0,0 +1,168 @@
+"""file: dgii_txt_validator.py .
+
+Validación estructural de los TXT 606/607 antes de enviarlos a la DGII.
+
+Cada fila se compara primero contra una única expresión regular compilada
+para toda la fila; solo las filas que no coinciden se revisan columna por
+columna para producir el detalle del error.
+"""
+import re
+
+_RNC = r"\d{9}|\d{11}"
+_ID_TYPE = r"[12]"
+_NCF = r"B\d{10}|E\d{12}"
+_DATE = r"\d{4}(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])"
+_AMOUNT = r"\d{1,12}\.\d{2}"
+
+# Las fechas de una fila se comparan con el período solo si tienen formato válido
+_DATE_RE = re.compile(_DATE)
+
+# (nombre, patrón, obligatorio, comparar contra el período). Los montos en
+# cero se escriben vacíos en los TXT, por lo que ningún monto es obligatorio.
+_606_COLUMNS = [
+    ("rnc_cedula", _RNC, True, False),
+    ("identification_type", _ID_TYPE, True, False),
+    ("expense_type", r"0[1-9]|1[01]", True, False),
+    ("fiscal_invoice_number", _NCF, True, False),
+    ("modified_invoice_number", _NCF, False, False),
+    ("invoice_date", _DATE, True, True),
+    ("payment_date", _DATE, False, True),
+    ("service_total_amount", _AMOUNT, False, False),
+    ("good_total_amount", _AMOUNT, False, False),
+    ("invoiced_amount", _AMOUNT, False, False),
+    ("invoiced_itbis", _AMOUNT, False, False),
+    ("withholded_itbis", _AMOUNT, False, False),
+    ("proportionality_tax", _AMOUNT, False, False),
+    ("cost_itbis", _AMOUNT, False, False),
+    ("advance_itbis", _AMOUNT, False, False),
+    ("purchase_perceived_itbis", _AMOUNT, False, False),
+    ("isr_withholding_type", r"0[1-8]", False, False),
+    ("income_withholding", _AMOUNT, False, False),
+    ("purchase_perceived_isr", _AMOUNT, False, False),
+    ("selective_tax", _AMOUNT, False, False),
+    ("other_taxes", _AMOUNT, False, False),
+    ("legal_tip", _AMOUNT, False, False),
+    ("payment_type", r"0[1-7]", False, False),
+]
+_607_COLUMNS = [
+    ("rnc_cedula", _RNC, False, False),
+    ("identification_type", _ID_TYPE, False, False),
+    ("fiscal_invoice_number", _NCF, True, False),
+    ("modified_invoice_number", _NCF, False, False),
+    ("income_type", r"0[1-6]", True, False),
+    ("invoice_date", _DATE, True, True),
+    ("withholding_date", _DATE, False, True),
+    ("invoiced_amount", _AMOUNT, False, False),
+    ("invoiced_itbis", _AMOUNT, False, False),
+    ("third_withheld_itbis", _AMOUNT, False, False),
+    ("perceived_itbis", _AMOUNT, False, False),
+    ("third_income_withholding", _AMOUNT, False, False),
+    ("perceived_isr", _AMOUNT, False, False),
+    ("selective_tax", _AMOUNT, False, False),
+    ("other_taxes", _AMOUNT, False, False),
+    ("legal_tip", _AMOUNT, False, False),
+    ("cash", _AMOUNT, False, False),
+    ("bank", _AMOUNT, False, False),
+    ("card", _AMOUNT, False, False),
+    ("credit", _AMOUNT, False, False),
+    ("swap", _AMOUNT, False, False),
+    ("bond", _AMOUNT, False, False),
+    ("others", _AMOUNT, False, False),
+]
+
+
+class _TxtSpec:
+    """Validadores precompilados de un formato."""
+
+    def __init__(self, code, columns):
+        self.code = code
+        self.columns = columns
+        self.header = re.compile(r"%s\|(\d{9}|\d{11}) *\|(\d{6})\|(\d+)" % code)
+        # Los valores del 607 se rellenan con espacios a la derecha
+        self.cells = [
+            re.compile("(?:%s)? *" % pattern if not required else "(?:%s) *" % pattern)
+            for _name, pattern, required, _period in columns
+        ]
+        self.period_columns = [
+            index for index, column in enumerate(columns) if column[3]
+        ]
+        # Las columnas de fecha se capturan para revisar el período sin
+        # tener que dividir las filas válidas
+        self.row = re.compile(
+            r"\|".join(
+                "(%s)" % cell.pattern if index in self.period_columns else cell.pattern
+                for index, cell in enumerate(self.cells)
+            )
+        )
+
+
+_SPECS = {
+    "606": _TxtSpec("606", _606_COLUMNS),
+    "607": _TxtSpec("607", _607_COLUMNS),
+}
+
+
+def _error(row, column, value, code):
+    return {"row": row, "column": column, "value": value, "error": code}
+
+
+def validate_txt(report_type, content, period):
+    """Valida el contenido de un TXT 606/607.
+
+    :param report_type: "606" o "607"
+    :param content: texto del archivo, con encabezado
+    :param period: período del reporte como "YYYYMM"
+    :return: lista de errores ``{row, column, value, error}``; ``row`` es
+        el número de línea del archivo (el encabezado es la fila 1)
+    """
+    spec = _SPECS[report_type]
+    lines = content.splitlines()
+    errors = []
+    if not lines:
+        return [_error(1, "header", "", "missing_header")]
+
+    header = spec.header.fullmatch(lines[0])
+    if not header:
+        errors.append(_error(1, "header", lines[0], "invalid_header"))
+    else:
+        if header.group(2) != period:
+            errors.append(_error(1, "period", header.group(2), "period_mismatch"))
+        if int(header.group(3)) != len(lines) - 1:
+            errors.append(_error(1, "qty", header.group(3), "row_count_mismatch"))
+
+    row_match = spec.row.fullmatch
+    period_columns = spec.period_columns
+    for row, line in enumerate(lines[1:], start=2):
+        match = row_match(line)
+        if match:
+            dates = match.groups()
+        else:
+            values = line.split("|")
+            if len(values) != len(spec.columns):
+                errors.append(_error(row, "row", line, "wrong_column_count"))
+                continue
+            dates = [values[index] for index in period_columns]
+            for (name, _pattern, required, _period), cell, value in zip(
+                spec.columns, spec.cells, values
+            ):
+                if cell.fullmatch(value):
+                    continue
+                value = value.strip()
+                if not value:
+                    code = "required"
+                elif value.startswith("-"):
+                    code = "negative_amount"
+                elif name == "rnc_cedula":
+                    code = "invalid_rnc_length"
+                else:
+                    code = "invalid_format"
+                errors.append(_error(row, name, value, code))
+        # Las fechas no pueden ser posteriores al período reportado; las que
+        # no tienen formato válido ya se reportaron como tales
+        for index, value in zip(period_columns, dates):
+            value = value.strip()
+            if _DATE_RE.fullmatch(value) and value[:6] > period:
+                errors.append(
+                    _error(row, spec.columns[index][0], value, "date_out_of_period")
+                )
+    return errors
@@ -1,5 +1,6 @@
 """file: res_partner.py ."""
 from odoo import fields, models
+from odoo.tools.sql import create_index, index_exists
 
 
 class ResPartner(models.Model):
@@ -11,3 +12,8 @@ class ResPartner(models.Model):
         [("0", "Not Related"), ("1", "Related")],
         default="0",
     )
+
+    def init(self):
+        # Búsqueda de socios por RNC desde los reportes DGII
+        if not index_exists(self.env.cr, "res_partner__vat_index"):
+            create_index(self.env.cr, "res_partner_vat_index", self._table, ["vat"])
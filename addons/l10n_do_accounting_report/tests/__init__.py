@@ -0,0 +1,4 @@
+from . import test_dgii_txt_validator
+from . import test_606_payment_form
+from . import test_dgii_backfill
+from . import test_dgii_report_archive
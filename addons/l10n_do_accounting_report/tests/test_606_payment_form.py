@@ -0,0 +1,95 @@
+from odoo.tests import tagged
+
+from odoo.addons.l10n_do_accounting.tests import common
+
+
+@tagged("-at_install", "post_install")
+class Dgii606PaymentFormTest(common.L10nDOTestsCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        journals = cls.env["account.journal"].search(
+            [("company_id", "=", cls.do_company.id), ("type", "in", ("cash", "bank", "general"))]
+        )
+        cls.cash_journal = journals.filtered(lambda j: j.type == "cash")[0]
+        cls.bank_journal = journals.filtered(lambda j: j.type == "bank")[0]
+        cls.misc_journal = journals.filtered(lambda j: j.type == "general")[0]
+
+    def _create_bill(self, number, invoice_type="in_invoice"):
+        bill = self._create_l10n_do_invoice(
+            data={"document_number": number, "expense_type": "02"},
+            invoice_type=invoice_type,
+        )
+        bill._post()
+        return bill
+
+    def _pay(self, bill, journal, amount=None):
+        self.env["account.payment.register"].with_context(
+            active_model="account.move", active_ids=bill.ids
+        ).create({
+            "journal_id": journal.id,
+            "amount": amount or bill.amount_residual,
+        })._create_payments()
+
+    @staticmethod
+    def _payable_lines(moves):
+        return moves.line_ids.filtered(lambda l: l.account_id.account_type == "liability_payable")
+
+    def _payment_form(self, bill):
+        return bill._l10n_do_get_606_payment_forms()[bill.id]
+
+    def test_001_cash_and_bank(self):
+        """Checks cash and bank payments map to their journal type"""
+        cash_bill = self._create_bill("B0100000011")
+        self.assertEqual(self._payment_form(cash_bill), "04")
+        self._pay(cash_bill, self.cash_journal)
+        self.assertEqual(self._payment_form(cash_bill), "01")
+
+        bank_bill = self._create_bill("B0100000012")
+        self._pay(bank_bill, self.bank_journal)
+        self.assertEqual(self._payment_form(bank_bill), "02")
+        self.assertEqual(bank_bill.payment_form, "02")
+
+    def test_002_credit_note(self):
+        """Checks a bill settled with a vendor credit note is reported as 06"""
+        bill = self._create_bill("B0100000013")
+        refund = self._create_bill("B0400000013", invoice_type="in_refund")
+        self._payable_lines(bill | refund).reconcile()
+        self.assertEqual(self._payment_form(bill), "06")
+
+    def test_003_mixed(self):
+        """Checks partial or multiple payment forms are reported as mixed"""
+        bill = self._create_bill("B0100000014")
+        self._pay(bill, self.bank_journal, amount=bill.amount_residual / 2)
+        self.assertEqual(self._payment_form(bill), "07")
+
+        self._pay(bill, self.cash_journal)
+        self.assertEqual(bill.payment_state, "paid")
+        self.assertEqual(self._payment_form(bill), "07")
+
+    def test_004_swap(self):
+        """Checks an offset through a miscellaneous entry is reported as swap"""
+        bill = self._create_bill("B0100000015")
+        payable = self._payable_lines(bill)
+        receivable_account = self.fiscal_partner.with_company(
+            self.do_company
+        ).property_account_receivable_id
+        entry = self.env["account.move"].create({
+            "move_type": "entry",
+            "journal_id": self.misc_journal.id,
+            "line_ids": [
+                (0, 0, {
+                    "account_id": payable.account_id.id,
+                    "partner_id": self.fiscal_partner.id,
+                    "debit": -payable.balance,
+                }),
+                (0, 0, {
+                    "account_id": receivable_account.id,
+                    "partner_id": self.fiscal_partner.id,
+                    "credit": -payable.balance,
+                }),
+            ],
+        })
+        entry._post()
+        self._payable_lines(bill | entry).reconcile()
+        self.assertEqual(self._payment_form(bill), "05")
@@ -0,0 +1,125 @@
+from odoo.tests import tagged
+
+from odoo.addons.l10n_do_accounting.tests import common
+from odoo.addons.l10n_do_accounting_report.models.account_move import (
+    DGII_BACKFILL_COLUMNS,
+)
+
+
+@tagged("-at_install", "post_install")
+class DgiiBackfillTest(common.L10nDOTestsCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        company = cls.do_company
+        journals = cls.env["account.journal"].search(
+            [("company_id", "=", company.id), ("type", "in", ("cash", "bank"))]
+        )
+        cls.cash_journal = journals.filtered(lambda j: j.type == "cash")[0]
+        cls.bank_journal = journals.filtered(lambda j: j.type == "bank")[0]
+
+        tax_prefix = "account.%s_" % company.id
+        extra_taxes = cls.env["account.tax"]
+        for category, amount in (("isc", 10), ("tip", 10)):
+            group = cls.env["account.tax.group"].create(
+                {
+                    "name": category.upper(),
+                    "company_id": company.id,
+                    "l10n_do_dgii_tax_category": category,
+                }
+            )
+            extra_taxes |= cls.env["account.tax"].create(
+                {
+                    "name": "%s %s%% compras" % (category.upper(), amount),
+                    "amount": amount,
+                    "type_tax_use": "purchase",
+                    "tax_group_id": group.id,
+                    "company_id": company.id,
+                }
+            )
+        cls.product_isc_tip = cls.env["product.product"].create(
+            {
+                "name": "Product - Goods",
+                "type": "consu",
+                "standard_price": 100,
+                "supplier_taxes_id": [
+                    (6, 0, (cls.env.ref(tax_prefix + "tax_18_purch") | extra_taxes).ids)
+                ],
+            }
+        )
+
+    def _pay(self, move, journal, amount=None):
+        self.env["account.payment.register"].with_context(
+            active_model="account.move", active_ids=move.ids
+        ).create({
+            "journal_id": journal.id,
+            "amount": amount or move.amount_residual,
+        })._create_payments()
+
+    def _read_dgii_columns(self, moves):
+        return {
+            values["id"]: values
+            for values in moves.read(list(DGII_BACKFILL_COLUMNS), load=False)
+        }
+
+    def test_001_backfill_matches_orm_computes(self):
+        invoice = self._create_l10n_do_invoice()
+        goods_bill = self._create_l10n_do_invoice(
+            data={
+                "document_number": "B0100000031",
+                "expense_type": "02",
+                "lines": [
+                    {"product": self.product_isc_tip, "price_unit": 200},
+                    {"price_unit": 50},
+                ],
+            },
+            invoice_type="in_invoice",
+        )
+        informal_bill = self._create_l10n_do_invoice(
+            data={
+                "partner": self.consumo_partner,
+                "document_type": self.do_document_type["informal"],
+                "document_number": "B1100000031",
+                "expense_type": "02",
+            },
+            invoice_type="in_invoice",
+        )
+        open_bill = self._create_l10n_do_invoice(
+            data={"document_number": "B0100000032", "expense_type": "02"},
+            invoice_type="in_invoice",
+        )
+        moves = invoice | goods_bill | informal_bill | open_bill
+        moves._post()
+        self._pay(invoice, self.bank_journal, amount=50)
+        self._pay(goods_bill, self.cash_journal)
+        self._pay(informal_bill, self.bank_journal)
+
+        Move = self.env["account.move"]
+        for fname in DGII_BACKFILL_COLUMNS:
+            self.env.add_to_compute(Move._fields[fname], moves)
+        moves.flush_recordset()
+        expected = self._read_dgii_columns(moves)
+        self.assertTrue(expected[goods_bill.id]["selective_tax"])
+        self.assertTrue(expected[goods_bill.id]["legal_tip"])
+        self.assertTrue(expected[informal_bill.id]["withholded_itbis"])
+        self.assertTrue(expected[informal_bill.id]["income_withholding"])
+
+        self.env.cr.execute(
+            "UPDATE account_move SET %s WHERE id IN %%s"
+            % ", ".join("%s = NULL" % fname for fname in DGII_BACKFILL_COLUMNS),
+            [tuple(moves.ids)],
+        )
+        Move.invalidate_model(list(DGII_BACKFILL_COLUMNS))
+        Move._l10n_do_backfill_dgii_chunk(moves.ids)
+        moves.flush_recordset()
+        Move.invalidate_model(list(DGII_BACKFILL_COLUMNS))
+        backfilled = self._read_dgii_columns(moves)
+
+        for move in moves:
+            for fname, column_type in DGII_BACKFILL_COLUMNS.items():
+                with self.subTest(move=move.name, field=fname):
+                    value = backfilled[move.id][fname]
+                    if column_type == "numeric":
+                        self.assertAlmostEqual(value, expected[move.id][fname], places=2)
+                    else:
+                        self.assertEqual(value, expected[move.id][fname])
@@ -0,0 +1,71 @@
+from odoo.tests import tagged
+
+from odoo.addons.l10n_do_accounting.tests import common
+
+
+@tagged("-at_install", "post_install")
+class DgiiReportArchiveTest(common.L10nDOTestsCommon):
+    def _create_sent_report(self):
+        report = self.env["dgii.reports"].create(
+            {"name": "01/2020", "company_id": self.do_company.id}
+        )
+        report.state = "sent"
+        self.env["dgii.reports.purchase.line"].create(
+            [
+                {
+                    "dgii_report_id": report.id,
+                    "line": line,
+                    "rnc_cedula": "131793916",
+                    "fiscal_invoice_number": "B010000000%s" % line,
+                    "invoice_date": "2020-01-15",
+                    "invoiced_amount": 100.0 * line,
+                    "invoice_partner_id": self.fiscal_partner.id,
+                }
+                for line in (1, 2)
+            ]
+        )
+        self.env["dgii.reports.cancel.line"].create(
+            {
+                "dgii_report_id": report.id,
+                "line": 1,
+                "fiscal_invoice_number": "B0100000009",
+                "invoice_date": "2020-01-20",
+                "anulation_type": "04",
+            }
+        )
+        return report
+
+    def _lines(self, model, report):
+        return self.env[model].search([("dgii_report_id", "=", report.id)])
+
+    def test_001_archive_restore_round_trip(self):
+        report = self._create_sent_report()
+        expected = self._lines("dgii.reports.purchase.line", report).read(
+            ["line", "fiscal_invoice_number", "invoiced_amount", "invoice_partner_id"],
+            load=False,
+        )
+
+        report._archive_lines()
+        self.assertTrue(report.lines_archived)
+        self.assertTrue(report.lines_archive_id.raw)
+        self.assertFalse(self._lines("dgii.reports.purchase.line", report))
+        self.assertFalse(self._lines("dgii.reports.cancel.line", report))
+
+        attachment = report.lines_archive_id
+        report.action_restore_lines()
+        self.assertFalse(report.lines_archived)
+        self.assertTrue(report.lines_restored_date)
+        self.assertFalse(attachment.exists())
+        restored = self._lines("dgii.reports.purchase.line", report).read(
+            ["line", "fiscal_invoice_number", "invoiced_amount", "invoice_partner_id"],
+            load=False,
+        )
+        for row in expected + restored:
+            row.pop("id")
+        self.assertEqual(restored, expected)
+        self.assertEqual(len(self._lines("dgii.reports.cancel.line", report)), 1)
+
+        # El cron no vuelve a archivar un reporte restaurado
+        self.env["dgii.reports"]._cron_archive_reports()
+        self.assertFalse(report.lines_archived)
+        self.assertEqual(len(self._lines("dgii.reports.purchase.line", report)), 2)
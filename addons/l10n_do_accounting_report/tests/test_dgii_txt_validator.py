@@ -0,0 +1,91 @@
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+from ..models.dgii_txt_validator import validate_txt
+
+
+def _row_606(**values):
+    row = dict(
+        rnc_cedula="131566332",
+        identification_type="1",
+        expense_type="02",
+        fiscal_invoice_number="B0100000001",
+        invoice_date="20240115",
+        invoiced_amount="1000.00",
+        invoiced_itbis="180.00",
+        payment_type="01",
+    )
+    row.update(values)
+    columns = [
+        "rnc_cedula", "identification_type", "expense_type", "fiscal_invoice_number",
+        "modified_invoice_number", "invoice_date", "payment_date", "service_total_amount",
+        "good_total_amount", "invoiced_amount", "invoiced_itbis", "withholded_itbis",
+        "proportionality_tax", "cost_itbis", "advance_itbis", "purchase_perceived_itbis",
+        "isr_withholding_type", "income_withholding", "purchase_perceived_isr",
+        "selective_tax", "other_taxes", "legal_tip", "payment_type",
+    ]
+    return "|".join(row.get(name, "") for name in columns)
+
+
+def _txt_606(*rows, period="202401"):
+    return "\n".join(["606|131793916|%s|%s" % (period, len(rows))] + list(rows)) + "\n"
+
+
+@tagged("-at_install", "post_install")
+class DgiiTxtValidatorTest(BaseCase):
+    def test_001_valid_606(self):
+        """
+        Checks a well formed 606 has no errors, including zero amounts
+        written as blanks
+        """
+        content = _txt_606(
+            _row_606(),
+            _row_606(fiscal_invoice_number="B1300000001", invoiced_amount="", invoiced_itbis=""),
+            _row_606(payment_date="20240131", withholded_itbis="54.00"),
+        )
+        self.assertEqual(validate_txt("606", content, "202401"), [])
+
+    def test_002_invalid_606_rows(self):
+        """
+        Checks each failing column is reported once and only well formed
+        dates are compared against the period
+        """
+        content = _txt_606(
+            _row_606(invoice_date="20241301"),
+            _row_606(payment_date="20240201"),
+            _row_606(rnc_cedula="1315663", invoiced_amount="-10.00"),
+            _row_606(expense_type="") + "|",
+        )
+        errors = validate_txt("606", content, "202401")
+        self.assertEqual(
+            [(error["row"], error["column"], error["error"]) for error in errors],
+            [
+                (2, "invoice_date", "invalid_format"),
+                (3, "payment_date", "date_out_of_period"),
+                (4, "rnc_cedula", "invalid_rnc_length"),
+                (4, "invoiced_amount", "negative_amount"),
+                (5, "row", "wrong_column_count"),
+            ],
+        )
+
+    def test_003_header(self):
+        """Checks the header period, row count and format are validated"""
+        errors = validate_txt("606", _txt_606(_row_606(), period="202402"), "202401")
+        self.assertEqual([error["error"] for error in errors], ["period_mismatch"])
+
+        content = _txt_606(_row_606()).replace("606|131793916|202401|1", "606|131793916|202401|2")
+        errors = validate_txt("606", content, "202401")
+        self.assertEqual([error["error"] for error in errors], ["row_count_mismatch"])
+
+        errors = validate_txt("607", _txt_606(_row_606()), "202401")
+        self.assertEqual(errors[0]["error"], "invalid_header")
+        self.assertEqual(validate_txt("606", "", "202401")[0]["error"], "missing_header")
+
+    def test_004_607_padded_values(self):
+        """Checks 607 values padded with spaces are accepted"""
+        row = "|".join(
+            ["131566332  ", "1", "B0100000001", "", "01", "20240115", "", "1000.00", "180.00"]
+            + [""] * 14
+        )
+        content = "607|131793916|202401|1\n%s\n" % row
+        self.assertEqual(validate_txt("607", content, "202401"), [])